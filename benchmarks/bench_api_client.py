@@ -0,0 +1,105 @@
+"""
+Cenários de carga e falha do APIClient contra o StubAPI local (sem rede externa).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_api_client
+"""
+import asyncio
+import time
+
+from loguru import logger
+
+from benchmarks.stub_api import StubAPI
+from services.api_client import APIClient, APIError, TransportConfig
+
+
+def fast_transport(**overrides) -> TransportConfig:
+    return TransportConfig(**{"backoff_base": 0.01, "backoff_max": 0.05, "breaker_reset_timeout": 0.5, **overrides})
+
+
+async def run(client: APIClient, calls):
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    elapsed = time.perf_counter() - t0
+    errors = sum(isinstance(r, APIError) for r in results)
+    return elapsed, len(results) - errors, errors
+
+
+async def scenario_coalescing():
+    stub = StubAPI(latency=0.05)
+    await stub.start()
+    client = APIClient(stub.url, transport=fast_transport())
+    await client.start()
+    elapsed, ok, errors = await run(client, [client.get("/reservation/slots") for _ in range(500)])
+    await client.close()
+    await stub.stop()
+    assert stub.requests["GET /reservation/slots"] == 1
+    return "500 GETs idênticos", elapsed, ok, errors, client.metrics()
+
+
+async def scenario_flaky():
+    stub = StubAPI(latency=0.005, error_rate=0.3, seed=1)
+    await stub.start()
+    client = APIClient(stub.url, cache_ttl=0, transport=fast_transport(max_retries=3, breaker_failure_threshold=50))
+    await client.start()
+    elapsed, ok, errors = await run(client, [client.get(f"/users/{i}") for i in range(300)])
+    await client.close()
+    await stub.stop()
+    # Com 30% de erro e 3 retries, ~1% das chamadas falha nas 4 tentativas
+    assert ok >= 285, ok
+    return "30% de 503 + retries", elapsed, ok, errors, client.metrics()
+
+
+async def scenario_down():
+    stub = StubAPI()
+    stub.down = True
+    await stub.start()
+    client = APIClient(stub.url, cache_ttl=0, transport=fast_transport(max_retries=1, breaker_failure_threshold=5))
+    await client.start()
+    # Sequencial: as primeiras abrem o circuito, o resto falha sem tocar na rede
+    t0 = time.perf_counter()
+    errors = 0
+    for i in range(200):
+        try:
+            await client.get(f"/equipment/{i}")
+        except APIError:
+            errors += 1
+    elapsed = time.perf_counter() - t0
+    sent = sum(stub.requests.values())
+
+    # Recuperação: depois do reset_timeout o circuito testa de novo e fecha
+    stub.down = False
+    await asyncio.sleep(0.6)
+    await client.get("/equipment/ok")
+    await client.close()
+    await stub.stop()
+    assert sent <= 10, sent
+    assert client.breaker.state == client.breaker.CLOSED
+    return "API fora do ar", elapsed, 200 - errors, errors, client.metrics()
+
+
+async def scenario_slow():
+    stub = StubAPI(latency=0.5)
+    await stub.start()
+    client = APIClient(stub.url, cache_ttl=0, transport=fast_transport(
+        request_timeout=0.1, max_retries=1, breaker_failure_threshold=1000))
+    await client.start()
+    elapsed, ok, errors = await run(client, [client.get(f"/slow/{i}") for i in range(50)])
+    await client.close()
+    await stub.stop()
+    assert errors == 50
+    assert client.transport_stats["timeouts"] == 100
+    return "latência 500ms, timeout 100ms", elapsed, ok, errors, client.metrics()
+
+
+async def main():
+    logger.remove()
+    for scenario in (scenario_coalescing, scenario_flaky, scenario_down, scenario_slow):
+        name, elapsed, ok, errors, metrics = await scenario()
+        print(f"{name:<32} {elapsed * 1000:>8.1f} ms  ok={ok:<4} erros={errors:<4}")
+        print(f"    transport={metrics['transport']}")
+        print(f"    breaker={metrics['breaker']} cache={metrics['cache']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+Micro-benchmark: helpers antigos (strftime + `in` em lista) x grade de bitmask.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_availability
+"""
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from utils.availability import EquipmentAvailability, get_slot_grid
+from utils.datetime_utils import (
+    generate_possible_end_times,
+    generate_time_slots,
+    get_available_time_slots,
+)
+
+OPENING = datetime(1900, 1, 1, 8, 0)
+CLOSING = datetime(1900, 1, 1, 21, 0)
+DAYS = 7
+ROUNDS = 200
+
+
+# ---------------- Implementações antigas (referência) ----------------
+def legacy_generate_time_slots(start_time, end_time, interval):
+    slots = []
+    current = start_time
+    while current < end_time:
+        slots.append(current.strftime("%H:%M"))
+        current += timedelta(minutes=interval)
+    return slots
+
+def legacy_get_available_time_slots(start_time, end_time, interval, unavailable_time_slots):
+    available = []
+    current = start_time
+    while current < end_time:
+        time_str = current.strftime("%H:%M")
+        if time_str not in unavailable_time_slots:
+            available.append(time_str)
+        current += timedelta(minutes=interval)
+    return available
+
+def legacy_generate_possible_end_times(current, blocks, unavailable_time_slots, interval, end_time):
+    possible_ends = []
+    while True:
+        current += timedelta(minutes=interval)
+        time_str = current.strftime("%H:%M")
+        if time_str in unavailable_time_slots or current >= end_time:
+            possible_ends.append(time_str)
+            break
+        possible_ends.append(time_str)
+        if blocks >= 1:
+            blocks -= 1
+            if blocks == 0:
+                break
+    return possible_ends
+
+
+def build_week(interval: int):
+    slots = legacy_generate_time_slots(OPENING, CLOSING, interval)
+    rng = random.Random(interval)
+    return slots, {
+        f"{day:02d}/10/2026": sorted(rng.sample(slots, len(slots) // 2))
+        for day in range(1, DAYS + 1)
+    }
+
+
+def check_equivalence(interval: int, slots, week):
+    assert generate_time_slots(OPENING, CLOSING, interval) == slots
+    for unavailable in week.values():
+        assert get_available_time_slots(OPENING, CLOSING, interval, unavailable) == \
+            legacy_get_available_time_slots(OPENING, CLOSING, interval, unavailable)
+        for start in slots:
+            current = datetime.strptime(start, "%H:%M")
+            for blocks in (0, 1, 4):
+                assert generate_possible_end_times(current, blocks, unavailable, interval, CLOSING) == \
+                    legacy_generate_possible_end_times(current, blocks, unavailable, interval, CLOSING)
+
+
+def bench(interval: int):
+    slots, week = build_week(interval)
+    check_equivalence(interval, slots, week)
+    start = slots[len(slots) // 3]
+    start_dt = datetime.strptime(start, "%H:%M")
+
+    def legacy_calendar():
+        # O que show_available_dates + show_end_time_options faziam a cada clique
+        for unavailable in week.values():
+            legacy_get_available_time_slots(OPENING, CLOSING, interval, unavailable)
+        for unavailable in week.values():
+            legacy_generate_possible_end_times(start_dt, 0, unavailable, interval, CLOSING)
+
+    def adapters_calendar():
+        for unavailable in week.values():
+            get_available_time_slots(OPENING, CLOSING, interval, unavailable)
+        for unavailable in week.values():
+            generate_possible_end_times(start_dt, 0, unavailable, interval, CLOSING)
+
+    grid = get_slot_grid(OPENING, CLOSING, interval)
+    availability = EquipmentAvailability.from_unavailable_slots(grid, week)
+
+    def bitmask_calendar():
+        for date_str in availability.days:
+            availability.is_fully_booked(date_str)
+        for date_str in availability.days:
+            availability.possible_end_times(date_str, start, 0)
+
+    results = {}
+    for name, fn in (("legacy", legacy_calendar), ("adapters", adapters_calendar), ("bitmask", bitmask_calendar)):
+        results[name] = min(timeit.repeat(fn, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+    return len(slots), results
+
+
+def main():
+    print(f"{'intervalo':>9} {'slots':>5} {'legacy (µs)':>12} {'adapters (µs)':>14} {'bitmask (µs)':>13} {'speedup':>8}")
+    for interval in (5, 15, 60):
+        slot_count, r = bench(interval)
+        print(f"{interval:>8}m {slot_count:>5} {r['legacy']:>12.1f} {r['adapters']:>14.1f} "
+              f"{r['bitmask']:>13.1f} {r['legacy'] / r['bitmask']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Disponibilidade em lote: 200 equipamentos x 30 dias úteis.
+
+Mede:
+- tamanho no fio: matriz compacta (AvailabilityMatrix.to_wire, bitmasks em base64) contra o formato
+  antigo (listas de "HH:MM" ocupados por dia), ambos serializados em JSON
+- fan-in: N calendários abertos ao mesmo tempo (fetch_equipment_availability), com o micro-batcher
+  juntando tudo em uma busca contra uma busca por equipamento:
+  - em processo (índice em memória): o trabalho é o mesmo, os dois caminhos empatam
+  - pela rede: o "Exemplo real" de fetch_availability_matrix (POST /reservation/availability) contra o
+    benchmarks/stub_api com `--latency` por requisição, pelo APIClient e seu pool de conexões
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_availability_matrix [--equipment 200] [--days 30] [--occupancy 0.5] [--rounds 5]
+        [--latency 0.02]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from aiohttp import web
+
+from benchmarks.stub_api import StubAPI
+from models.reservation import ReservationResponse
+from services.api_client import APIClient
+from services.reservation_service import ReservationService
+from services.storage import MemoryStorage
+from utils.availability import AvailabilityMatrix
+
+
+def seed(schedule, equipment_ids, days, occupancy: float, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    hours = range(schedule.config.opening_time.hour, schedule.config.closing_time.hour)
+    batch = []
+    for equipment_id in equipment_ids:
+        for label in days:
+            day = schedule.day_date(label)
+            for hour in hours:
+                if rng.random() < occupancy:
+                    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+                    batch.append(ReservationResponse(
+                        id=uuid4(), user_id=uuid4(), equipment_id=equipment_id, responsible_id=None,
+                        start=start, end=start + timedelta(hours=1), status="approved",
+                        created_at=now, updated_at=now, deleted_at=None))
+    return batch
+
+
+def best_of(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def best_of_async(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main():
+    from loguru import logger
+    logger.remove()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--equipment", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--occupancy", type=float, default=0.5, help="fração das horas já reservadas")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="latência da API simulada por requisição (s)")
+    args = parser.parse_args()
+
+    storage = MemoryStorage()
+    await storage.start()
+    service = ReservationService(None, storage)
+    schedule = await service.get_reservation_schedule()
+    days = schedule.bookable_days(max_days=args.days)
+    equipment_ids = [uuid4() for _ in range(args.equipment)]
+    batch = seed(schedule, equipment_ids, days, args.occupancy, random.Random(7))
+    await storage.add_reservations(batch)
+    await service.start()
+
+    # ---------------- Fio ----------------
+    matrix = await service.fetch_availability_matrix(equipment_ids, days, schedule)
+    day_dates = {label: schedule.day_date(label) for label in days}
+    grid = schedule.grid
+
+    def encode_compact():
+        return json.dumps(matrix.to_wire(day_dates))
+
+    def encode_labels():
+        return json.dumps({
+            str(equipment_id): {label: grid.labels_from_mask(mask) for label, mask in zip(days, masks)}
+            for equipment_id, masks in matrix.masks.items()
+        })
+
+    compact, labels = encode_compact(), encode_labels()
+    decoded = AvailabilityMatrix.from_wire(json.loads(compact), grid)
+    assert decoded.days == days and decoded.masks == matrix.masks
+
+    def decode_labels():
+        return {
+            equipment_id: [grid.mask_from_labels(slots) for slots in by_day.values()]
+            for equipment_id, by_day in json.loads(labels).items()
+        }
+
+    compact_enc = best_of(encode_compact, args.rounds)
+    labels_enc = best_of(encode_labels, args.rounds)
+    compact_dec = best_of(lambda: AvailabilityMatrix.from_wire(json.loads(compact), grid), args.rounds)
+    labels_dec = best_of(decode_labels, args.rounds)
+
+    # ---------------- Fan-in ----------------
+    async def concurrent_calendars():
+        await asyncio.gather(*(
+            service.fetch_equipment_availability(days, equipment_id, schedule) for equipment_id in equipment_ids))
+
+    async def one_by_one():
+        await asyncio.gather(*(
+            service.fetch_availability_matrix([equipment_id], days, schedule) for equipment_id in equipment_ids))
+
+    single = await service.fetch_equipment_availability(days, equipment_ids[0], schedule)
+    assert single.days == matrix.availability(equipment_ids[0]).days
+
+    service.availability_batcher.stats.update(requests=0, batches=0, coalesced=0, largest_batch=0)
+    batched_time = await best_of_async(concurrent_calendars, args.rounds)
+    batcher = dict(service.availability_batcher.stats)
+    single_time = await best_of_async(one_by_one, args.rounds)
+
+    # ---------------- Fan-in pela rede ----------------
+    # O backend simulado responde com a matriz do próprio índice; o bot passa a buscar pela API
+    local_matrix = service.fetch_availability_matrix
+    labels_by_date = {day.isoformat(): label for label, day in day_dates.items()}
+
+    async def availability_endpoint(request: web.Request):
+        body = await request.json()
+        found = await local_matrix([UUID(e) for e in body["equipment_ids"]],
+                                   [labels_by_date[d] for d in body["days"]], schedule)
+        return web.json_response(found.to_wire(day_dates))
+
+    stub = StubAPI(latency=args.latency)
+    stub.app.router.add_post("/reservation/availability", availability_endpoint)
+    await stub.start()
+    client = APIClient(stub.url)
+    await client.start()
+
+    async def remote_matrix(equipment_ids, next_days=None, schedule=schedule):
+        data = await client.post(f"{service.base_route}/availability", json={
+            "equipment_ids": [str(e) for e in equipment_ids],
+            "days": [schedule.day_date(d).isoformat() for d in next_days]})
+        return AvailabilityMatrix.from_wire(data, schedule.grid)
+
+    service.fetch_availability_matrix = remote_matrix
+    remote = await service.fetch_equipment_availability(days, equipment_ids[0], schedule)
+    assert remote.days == single.days
+    remote_batched = await best_of_async(concurrent_calendars, args.rounds)
+    remote_single = await best_of_async(one_by_one, args.rounds)
+    pool = client.transport.connection_limit_per_host
+
+    await client.close()
+    await stub.stop()
+    await storage.close()
+
+    print(f"📦 {args.equipment} equipamentos x {len(days)} dias, {len(batch)} reservas, "
+          f"{grid.slot_count} slots/dia")
+    print(f"{'formato':<16}{'bytes':>12}{'encode (ms)':>13}{'decode (ms)':>13}")
+    print(f"{'HH:MM por dia':<16}{len(labels):>12}{labels_enc * 1000:>13.1f}{labels_dec * 1000:>13.1f}")
+    print(f"{'matriz base64':<16}{len(compact):>12}{compact_enc * 1000:>13.1f}{compact_dec * 1000:>13.1f}")
+    print(f"  {len(labels) / len(compact):.1f}x menor no fio")
+
+    print(f"\n{args.equipment} calendários abertos juntos:")
+    print(f"{'caminho':<18}{'buscas':>8}{'tempo (ms)':>12}")
+    print(f"{'um a um':<18}{args.equipment:>8}{single_time * 1000:>12.1f}")
+    print(f"{'micro-batcher':<18}{batcher['batches'] // args.rounds:>8}{batched_time * 1000:>12.1f}")
+    print(f"  maior lote: {batcher['largest_batch']}, pedidos: {batcher['requests']}")
+
+    print(f"\npela API (latência {args.latency * 1000:.0f} ms, {pool} conexões por host):")
+    print(f"{'caminho':<18}{'requisições':>12}{'tempo (ms)':>12}")
+    print(f"{'um a um':<18}{args.equipment:>12}{remote_single * 1000:>12.1f}")
+    print(f"{'micro-batcher':<18}{1:>12}{remote_batched * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
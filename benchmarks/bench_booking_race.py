@@ -0,0 +1,128 @@
+"""
+Corrida de reservas: centenas de usuários simulados disputando os mesmos horários de poucos equipamentos.
+
+Cada usuário faz o fluxo do bot: lê a versão da agenda + horários ocupados, "pensa" um pouco, tenta reservar
+um horário livre com `expected_version` e, se perder a disputa (ReservationConflictError), relê a agenda e
+tenta de novo. No fim confere que não há duas reservas ativas sobrepostas no mesmo equipamento.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_booking_race [--users 500] [--equipment 3] [--attempts 5] [--storage sqlite]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from models.reservation import ReservationPayload
+from services.reservation_service import ReservationConflictError, ReservationService
+from services.storage import ACTIVE_STATUSES, MemoryStorage, SQLiteStorage
+from utils.datetime_utils import to_epoch_minutes
+
+
+async def user(service: ReservationService, schedule, equipment_ids, attempts: int, rng: random.Random, stats):
+    equipment_id = rng.choice(equipment_ids)
+    next_days = schedule.bookable_days()[:2]  # poucos dias: todo mundo disputa os mesmos horários
+    minutes = schedule.config.min_reservation
+
+    for _ in range(attempts):
+        version = service.availability_version(equipment_id)
+        unavailable = await service.fetch_unavailable_slots(next_days, equipment_id, schedule)
+        free = [(day, label) for day in next_days for label in schedule.slot_labels
+                if label not in unavailable[day]]
+        if not free:
+            stats["sem vaga"] += 1
+            return
+
+        day, label = rng.choice(free)
+        await asyncio.sleep(rng.random() * 0.002)  # tempo entre ver o calendário e clicar
+
+        start = datetime.combine(schedule.day_date(day), schedule.slot_time(label))
+        payload = ReservationPayload(
+            status="approved",
+            start=start,
+            end=start + timedelta(minutes=minutes),
+            equipment_id=equipment_id,
+            user_id=uuid4())
+        t0 = time.perf_counter()
+        try:
+            await service.create_reservation(payload, expected_version=version)
+        except ReservationConflictError:
+            stats["conflitos"] += 1
+            continue
+        finally:
+            stats["latências"].append(time.perf_counter() - t0)
+        stats["reservas"] += 1
+        return
+    stats["desistências"] += 1
+
+
+def double_bookings(reservations) -> int:
+    by_equipment = defaultdict(list)
+    for r in reservations:
+        if r.status in ACTIVE_STATUSES:
+            by_equipment[r.equipment_id].append((to_epoch_minutes(r.start), to_epoch_minutes(r.end)))
+    overlaps = 0
+    for intervals in by_equipment.values():
+        intervals.sort()
+        for (_, prev_end), (start, _) in zip(intervals, intervals[1:]):
+            if start < prev_end:
+                overlaps += 1
+    return overlaps
+
+
+async def main():
+    from loguru import logger
+    logger.remove()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--equipment", type=int, default=3)
+    parser.add_argument("--attempts", type=int, default=5)
+    parser.add_argument("--storage", choices=("memory", "sqlite"), default="sqlite")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "race.db")) if args.storage == "sqlite" else MemoryStorage()
+        await storage.start()
+        service = ReservationService(None, storage)
+        await service.start()
+        schedule = await service.get_reservation_schedule()
+
+        rng = random.Random(args.seed)
+        equipment_ids = [uuid4() for _ in range(args.equipment)]
+        stats = defaultdict(int)
+        stats["latências"] = []
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(
+            user(service, schedule, equipment_ids, args.attempts, random.Random(rng.random()), stats)
+            for _ in range(args.users)))
+        elapsed = time.perf_counter() - t0
+
+        reservations = await storage.list_reservations()
+        await storage.close()
+
+    overlaps = double_bookings(reservations)
+    latencies = sorted(stats["latências"])
+    print(f"👥 {args.users} usuários, {args.equipment} equipamentos, {len(schedule.slot_labels) * 2} horários cada "
+          f"({args.storage})")
+    print(f"reservas feitas:      {stats['reservas']}")
+    print(f"conflitos detectados: {stats['conflitos']} (fotos velhas: {service.stats['stale_snapshots']})")
+    print(f"sem vaga / desistiu:  {stats['sem vaga']} / {stats['desistências']}")
+    print(f"tempo total:          {elapsed:.2f}s ({stats['reservas'] / elapsed:.0f} reservas/s)")
+    if latencies:
+        print(f"create_reservation:   p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f} ms")
+    print(f"reservas sobrepostas: {overlaps}")
+    assert overlaps == 0, "reserva dupla detectada"
+    assert len(reservations) == stats["reservas"]
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
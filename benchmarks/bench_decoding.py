@@ -0,0 +1,118 @@
+"""
+Decodificação de 10k reservas (JSON da API → ReservationResponse).
+
+Compara:
+- atual:   json.loads + ReservationResponse(**item) item a item
+- adapter: json_loads (orjson se instalado) + TypeAdapter(List[ReservationResponse]) em cache
+- json:    TypeAdapter.validate_json direto nos bytes (parse + validação no pydantic-core)
+
+E, com valores já tipados (UUID/datetime, como saem da storage), o caminho "confiável" sem validação
+(model_construct item a item) contra o mesmo TypeAdapter.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_decoding [--count 10000] [--rounds 5]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from models.reservation import ReservationResponse
+from utils.decoding import decode_json_list, decode_list, json_loads, orjson
+
+STATUSES = ("approved", "pending", "rejected")
+
+
+def payload(count: int, rng: random.Random) -> bytes:
+    now = datetime.now(timezone.utc)
+    equipment_ids = [str(uuid4()) for _ in range(50)]
+    items = []
+    for _ in range(count):
+        start = now + timedelta(hours=rng.randrange(24 * 365))
+        items.append({
+            "id": str(uuid4()),
+            "user_id": str(uuid4()),
+            "equipment_id": rng.choice(equipment_ids),
+            "responsible_id": str(uuid4()) if rng.random() < 0.5 else None,
+            "start": start.isoformat(),
+            "end": (start + timedelta(hours=rng.randint(1, 2))).isoformat(),
+            "status": rng.choice(STATUSES),
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+            "deleted_at": None,
+        })
+    return json.dumps(items).encode()
+
+
+def current(raw: bytes):
+    return [ReservationResponse(**item) for item in json.loads(raw)]
+
+
+def adapter(raw: bytes):
+    return decode_list(ReservationResponse, json_loads(raw))
+
+
+def from_json(raw: bytes):
+    return decode_json_list(ReservationResponse, raw)
+
+
+def typed(raw: bytes):
+    rows = json.loads(raw)
+    for row in rows:
+        for key in ("id", "user_id", "equipment_id", "responsible_id"):
+            row[key] = UUID(row[key]) if row[key] else None
+        for key in ("start", "end", "created_at", "updated_at"):
+            row[key] = datetime.fromisoformat(row[key])
+    return rows
+
+
+def construct(rows):
+    return [ReservationResponse.model_construct(**row) for row in rows]
+
+
+def validated(rows):
+    return decode_list(ReservationResponse, rows)
+
+
+def timed(fn, raw, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(raw)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = payload(args.count, random.Random(42))
+    print(f"📦 {args.count} reservas, {len(raw) / 1024:.0f} KiB de JSON (orjson: {'sim' if orjson else 'não'})")
+
+    # Todos os caminhos precisam produzir os mesmos modelos
+    expected = [r.model_dump() for r in current(raw)]
+    assert [r.model_dump() for r in adapter(raw)] == expected
+    assert [r.model_dump() for r in from_json(raw)] == expected
+
+    baseline = timed(current, raw, args.rounds)
+    print(f"{'caminho':<12}{'tempo (ms)':>12}{'µs/reserva':>12}{'ganho':>8}")
+    for name, fn in (("atual", current), ("adapter", adapter), ("json", from_json)):
+        elapsed = baseline if fn is current else timed(fn, raw, args.rounds)
+        print(f"{name:<12}{elapsed * 1000:>12.1f}{elapsed / args.count * 1e6:>12.2f}{baseline / elapsed:>7.1f}x")
+
+    rows = typed(raw)
+    assert [r.model_dump() for r in construct(rows)] == [r.model_dump() for r in validated(rows)]
+    baseline = timed(construct, rows, args.rounds)
+    print("\n🧾 valores já tipados")
+    for name, fn in (("construct", construct), ("adapter", validated)):
+        elapsed = baseline if fn is construct else timed(fn, rows, args.rounds)
+        print(f"{name:<12}{elapsed * 1000:>12.1f}{elapsed / args.count * 1e6:>12.2f}{baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Primeiro horário livre em qualquer equipamento (`!proximo`): 200 equipamentos x 30 dias úteis.
+
+Compara:
+- por equipamento: o calendário de cada equipamento como antes (uma consulta ao storage cada) + varredura
+                   dos "HH:MM" livres
+- em lote:         find_earliest_slots (ocupação de todos pelo índice em memória + busca em bitmask)
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_earliest_fit [--equipment 200] [--days 30] [--blocks 2] [--occupancy 0.8]
+        [--storage sqlite|memory] [--rounds 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from models.reservation import ReservationResponse
+from services.reservation_service import ReservationService
+from services.storage import MemoryStorage, SQLiteStorage
+
+
+async def seed(storage, schedule, equipment_ids, days, occupancy: float, rng: random.Random) -> int:
+    now = datetime.now(timezone.utc)
+    hours = range(schedule.config.opening_time.hour, schedule.config.closing_time.hour)
+    batch = []
+    for equipment_id in equipment_ids:
+        for label in days:
+            day = schedule.day_date(label)
+            for hour in hours:
+                if rng.random() < occupancy:
+                    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+                    batch.append(ReservationResponse(
+                        id=uuid4(), user_id=uuid4(), equipment_id=equipment_id, responsible_id=None,
+                        start=start, end=start + timedelta(hours=1), status=rng.choice(("approved", "pending")),
+                        created_at=now, updated_at=now, deleted_at=None))
+    await storage.add_reservations(batch)
+    return len(batch)
+
+
+async def unavailable_from_storage(storage, schedule, days, equipment_id):
+    """
+    fetch_unavailable_slots como era antes: consulta no storage e lista de "HH:MM" ocupados por dia.
+    """
+    grid = schedule.grid
+    first, last = schedule.day_date(days[0]), schedule.day_date(days[-1])
+    reservations = await storage.reservations_overlapping(
+        equipment_id, datetime.combine(first, datetime.min.time()),
+        datetime.combine(last + timedelta(days=1), datetime.min.time()))
+    masks = dict.fromkeys(days, 0)
+    by_date = {schedule.day_date(label): label for label in days}
+    for r in reservations:
+        label = by_date.get(r.start.date())
+        if label is not None:
+            opening = datetime.combine(r.start.date(), schedule.config.opening_time)
+            masks[label] |= grid.mask_between(
+                int((r.start - opening).total_seconds() // 60), int((r.end - opening).total_seconds() // 60))
+    return {label: grid.labels_from_mask(mask) for label, mask in masks.items()}
+
+
+async def per_equipment(storage, schedule, equipment_ids, days, blocks: int, limit: int):
+    """
+    Como seria sem a busca em lote: um calendário por equipamento, procurando a sequência nos rótulos.
+    """
+    labels = schedule.slot_labels
+    found = []
+    for equipment_id in equipment_ids:
+        unavailable = await unavailable_from_storage(storage, schedule, days, equipment_id)
+        for day_number, label in enumerate(days):
+            taken = set(unavailable[label])
+            run = 0
+            for slot, time_str in enumerate(labels):
+                run = 0 if time_str in taken else run + 1
+                if run == blocks:
+                    found.append((day_number, slot - blocks + 1, str(equipment_id)))
+                    break
+            else:
+                continue
+            break
+    found.sort()
+    return [(days[d], schedule.slot_label(s), e) for d, s, e in found[:limit]]
+
+
+def timed_async(fn, rounds: int) -> float:
+    async def run():
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await fn()
+            best = min(best, time.perf_counter() - started)
+        return best
+    return run()
+
+
+async def main():
+    from loguru import logger
+    logger.remove()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--equipment", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--blocks", type=int, default=2)
+    parser.add_argument("--occupancy", type=float, default=0.8, help="fração das horas já reservadas")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--storage", choices=("sqlite", "memory"), default="sqlite")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "fit.db")) if args.storage == "sqlite" else MemoryStorage()
+        await storage.start()
+        service = ReservationService(None, storage)
+        schedule = await service.get_reservation_schedule()
+        days = schedule.bookable_days(max_days=args.days)
+        equipment_ids = [uuid4() for _ in range(args.equipment)]
+        total = await seed(storage, schedule, equipment_ids, days, args.occupancy, random.Random(3))
+        await service.start()
+
+        batched = await service.find_earliest_slots(equipment_ids, args.blocks, schedule, args.limit, args.days)
+        expected = await per_equipment(storage, schedule, equipment_ids, days, args.blocks, args.limit)
+        assert [(s.date, s.start, str(s.equipment_id)) for s in batched] == expected, (batched, expected)
+
+        old = await timed_async(
+            lambda: per_equipment(storage, schedule, equipment_ids, days, args.blocks, args.limit), args.rounds)
+        new = await timed_async(
+            lambda: service.find_earliest_slots(equipment_ids, args.blocks, schedule, args.limit, args.days),
+            args.rounds)
+        await storage.close()
+
+    print(f"🔎 {args.equipment} equipamentos x {len(days)} dias, {total} reservas ({args.storage}), "
+          f"{args.blocks} blocos seguidos")
+    print(f"{'caminho':<18}{'consultas':>10}{'tempo (ms)':>12}{'ganho':>8}")
+    print(f"{'por equipamento':<18}{args.equipment:>10}{old * 1000:>12.1f}{1:>7.1f}x")
+    print(f"{'em lote':<18}{0:>10}{new * 1000:>12.1f}{old / new:>7.1f}x")
+    print("\nsugestões:")
+    for s in batched:
+        print(f"  {s.date} {s.start}-{s.end}  {s.equipment_id}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
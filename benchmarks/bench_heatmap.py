@@ -0,0 +1,132 @@
+"""
+Mapa de ocupação semanal do calendário: custo de renderização e aproveitamento do cache.
+
+Mede:
+- renderização: tempo por imagem (dias x slots) e tamanho do PNG
+- cache: aberturas de calendário intercaladas com reservas novas (parte delas em semanas fora do
+  calendário). Compara renderizar sempre, uma chave pela versão do equipamento inteiro
+  (availability_version, toda reserva invalida todas as semanas) e a chave por semana
+  (availability_week_version).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_heatmap [--equipment 20] [--opens 5000] [--writes 500] [--far 0.7] [--renders 2000]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from cogs.reservation_manager import ReservationManager
+from models.reservation import ReservationResponse
+from services.reservation_service import ReservationService
+from services.storage import MemoryStorage
+from utils.heatmap import HeatmapCache, render_week_heatmap
+
+
+def week_rows(schedule, availability, monday):
+    labels = [(monday + timedelta(days=i)).strftime("%d/%m/%Y") for i in range(7)]
+    in_calendar = tuple(label in availability.days for label in labels)
+    return in_calendar, [availability.occupied(label) if shown else None for label, shown in zip(labels, in_calendar)]
+
+
+async def open_calendar(service, schedule, cache: HeatmapCache, equipment_id, per_week: bool):
+    """
+    O que show_available_dates faz com os mapas, com a chave por semana ou pela versão do equipamento.
+    """
+    next_days = schedule.bookable_days()
+    weeks = ReservationManager.calendar_weeks(schedule, next_days)
+    versions = {
+        week: service.availability_week_version(equipment_id, week) if per_week
+        else service.availability_version(equipment_id)
+        for week in weeks}
+    availability = await service.fetch_equipment_availability(next_days, equipment_id, schedule)
+    for week, monday in weeks.items():
+        in_calendar, rows = week_rows(schedule, availability, monday)
+        await cache.get((equipment_id, week), (versions[week], schedule.version, in_calendar),
+                        render_week_heatmap, schedule.grid.slot_count, rows)
+
+
+def booking(equipment_id, schedule, far: bool, rng: random.Random) -> ReservationResponse:
+    now = datetime.now(timezone.utc)
+    # Perto: dentro do calendário; longe: semanas depois (reservas feitas fora do bot, vindas do backend)
+    offset = rng.randint(21, 120) if far else rng.randint(0, 9)
+    day = datetime.combine(datetime.now().date() + timedelta(days=offset), schedule.config.opening_time)
+    start = day + timedelta(hours=rng.randint(0, 10))
+    return ReservationResponse(
+        id=uuid4(), user_id=uuid4(), equipment_id=equipment_id, responsible_id=None,
+        start=start, end=start + timedelta(hours=1), status="approved",
+        created_at=now, updated_at=now, deleted_at=None)
+
+
+async def run_workload(args, per_week: bool, cache_size: int):
+    storage = MemoryStorage()
+    await storage.start()
+    service = ReservationService(None, storage)
+    schedule = await service.get_reservation_schedule()
+    equipment_ids = [uuid4() for _ in range(args.equipment)]
+    cache = HeatmapCache(max_size=cache_size)
+    rng = random.Random(11)
+
+    # Reservas espalhadas entre as aberturas, na mesma proporção do começo ao fim
+    steps = ["open"] * args.opens + ["write"] * args.writes
+    rng.shuffle(steps)
+    started = time.perf_counter()
+    for step in steps:
+        equipment_id = rng.choice(equipment_ids)
+        if step == "open":
+            await open_calendar(service, schedule, cache, equipment_id, per_week)
+        else:
+            await service.apply_remote(booking(equipment_id, schedule, rng.random() < args.far, rng))
+    elapsed = time.perf_counter() - started
+    await storage.close()
+    return cache.metrics(), elapsed
+
+
+async def main():
+    from loguru import logger
+    logger.remove()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--equipment", type=int, default=20)
+    parser.add_argument("--opens", type=int, default=5000)
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--far", type=float, default=0.7, help="fração das reservas em semanas fora do calendário")
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    # ---------------- Renderização ----------------
+    rng = random.Random(3)
+    storage = MemoryStorage()
+    await storage.start()
+    schedule = await ReservationService(None, storage).get_reservation_schedule()
+    await storage.close()
+    slot_count = schedule.grid.slot_count
+    samples, sizes = [], []
+    for _ in range(args.renders):
+        rows = [rng.getrandbits(slot_count) for _ in range(5)] + [None, None]
+        started = time.perf_counter()
+        image = render_week_heatmap(slot_count, rows)
+        samples.append(time.perf_counter() - started)
+        sizes.append(len(image))
+    samples.sort()
+
+    print(f"🖼️ semana de 7 dias x {slot_count} slots, {args.renders} imagens")
+    print(f"render: p50 {samples[len(samples) // 2] * 1000:.2f} ms, "
+          f"p95 {samples[int(len(samples) * 0.95)] * 1000:.2f} ms, PNG médio {statistics.mean(sizes) / 1024:.1f} KiB")
+
+    # ---------------- Cache ----------------
+    print(f"\n{args.equipment} equipamentos, {args.opens} aberturas de calendário, {args.writes} reservas "
+          f"({args.far * 100:.0f}% fora do calendário)")
+    print(f"{'chave':<22}{'acerto':>8}{'renders':>9}{'tempo (s)':>11}")
+    modes = (("sem cache", True, 0), ("versão do equipamento", False, args.equipment * 4),
+             ("versão da semana", True, args.equipment * 4))
+    for label, per_week, cache_size in modes:
+        metrics, elapsed = await run_workload(args, per_week, cache_size)
+        print(f"{label:<22}{metrics['hit_rate'] * 100:>7.1f}%{metrics['renders']:>9}{elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Memória por reserva (tracemalloc): ReservationResponse (pydantic) x ReservationRecord (__slots__),
+soltos em uma lista e dentro do ReservationIndex.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_memory [--count 50000]
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from models.reservation import ReservationRecord, ReservationResponse
+from utils.interval_index import ReservationIndex
+
+STATUSES = ("approved", "pending", "rejected")
+
+
+def responses(count: int, rng: random.Random):
+    equipment_ids = [uuid4() for _ in range(100)]
+    user_ids = [uuid4() for _ in range(2000)]
+    first = datetime(2025, 1, 1, 8)
+    for _ in range(count):
+        # Cada reserva com objetos próprios, como chegam da API / do banco
+        start = first + timedelta(hours=rng.randrange(24 * 365))
+        created = datetime.now(timezone.utc)
+        yield ReservationResponse(
+            id=uuid4(),
+            user_id=str(rng.choice(user_ids)),
+            equipment_id=str(rng.choice(equipment_ids)),
+            responsible_id=str(uuid4()) if rng.random() < 0.5 else None,
+            start=start.isoformat(),
+            end=(start + timedelta(hours=rng.randint(1, 2))).isoformat(),
+            status=rng.choice(STATUSES),
+            created_at=created.isoformat(),
+            updated_at=created.isoformat(),
+            deleted_at=None,
+        )
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=50_000)
+    args = parser.parse_args()
+    count = args.count
+
+    results = {
+        "lista de ReservationResponse": measure(lambda: list(responses(count, random.Random(1)))),
+        "lista de ReservationRecord": measure(
+            lambda: [ReservationRecord.from_response(r) for r in responses(count, random.Random(1))]),
+    }
+
+    def index_of_responses():
+        # Mesmo layout do índice, guardando os modelos pydantic (como era antes)
+        index = ReservationIndex()
+        kept = []
+        for r in responses(count, random.Random(1)):
+            index.upsert(r)
+            kept.append(r)
+        return index, kept
+
+    def index_of_records():
+        index = ReservationIndex()
+        for r in responses(count, random.Random(1)):
+            index.upsert(r)
+        return index
+
+    results["índice + modelos pydantic"] = measure(index_of_responses)
+    results["índice só com records"] = measure(index_of_records)
+
+    print(f"🧮 {count} reservas")
+    print(f"{'estrutura':<32}{'MiB':>10}{'bytes/reserva':>16}")
+    for name, size in results.items():
+        print(f"{name:<32}{size / 2**20:>10.1f}{size / count:>16.0f}")
+
+    saving = results["lista de ReservationResponse"] / results["lista de ReservationRecord"]
+    print(f"\nReservationRecord ocupa {saving:.1f}x menos que ReservationResponse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Carga ponta a ponta do fluxo de reserva: usuários virtuais percorrendo o ReservationManager
+(!reservar → equipamento → dia → início → fim → aprovação) com Context/Interaction falsos,
+sem Discord e sem rede externa.
+
+Os serviços são os de verdade (storage, índice, cache de usuários, outbox). A API é o benchmarks/stub_api:
+o bot assina o stream de eventos dele, e `--external-rate` publica reservas feitas "por fora"
+(outros clientes do backend), que invalidam a disponibilidade no meio do fluxo.
+
+Mede p50/p95/p99 por etapa, vazão (reservas concluídas/s) e o pico de RSS do processo.
+Com `--fail-p95 <ms>` termina com erro se alguma etapa passar do limite (para barrar regressões).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_reservation_flow [--users 500] [--equipment 10] [--think 0.05]
+        [--storage memory|sqlite] [--external-rate 20] [--fail-p95 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from benchmarks.stub_api import StubAPI
+from cogs.reservation_manager import ReservationManager
+from models.equipment import EquipmentResponse
+from services.api_client import APIClient
+from services.equipment_service import EquipmentService
+from services.outbox import Outbox
+from services.reservation_events import CREATED, ReservationEventStream
+from services.reservation_service import ReservationService
+from services.storage import MemoryStorage, SQLiteStorage
+from services.user_service import UserService
+from utils.guild_index import GuildIndex
+from utils.schedule import DEFAULT_APPROVER_ROLE
+from views.buttons import DateButton, EquipmentButton, TimeButton
+
+GUILD_ID = 1
+STEPS = ("!reservar", "equipamento", "dia", "início", "fim", "aprovação")
+
+
+# ---------------- Objetos falsos do Discord ----------------
+class FakeRole:
+    def __init__(self, role_id: int, name: str):
+        self.id = role_id
+        self.name = name
+
+
+class FakeUser:
+    def __init__(self, user_id: int, roles=()):
+        self.id = user_id
+        self.name = self.global_name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.roles = list(roles)
+
+    async def send(self, content=None, embed=None, view=None):
+        pass
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, name: str):
+        self.id = channel_id
+        self.name = name
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def send(self, content=None, embed=None, view=None):
+        await self.messages.put(FakeMessage(content, embed, view))
+
+
+class FakeGuild:
+    def __init__(self, channels, roles):
+        self.id = GUILD_ID
+        self.channels = channels
+        self.roles = roles
+
+
+class FakeMessage:
+    def __init__(self, content=None, embed=None, view=None):
+        self.content = content
+        self.embed = embed
+        self.view = view
+
+    async def edit(self, content=None, embed=None, view=None):
+        self.view = view
+
+
+class FakeResponse:
+    def __init__(self):
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, ephemeral: bool = False, thinking: bool = False):
+        self._done = True
+
+    async def send_message(self, content=None, embed=None, view=None, ephemeral: bool = False):
+        self._done = True
+
+
+class FakeInteraction:
+    """
+    Um clique: a resposta edita a mensagem do fluxo (a mesma entre as etapas, como a efêmera do bot).
+    """
+
+    def __init__(self, user: FakeUser, message: FakeMessage):
+        self.user = user
+        self.guild_id = GUILD_ID
+        self.message = message
+        self.response = FakeResponse()
+
+    async def edit_original_response(self, content=None, embed=None, view=None, embeds=None, attachments=None):
+        self.message.content = content
+        self.message.embed = embeds[0] if embeds else embed
+        self.message.view = view
+
+
+class FakeContext:
+    def __init__(self, author: FakeUser, guild: FakeGuild, channel: FakeChannel):
+        self.author = author
+        self.guild = guild
+        self.channel = channel
+        self.message: Optional[FakeMessage] = None
+
+    async def send(self, content=None, embed=None, view=None, ephemeral: bool = False, **kwargs):
+        self.message = FakeMessage(content, embed, view)
+
+
+# ---------------- Usuários virtuais ----------------
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    async def step(self, name: str, coro):
+        started = time.perf_counter()
+        await coro
+        self.latencies[name].append(time.perf_counter() - started)
+
+
+def buttons(message: FakeMessage, kind) -> list:
+    if message.view is None:
+        return []
+    return [b for b in message.view.children if isinstance(b, kind) and not b.disabled]
+
+
+async def think(rng: random.Random, mean: float):
+    if mean > 0:
+        await asyncio.sleep(rng.expovariate(1 / mean))
+
+
+async def virtual_user(cog: ReservationManager, guild, channel, user: FakeUser, rng: random.Random,
+                       think_time: float, attempts: int, recorder: Recorder):
+    ctx = FakeContext(user, guild, channel)
+    # Fora do bot o comando não está ligado ao cog: chama o callback direto
+    await recorder.step("!reservar", cog.show_equipment.callback(cog, ctx))
+    await think(rng, think_time)
+
+    message = FakeMessage()
+    equipment = rng.choice(buttons(ctx.message, EquipmentButton))
+    await recorder.step("equipamento", equipment.callback(FakeInteraction(user, message)))
+
+    for _ in range(attempts):
+        days = buttons(message, DateButton)
+        if not days:
+            recorder.counts["sem vaga"] += 1
+            return
+        await think(rng, think_time)
+        await recorder.step("dia", rng.choice(days).callback(FakeInteraction(user, message)))
+
+        starts = buttons(message, TimeButton)
+        if not starts:
+            recorder.counts["dia cheio"] += 1
+            continue
+        await think(rng, think_time)
+        await recorder.step("início", rng.choice(starts).callback(FakeInteraction(user, message)))
+
+        ends = buttons(message, TimeButton)
+        await think(rng, think_time)
+        await recorder.step("fim", rng.choice(ends).callback(FakeInteraction(user, message)))
+
+        if buttons(message, DateButton):
+            # Perdeu a disputa: o calendário voltou atualizado
+            recorder.counts["conflitos"] += 1
+            continue
+        recorder.counts["reservas"] += 1
+        return
+    recorder.counts["desistências"] += 1
+
+
+async def approver(channel: FakeChannel, teacher: FakeUser, recorder: Recorder):
+    while True:
+        message = await channel.messages.get()
+        try:
+            # O canal também recebe os avisos de "aprovada por"; só os pedidos têm botões
+            if message.view is not None:
+                approve = next(b for b in message.view.children if b.label.startswith("Aprovar"))
+                await recorder.step("aprovação", approve.callback(FakeInteraction(teacher, message)))
+                recorder.counts["aprovadas"] += 1
+        finally:
+            channel.messages.task_done()
+
+
+async def external_bookings(stub: StubAPI, equipment_ids, rate: float, rng: random.Random):
+    """
+    Reservas feitas por outros clientes do backend, chegando ao bot pelo stream de eventos.
+    """
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    while True:
+        await asyncio.sleep(rng.expovariate(rate))
+        start = today + timedelta(days=rng.randrange(1, 8), hours=rng.randrange(8, 20))
+        now = datetime.now(timezone.utc).isoformat()
+        await stub.publish(CREATED, {
+            "id": str(uuid4()), "user_id": str(uuid4()), "equipment_id": str(rng.choice(equipment_ids)),
+            "responsible_id": None, "start": start.isoformat(), "end": (start + timedelta(hours=1)).isoformat(),
+            "status": "approved", "created_at": now, "updated_at": now, "deleted_at": None,
+        })
+
+
+# ---------------- Relatório ----------------
+def percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux em KiB, macOS em bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+async def main():
+    from loguru import logger
+    logger.remove()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--equipment", type=int, default=10)
+    parser.add_argument("--think", type=float, default=0.05, help="tempo médio (s) entre cliques")
+    parser.add_argument("--attempts", type=int, default=5, help="tentativas por usuário depois de conflitos")
+    parser.add_argument("--storage", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument("--external-rate", type=float, default=20.0, help="reservas externas por segundo (0 desliga)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="latência (s) do stub da API")
+    parser.add_argument("--fail-p95", type=float, default=None, help="limite (ms) do p95 de qualquer etapa")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    stub = StubAPI(latency=args.api_latency, seed=args.seed)
+    await stub.start()
+    client = APIClient(stub.url)
+    await client.start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "flow.db")) if args.storage == "sqlite" else MemoryStorage()
+        await storage.start()
+        now = datetime.now(timezone.utc)
+        for i in range(args.equipment):
+            await storage.add_equipment(EquipmentResponse(
+                id=uuid4(), name=f"Impressora 3D {i:02d}", description="bench", status="available",
+                created_at=now, updated_at=now, deleted_at=None))
+
+        reservation_service = ReservationService(client, storage)
+        equipment_service = EquipmentService(client, storage)
+        user_service = UserService(client)
+        outbox = Outbox(batch_window=0.01)
+        events = ReservationEventStream(client, reservation_service, poll_interval=1.0)
+        await equipment_service.start()
+        await reservation_service.start()
+        events.start()
+        outbox.start()
+
+        reservations_channel = FakeChannel(10, "📅reservations")
+        approval_channel = FakeChannel(11, "📝pending-approval")
+        teacher_role = FakeRole(20, DEFAULT_APPROVER_ROLE)
+        guild = FakeGuild([reservations_channel, approval_channel], [teacher_role])
+        guild_index = GuildIndex()
+        guild_index.index_guild(guild)
+        cog = ReservationManager(None, user_service, reservation_service, equipment_service, outbox, guild_index,
+                                 max_sessions=args.users * 2)
+
+        recorder = Recorder()
+        equipment_ids = [e.id for e in await equipment_service.get_equipments()]
+        background = [asyncio.create_task(approver(approval_channel, FakeUser(999, [teacher_role]), recorder))]
+        if args.external_rate > 0:
+            background.append(asyncio.create_task(
+                external_bookings(stub, equipment_ids, args.external_rate, random.Random(rng.random()))))
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            virtual_user(cog, guild, reservations_channel, FakeUser(1000 + i), random.Random(rng.random()),
+                         args.think, args.attempts, recorder)
+            for i in range(args.users)), return_exceptions=True)
+        await outbox.close()
+        await approval_channel.messages.join()
+        elapsed = time.perf_counter() - started
+
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await events.close()
+        await storage.close()
+    await client.close()
+    await stub.stop()
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    counts = recorder.counts
+    print(f"👥 {args.users} usuários, {args.equipment} equipamentos, think {args.think * 1000:.0f} ms "
+          f"({args.storage}, {args.external_rate:g} reservas externas/s)")
+    print(f"{'etapa':<14}{'n':>7}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}")
+    worst_p95 = 0.0
+    for step in STEPS:
+        values = sorted(recorder.latencies[step])
+        p95 = percentile(values, 0.95) * 1000
+        worst_p95 = max(worst_p95, p95)
+        print(f"{step:<14}{len(values):>7}{percentile(values, 0.5) * 1000:>10.2f}{p95:>10.2f}"
+              f"{percentile(values, 0.99) * 1000:>10.2f}")
+    print(f"\nreservas: {counts['reservas']} (aprovadas: {counts['aprovadas']}), conflitos: {counts['conflitos']}, "
+          f"sem vaga: {counts['sem vaga']}, desistências: {counts['desistências']}, erros: {len(errors)}")
+    print(f"eventos externos aplicados: {events.stats['events']}")
+    heatmaps = cog.heatmaps.metrics()
+    print(f"mapas semanais: {heatmaps['renders']} renderizados, acerto no cache {heatmaps['hit_rate'] * 100:.0f}%, "
+          f"{heatmaps['avg_render_ms']:.2f} ms por imagem")
+    print(f"tempo total: {elapsed:.2f}s, vazão: {counts['reservas'] / elapsed:.0f} reservas/s")
+    print(f"pico de RSS: {peak_rss_mib():.0f} MiB")
+
+    if errors:
+        raise errors[0]
+    if args.fail_p95 is not None and worst_p95 > args.fail_p95:
+        print(f"❌ p95 de {worst_p95:.2f} ms acima do limite de {args.fail_p95:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
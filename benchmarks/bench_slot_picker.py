@@ -0,0 +1,144 @@
+"""
+Seletor de horários / dias (views/slot_picker) contra o antigo "um botão por opção".
+
+Para cada configuração (intervalo dos slots x horizonte de reserva) mede:
+- componentes: botões + menus + opções dos menus, linhas usadas e se cabe no limite do Discord
+  (5 linhas, 25 componentes, 25 opções por menu)
+- bytes do payload de componentes (JSON que vai na edição da mensagem)
+- tempo para montar a View a partir da disponibilidade já calculada
+- interações para chegar num horário (clique + eventuais trocas de grupo/página)
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_slot_picker [--busy 0.4] [--repeat 200]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from discord.ui import Button, Select, View
+
+from utils.availability import get_slot_grid
+from utils.schedule import WEEKDAY_NAMES
+from views.buttons import DateButton, TimeButton
+from views.slot_picker import MAX_BUTTONS, MAX_SELECT_OPTIONS, PickerOption, SlotPicker
+
+MAX_ROWS = 5
+
+
+async def noop(interaction, value=None):
+    pass
+
+
+def time_options(interval: int, busy: float, rng: random.Random):
+    grid = get_slot_grid(datetime(2026, 10, 19, 8, 0), datetime(2026, 10, 19, 21, 0), interval)
+    occupied = 0
+    for slot in range(grid.slot_count):
+        if rng.random() < busy:
+            occupied |= 1 << slot
+    return [
+        PickerOption(label, label, grid.is_free(occupied, slot), group=f"{label[:2]}h")
+        for slot, label in enumerate(grid.slot_labels())
+    ], TimeButton
+
+
+def date_options(days: int, busy: float, rng: random.Random):
+    options = []
+    for n in range(days):
+        day = date(2026, 10, 19) + timedelta(days=n)
+        monday = day - timedelta(days=day.weekday())
+        options.append(PickerOption(
+            day.strftime("%d/%m/%Y"), day.strftime("%d/%m/%Y"), rng.random() >= busy / 4,
+            group=f"Semana de {monday:%d/%m}", description=WEEKDAY_NAMES[day.weekday()]))
+    return options, DateButton
+
+
+def legacy_buttons(options, button_factory):
+    """
+    O que as telas faziam antes: um botão por opção. Passa de 25 sem avisar (o Discord recusa a mensagem).
+    """
+    return [button_factory(option.label, option.available, noop) for option in options]
+
+
+def component_count(view: View):
+    buttons = sum(isinstance(item, Button) for item in view.children)
+    selects = [item for item in view.children if isinstance(item, Select)]
+    return buttons + len(selects), max((len(s.options) for s in selects), default=0)
+
+
+def payload_bytes(items) -> int:
+    """
+    Tamanho do JSON dos componentes: botões em linhas de 5, cada menu na sua linha.
+    """
+    rows, buttons = [], []
+    for item in items:
+        if isinstance(item, Button):
+            buttons.append(item.to_component_dict())
+            if len(buttons) == 5:
+                rows.append(buttons)
+                buttons = []
+        else:
+            rows.append([item.to_component_dict()])
+    if buttons:
+        rows.append(buttons)
+    return len(json.dumps([{"type": 1, "components": row} for row in rows], ensure_ascii=False).encode())
+
+
+def clicks_to_pick(picker: SlotPicker, target: int) -> int:
+    """
+    Interações até escolher a opção `target`: página + grupo + opção, quando há menus.
+    """
+    if not picker.groups:
+        return 1
+    group = next(g for g, (_, indexes) in enumerate(picker.groups) if target in indexes)
+    clicks = 1
+    if len(picker.groups) > 1 and group != picker.group:
+        clicks += 1
+        clicks += abs(group // MAX_SELECT_OPTIONS - picker.group // MAX_SELECT_OPTIONS)
+    return clicks
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--busy", type=float, default=0.4, help="fração dos slots ocupados")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    configs = [
+        ("horários, 60 min", time_options(60, args.busy, rng)),
+        ("horários, 30 min", time_options(30, args.busy, rng)),
+        ("horários, 15 min", time_options(15, args.busy, rng)),
+        ("horários, 5 min", time_options(5, args.busy, rng)),
+        ("dias, 7", date_options(7, args.busy, rng)),
+        ("dias, 90", date_options(90, args.busy, rng)),
+        ("dias, 365", date_options(365, args.busy, rng)),
+        ("dias, 1000", date_options(1000, args.busy, rng)),
+    ]
+
+    print(f"{'configuração':<20}{'opções':>7} | {'antigo: comp.':>13}{'bytes':>8}{'cabe':>6} | "
+          f"{'seletor: comp.':>14}{'linhas':>7}{'máx. opç.':>10}{'bytes':>8}{'montar (ms)':>12}{'cliques':>9}")
+    for label, (options, factory) in configs:
+        legacy = legacy_buttons(options, factory)
+        legacy_count = len(legacy)
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            picker = SlotPicker(options, noop, factory)
+        build_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+        count, widest = component_count(picker)
+        rows = {item.row for item in picker.children} if picker.groups else {i // 5 for i in range(count)}
+        assert len(rows) <= MAX_ROWS and count <= MAX_BUTTONS and widest <= MAX_SELECT_OPTIONS, label
+
+        available = [i for i, option in enumerate(options) if option.available]
+        clicks = max((clicks_to_pick(picker, i) for i in available), default=0)
+        print(f"{label:<20}{len(options):>7} | {legacy_count:>13}{payload_bytes(legacy):>8}"
+              f"{'sim' if legacy_count <= MAX_BUTTONS else 'não':>6} | "
+              f"{count:>14}{len(rows):>7}{widest:>10}{payload_bytes(picker.children):>8}{build_ms:>12.3f}{clicks:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Consultas de disponibilidade sobre o SQLiteStorage com 10k, 100k e 1M reservas.
+
+Mede:
+- sql: storage.reservations_overlapping direto no banco (a janela do calendário de um equipamento)
+- índice: fetch_unavailable_slots depois de ReservationService.start() carregar o índice em memória,
+  que é o caminho do bot; mais o tempo dessa carga
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_storage [--sizes 10000 100000 1000000] [--queries 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+from services.reservation_service import ReservationService
+from services.storage import SQLiteStorage
+from utils.datetime_utils import to_epoch_minutes
+
+EQUIPMENT = 100
+STATUSES = ("approved", "pending", "rejected")
+
+
+def reservation_rows(count: int, equipment_ids, first_day: date, rng: random.Random):
+    now = datetime.now(timezone.utc).isoformat()
+    # ~13 reservas por equipamento por dia, espalhadas ao longo do histórico
+    days = max(1, count // (len(equipment_ids) * 13))
+    for _ in range(count):
+        day = first_day + timedelta(days=rng.randrange(days))
+        start = to_epoch_minutes(datetime.combine(day, datetime.min.time())) + 60 * rng.randrange(8, 20)
+        yield (
+            str(uuid4()), str(uuid4()), str(rng.choice(equipment_ids)), None,
+            start, start + 60 * rng.randint(1, 2), rng.choice(STATUSES), now, now, None,
+        )
+
+
+async def seed(storage: SQLiteStorage, count: int, equipment_ids, first_day: date, rng: random.Random):
+    batch = []
+    for row in reservation_rows(count, equipment_ids, first_day, rng):
+        batch.append(row)
+        if len(batch) == 50_000:
+            await storage.db.executemany(
+                f"INSERT INTO reservation ({storage.RESERVATION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    if batch:
+        await storage.db.executemany(
+            f"INSERT INTO reservation ({storage.RESERVATION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    await storage.db.commit()
+    storage.max_duration = 120
+
+
+async def bench(count: int, queries: int):
+    rng = random.Random(count)
+    equipment_ids = [uuid4() for _ in range(EQUIPMENT)]
+    first_day = date(2024, 1, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "bench.db"))
+        await storage.start()
+        t0 = time.perf_counter()
+        await seed(storage, count, equipment_ids, first_day, rng)
+        seed_time = time.perf_counter() - t0
+
+        service = ReservationService(None, storage)
+        schedule = await service.get_reservation_schedule()
+        history_days = max(1, count // (EQUIPMENT * 13))
+        lookups = []
+        for _ in range(queries):
+            today = first_day + timedelta(days=rng.randrange(history_days))
+            lookups.append((schedule.bookable_days(today), rng.choice(equipment_ids)))
+
+        sql = []
+        for next_days, equipment_id in lookups:
+            start = datetime.combine(schedule.day_date(next_days[0]), schedule.config.opening_time)
+            end = datetime.combine(schedule.day_date(next_days[-1]), schedule.config.closing_time)
+            t0 = time.perf_counter()
+            await storage.reservations_overlapping(equipment_id, start, end)
+            sql.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        await service.start()
+        load_time = time.perf_counter() - t0
+
+        indexed = []
+        for next_days, equipment_id in lookups:
+            t0 = time.perf_counter()
+            await service.fetch_unavailable_slots(next_days, equipment_id, schedule)
+            indexed.append((time.perf_counter() - t0) * 1000)
+
+        await storage.close()
+
+    return seed_time, load_time, percentiles(sql), percentiles(indexed)
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+async def main():
+    from loguru import logger
+    logger.remove()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'reservas':>10} {'seed (s)':>9} | {'sql p50':>8} {'sql p95':>8} | "
+          f"{'carga índice (s)':>16} {'índice p50':>11} {'índice p95':>11}  (ms)")
+    for count in args.sizes:
+        seed_time, load_time, (sql_p50, sql_p95), (idx_p50, idx_p95) = await bench(count, args.queries)
+        print(f"{count:>10} {seed_time:>9.1f} | {sql_p50:>8.2f} {sql_p95:>8.2f} | "
+              f"{load_time:>16.1f} {idx_p50:>11.2f} {idx_p95:>11.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
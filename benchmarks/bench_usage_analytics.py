@@ -0,0 +1,170 @@
+"""
+Relatório de uso (`!uso`) de um mês: 200 equipamentos, ~40 mil reservas.
+
+Compara:
+- laço:      ocupação por slot / dia da semana e médias somando reserva a reserva em ReservationResponse
+- vetorizado: ReservationArrays (colunas NumPy a partir do índice) + compute_usage
+- processo:   o mesmo relatório pelo UsageAnalytics com arrays em thread e contas em outro processo
+              (inclui o envio dos arrays) e a maior pausa do event loop enquanto ele roda
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_usage_analytics [--equipment 200] [--days 30] [--occupancy 0.5] [--rounds 3]
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+
+from models.reservation import ReservationResponse
+from services.reservation_service import ReservationService
+from services.storage import MemoryStorage
+from services.usage_analytics import UsageAnalytics
+
+
+def seed(schedule, equipment_ids, first: date, days: int, occupancy: float, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    hours = range(schedule.config.opening_time.hour, schedule.config.closing_time.hour)
+    batch = []
+    for equipment_id in equipment_ids:
+        for d in range(days):
+            day = first + timedelta(days=d)
+            for hour in hours:
+                if rng.random() < occupancy:
+                    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+                    created = now - timedelta(hours=rng.randint(1, 200))
+                    batch.append(ReservationResponse(
+                        id=uuid4(), user_id=uuid4(), equipment_id=equipment_id, responsible_id=None,
+                        start=start, end=start + timedelta(minutes=rng.choice((60, 120))),
+                        status=rng.choice(("approved", "approved", "pending", "rejected")),
+                        created_at=created, updated_at=created + timedelta(minutes=rng.randint(0, 600)),
+                        deleted_at=None))
+    return batch
+
+
+def loop_usage(reservations, equipment_ids, first: date, days: int, schedule):
+    """
+    A mesma conta feita em Python puro, uma reserva e um slot por vez.
+    """
+    config = schedule.config
+    interval = config.min_reservation
+    slot_count = schedule.grid.slot_count
+    position = {e: i for i, e in enumerate(equipment_ids)}
+    booked = [0] * len(equipment_ids)
+    heat = [[0] * slot_count for _ in range(7)]
+    counts = [[0, 0, 0] for _ in equipment_ids]
+    lead = [[0.0, 0] for _ in equipment_ids]
+    cells = {}
+    window_start = datetime.combine(first, datetime.min.time())
+    window_end = window_start + timedelta(days=days)
+
+    for r in reservations:
+        i = position[r.equipment_id]
+        if window_start <= r.start < window_end:
+            counts[i][("pending", "approved", "rejected").index(r.status)] += 1
+            lead[i][0] += max((r.start.replace(tzinfo=timezone.utc) - r.created_at).total_seconds(), 0) / 3600
+            lead[i][1] += 1
+        if r.status != "approved":
+            continue
+        # Só os dias que a reserva atravessa (dentro da janela)
+        first_touched = max(r.start.date(), first)
+        last_touched = min(r.end.date(), first + timedelta(days=days - 1))
+        for d in range((last_touched - first_touched).days + 1):
+            day = first_touched + timedelta(days=d)
+            if not schedule.is_bookable(day):
+                continue
+            opening = datetime.combine(day, config.opening_time)
+            closing = datetime.combine(day, config.closing_time)
+            for slot in range(slot_count):
+                a = opening + timedelta(minutes=slot * interval)
+                b = min(a + timedelta(minutes=interval), closing)
+                overlap = (min(b, r.end) - max(a, r.start)).total_seconds() / 60
+                if overlap > 0:
+                    key = (i, day, slot)
+                    cells[key] = min(cells.get(key, 0) + overlap, (b - a).total_seconds() / 60)
+
+    # Reservas sobrepostas do mesmo equipamento não passam de 100% do slot
+    for (i, day, slot), minutes in cells.items():
+        booked[i] += minutes
+        heat[day.weekday()][slot] += minutes
+    return booked, heat, counts, lead
+
+
+async def main():
+    from loguru import logger
+    logger.remove()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--equipment", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--occupancy", type=float, default=0.5, help="fração das horas com reserva")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    storage = MemoryStorage()
+    await storage.start()
+    service = ReservationService(None, storage)
+    schedule = await service.get_reservation_schedule()
+    first = date.today().replace(day=1)
+    last = first + timedelta(days=args.days - 1)
+    equipment_ids = [uuid4() for _ in range(args.equipment)]
+    reservations = seed(schedule, equipment_ids, first, args.days, args.occupancy, random.Random(5))
+    await storage.add_reservations(reservations)
+    await service.start()
+
+    inline = UsageAnalytics(service, process_threshold=10 ** 12)
+    offloaded = UsageAnalytics(service, process_threshold=0)
+    report = await inline.usage_report(first, last, equipment_ids)
+
+    booked, heat, counts, _ = loop_usage(reservations, equipment_ids, first, args.days, schedule)
+    assert np.allclose(report.booked_minutes, booked)
+    assert np.array_equal(report.counts, np.array(counts))
+
+    async def best_of(fn):
+        best = float("inf")
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            await fn()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    async def loop():
+        loop_usage(reservations, equipment_ids, first, args.days, schedule)
+
+    loop_time = await best_of(loop)
+    inline_time = await best_of(lambda: inline.usage_report(first, last, equipment_ids))
+    await offloaded.usage_report(first, last, equipment_ids)  # sobe o processo fora da medição
+    process_time = await best_of(lambda: offloaded.usage_report(first, last, equipment_ids))
+
+    # Quanto o event loop fica parado durante o relatório em outro processo
+    stalls = []
+
+    async def ticker():
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - started - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    stalls.clear()
+    await offloaded.usage_report(first, last, equipment_ids)
+    tick.cancel()
+
+    await inline.close()
+    await offloaded.close()
+    await storage.close()
+
+    print(f"📊 {args.equipment} equipamentos x {args.days} dias, {len(reservations)} reservas")
+    print(f"{'caminho':<14}{'tempo (ms)':>12}{'ganho':>8}")
+    print(f"{'laço':<14}{loop_time * 1000:>12.1f}{1:>7.1f}x")
+    print(f"{'vetorizado':<14}{inline_time * 1000:>12.1f}{loop_time / inline_time:>7.1f}x")
+    print(f"{'processo':<14}{process_time * 1000:>12.1f}{loop_time / process_time:>7.1f}x")
+    print(f"\nmaior pausa do event loop com o relatório em outro processo: {max(stalls) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+Servidor aiohttp local que imita a API do bot, com injeção de latência e erros.
+
+Também publica eventos de reserva em GET /reservation/events: SSE (com Last-Event-ID) quando o cliente
+pede text/event-stream, ou a lista JSON dos eventos depois de `?after=<seq>` para polling.
+
+Uso como script:
+    python -m benchmarks.stub_api --port 8080 --latency 0.05 --error-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+
+class StubAPI:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: Optional[int] = None,
+                 heartbeat: float = 15.0, event_log_size: int = 10_000):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.down = False
+        # Só o SSE fora do ar (o polling em JSON continua respondendo)
+        self.streaming_down = False
+        self.requests: Dict[str, int] = {}
+        self.rng = random.Random(seed)
+        self.heartbeat = heartbeat
+        self.event_log_size = event_log_size
+        self.events: List[Dict[str, Any]] = []
+        self.sequence = 0
+        self.streams = 0
+        self._published = asyncio.Condition()
+        self._generation = 0
+        self.app = web.Application(middlewares=[self._chaos])
+        self.app.router.add_get("/reservation/events", self._events)
+        # Rotas extras (ex.: de um benchmark) entram em self.app.router antes de start(); o eco fica por último
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self.app.router.add_route("*", "/{tail:.*}", self._echo)
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.drop_streams()
+        if self._runner:
+            await self._runner.cleanup()
+
+    # ---------------- Eventos ----------------
+    async def publish(self, event: str, data: Dict[str, Any]) -> int:
+        self.sequence += 1
+        self.events.append({"id": str(self.sequence), "event": event, "data": data})
+        del self.events[:-self.event_log_size]
+        async with self._published:
+            self._published.notify_all()
+        return self.sequence
+
+    async def drop_streams(self):
+        """
+        Derruba os streams abertos (os clientes devem reconectar com Last-Event-ID).
+        """
+        self._generation += 1
+        async with self._published:
+            self._published.notify_all()
+
+    def _events_after(self, after: Optional[str]) -> List[Dict[str, Any]]:
+        after = int(after) if after else 0
+        return [e for e in self.events if int(e["id"]) > after]
+
+    async def _events(self, request: web.Request):
+        if "text/event-stream" not in request.headers.get("Accept", ""):
+            return web.json_response(self._events_after(request.query.get("after")))
+        if self.streaming_down:
+            return web.json_response({"detail": "stream unavailable"}, status=503)
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        generation = self._generation
+        last = request.headers.get("Last-Event-ID")
+        self.streams += 1
+        try:
+            while generation == self._generation:
+                for event in self._events_after(last):
+                    await response.write(
+                        f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n".encode())
+                    last = event["id"]
+                async with self._published:
+                    # Conferido com o lock: um publish entre a escrita e o wait não se perde
+                    if generation != self._generation or self._events_after(last):
+                        continue
+                    try:
+                        await asyncio.wait_for(self._published.wait(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        await response.write(b": heartbeat\n\n")
+        except ConnectionResetError:
+            pass
+        finally:
+            self.streams -= 1
+        return response
+
+    @web.middleware
+    async def _chaos(self, request: web.Request, handler):
+        key = f"{request.method} {request.path}"
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.down or self.rng.random() < self.error_rate:
+            return web.json_response({"detail": "injected error"}, status=self.error_status)
+        return await handler(request)
+
+    async def _echo(self, request: web.Request):
+        etag = f'"{request.path}"'
+        if request.method == "GET" and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        body = await request.json() if request.can_read_body else None
+        return web.json_response({"path": request.path, "method": request.method, "body": body},
+                                 headers={"ETag": etag})
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    stub = StubAPI(port=args.port, latency=args.latency, jitter=args.jitter,
+                   error_rate=args.error_rate, error_status=args.error_status)
+    await stub.start()
+    print(f"Stub API em {stub.url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,24 +1,33 @@
 from loguru import logger
 
-from discord import Member, utils
+from discord import Guild, Member, Role, abc
 from discord.ext.commands import Cog, Bot
 
 from models.user import UserPayload
 from services.api_client import APIClient
+from services.member_registration import MemberRegistration
 from services.user_service import UserService
+from utils.guild_index import GuildIndex
 
 
 class EventsManager(Cog):
     bot: Bot
     _api_client: APIClient
 
-    def __init__(self, bot, user_service):
+    def __init__(self, bot, user_service, guild_index, member_registration):
         self.bot: Bot = bot
         self.user_service: UserService = user_service     
+        self.guild_index: GuildIndex = guild_index
+        self.member_registration: MemberRegistration = member_registration
 
     @Cog.listener()
     async def on_ready(self):
         logger.info(f"✅ Bot online as {self.bot.user}")
+        self.guild_index.index_guilds(self.bot.guilds)
+        logger.info(f"🗂️ Índice de canais e cargos montado para {len(self.guild_index)} guilds")
+
+        for guild in self.bot.guilds:
+            await self.warm_up_users(guild)
     
         try:
             info = await self.bot._api_client.info()
@@ -32,25 +41,65 @@ class EventsManager(Cog):
     @Cog.listener()
     async def on_member_join(self, member: Member):
         logger.info(f"👤 Novo membro entrou: {member.name} ({member.id})")
-        welcome_channel = utils.get(member.guild.text_channels, name="welcome")
-
-        if welcome_channel:
-            await welcome_channel.send(
-                f"🎉 Bem-vindo(a) {member.mention} ao servidor!\n"
-                "Sinta-se à vontade para explorar os canais e participar com a gente! 💛"
-            )
-        else:
+        welcome_channel = self.guild_index.channel(member.guild.id, name="welcome")
+        if not welcome_channel:
             logger.warning("⚠️ Canal 'welcome' não encontrado.")
+
+        # Boas-vindas e cadastro na API saem em lote (ver MemberRegistration)
+        self.member_registration.submit(member, welcome_channel)
+
+    async def warm_up_users(self, guild: Guild):
+        """
+        Carrega os membros da guild no cache do UserService com buscas em lote.
+        """
         try:
-            await self.user_service.create_user(
-            UserPayload(
-                member_id=str(member.id),
-                full_name=member.name,
-                username=member.global_name,
-                created_at=member.joined_at,
-            ))
+            await self.user_service.warm_up(
+                UserPayload(
+                    member_id=str(member.id),
+                    full_name=member.name,
+                    username=member.global_name or member.name,
+                )
+                for member in guild.members if not member.bot)
         except Exception as e:
-            logger.exception(f"❌ Erro ao registrar usuário na API: {e}")
+            logger.exception(f"❌ Erro ao aquecer o cache de usuários da guild {guild.id}: {e}")
+
+    # ---------------- Índice de canais e cargos ----------------
+    @Cog.listener()
+    async def on_guild_join(self, guild: Guild):
+        self.guild_index.index_guild(guild)
+        await self.warm_up_users(guild)
+
+    @Cog.listener()
+    async def on_guild_available(self, guild: Guild):
+        self.guild_index.index_guild(guild)
+
+    @Cog.listener()
+    async def on_guild_remove(self, guild: Guild):
+        self.guild_index.remove_guild(guild.id)
+
+    @Cog.listener()
+    async def on_guild_channel_create(self, channel: abc.GuildChannel):
+        self.guild_index.add_channel(channel)
+
+    @Cog.listener()
+    async def on_guild_channel_delete(self, channel: abc.GuildChannel):
+        self.guild_index.remove_channel(channel)
+
+    @Cog.listener()
+    async def on_guild_channel_update(self, before: abc.GuildChannel, after: abc.GuildChannel):
+        self.guild_index.update_channel(before, after)
+
+    @Cog.listener()
+    async def on_guild_role_create(self, role: Role):
+        self.guild_index.add_role(role)
+
+    @Cog.listener()
+    async def on_guild_role_delete(self, role: Role):
+        self.guild_index.remove_role(role)
+
+    @Cog.listener()
+    async def on_guild_role_update(self, before: Role, after: Role):
+        self.guild_index.update_role(before, after)
 
 
 async def setup(bot):
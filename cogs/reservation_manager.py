@@ -1,47 +1,104 @@
-from datetime import datetime
-from typing import Dict, List, Optional
+import asyncio
+import csv
+import io
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set
 
 from loguru import logger
 
-from discord import ButtonStyle, Color, Embed, Forbidden, utils
-from discord.ext.commands import Bot, Cog, command, Context
+from discord import ButtonStyle, Color, Embed, File, HTTPException
+from discord.ext.commands import Bot, Cog, command, Context, flag, FlagConverter
 from discord.ui import Button, View
 
 from models.equipment import EquipmentResponse
-from models.reservation import BotConfig, ReservationPayload, UserReservationState
+from models.reservation import ReservationPayload, ReservationQuery, UserReservationState
 from models.user import UserPayload, UserResponse
 
 from services.equipment_service import EquipmentService
-from services.reservation_service import ReservationService
+from services.outbox import Outbox
+from services.reservation_service import ReservationConflictError, ReservationService
 from services.user_service import UserService
-from utils.datetime_utils import (
-    generate_next_days,
-    generate_possible_end_times,
-    generate_time_slots,
-    get_available_time_slots,
-)
+from utils.datetime_utils import epoch_week
+from utils.guild_index import GuildIndex
+from utils.heatmap import HeatmapCache, render_week_heatmap
+from utils.schedule import WEEKDAY_NAMES
+from utils.session_store import SessionStore
 from views.buttons import DateButton, EquipmentButton, TimeButton
-from views.pagination_reservation import PaginatedReservationView
+from views.pagination_reservation import build_reservation_page
+from views.slot_picker import MAX_BUTTONS, PickerOption, SlotPicker, truncate
 
 
+RESERVATION_STATUSES = ("pending", "approved", "rejected")
+
+# O filtro de equipamento vai no custom_id dos botões de página (máx. 100 caracteres)
+EQUIPMENT_FILTER_MAX = 40
+
+# Status de equipamento que aceitam reserva (`!proximo status:...`)
+BOOKABLE_EQUIPMENT_STATUSES = ("available", "in_use")
+SUGGESTIONS_MAX = 10
+
+# Mapas de ocupação semanais anexados ao calendário (cada um vira um embed; o limite é 10 por mensagem)
+HEATMAP_WEEKS_MAX = 4
+
+
+class ReservationFilters(FlagConverter, delimiter=":", prefix="", case_insensitive=True):
+    data: Optional[str] = flag(default=None, positional=True)
+    ate: Optional[str] = flag(default=None)
+    equipamento: Optional[str] = flag(default=None)
+    status: Optional[str] = flag(default=None)
+
+
+class NextSlotFilters(FlagConverter, delimiter=":", prefix="", case_insensitive=True):
+    equipamento: Optional[str] = flag(default=None, positional=True)
+    blocos: int = flag(default=1)
+    status: Optional[str] = flag(default=None)
+    quantidade: int = flag(default=5)
+
 
 class ReservationManager(Cog):
-    config: BotConfig
-    user_states: Dict[int, UserReservationState]
+    user_states: SessionStore[UserReservationState]
 
-    def __init__(self, bot, user_service, reservation_service, equipment_service):
+    def __init__(self, bot, user_service, reservation_service, equipment_service, outbox, guild_index,
+                 max_sessions: int = 1000, session_idle_ttl: float = 900.0, heatmap_cache_size: int = 256):
         self.reservation_service: ReservationService = reservation_service        
         self.equipment_service: EquipmentService = equipment_service        
         self.user_service: UserService = user_service        
-        self.user_states = {}
+        self.outbox: Outbox = outbox
+        self.guild_index: GuildIndex = guild_index
+        self.user_states = SessionStore(UserReservationState, max_size=max_sessions, idle_ttl=session_idle_ttl)
+        self.heatmaps = HeatmapCache(max_size=heatmap_cache_size)
+        self._tasks: Set[asyncio.Task] = set()
         self.bot: Bot = bot
 
+    async def get_state(self, interaction) -> Optional[UserReservationState]:
+        """
+        Busca a sessão do usuário. Se ela expirou (ou foi descartada), avisa o usuário e retorna None.
+        A interação já deve ter sido reconhecida (defer).
+        """
+        state = self.user_states.get(interaction.user.id)
+        if state is None:
+            await interaction.edit_original_response(
+                content="⌛ Sua sessão de reserva expirou. Use `!reservar` para começar de novo.", embed=None, view=None)
+        return state
+
+    async def acknowledge(self, interaction, new_message: bool = False):
+        """
+        Reconhece a interação na hora (antes de qualquer chamada de rede) para não estourar os 3s do Discord.
+        Com `new_message` abre a mensagem efêmera do fluxo; senão a próxima etapa edita a mensagem do botão.
+        """
+        if not interaction.response.is_done():
+            if new_message:
+                await interaction.response.defer(ephemeral=True, thinking=True)
+            else:
+                await interaction.response.defer()
+
     # ---------------- Command to open ReservationManager ----------------
     @command(name='reservar')
     async def show_equipment(self, ctx: Context):
-        self.config = await self.reservation_service.get_reservation_config()
+        schedule = await self.reservation_service.get_reservation_schedule(ctx.guild.id if ctx.guild else None)
+        config = schedule.config
 
-        reservation_chanel = self.config.reservation_chanel
+        reservation_chanel = config.reservation_chanel
         if reservation_chanel and ctx.channel.name != reservation_chanel:
             await ctx.send(f"⚠️ Este comando só pode ser usado no canal '{reservation_chanel}'.", delete_after=10)
             return
@@ -56,168 +113,266 @@ class ReservationManager(Cog):
 
         for equipment in equipments:
             async def on_click(interaction, e=equipment):
-                user_id = interaction.user.id
-                if user_id not in self.user_states:
-                    self.user_states[user_id] = UserReservationState()
-
-                state = self.user_states[user_id]
+                # Cada fluxo de reserva vive em uma única mensagem efêmera, editada a cada etapa
+                await self.acknowledge(interaction, new_message=True)
+                state = self.user_states.get_or_create(interaction.user.id)
                 async with state.lock:
+                    state.config = config
+                    state.schedule = schedule
+                    state.guild_id = interaction.guild_id
                     state.equipment_name = e.name
                     state.equipment_id = e.id
 
-                await self.show_available_dates(interaction)
+                await self.show_available_dates(interaction, state)
 
             view.add_item(EquipmentButton(equipment, on_click))
 
         await ctx.send(embed=embed, view=view, ephemeral=True)
 
     # ---------------- Show calendar ----------------
-    async def show_available_dates(self, interaction):
-        state = self.user_states[interaction.user.id]
-            
-        view = View()
+    async def show_available_dates(self, interaction, state: UserReservationState, notice: Optional[str] = None):
         embed = Embed(
             title=f"📅 Dias disponiveis para {state.equipment_name}",
             description="Escolha um dia para fazer uma reserva",
             color=Color.blue()
         )
 
-        next_days = generate_next_days(
-            holidays={h.date() for h in set(self.config.holidays)},
-            allowed_weekdays=set(self.config.days_of_week),
-            max_days=self.config.max_reservation_days,
-            start=datetime.today(),
-        )
-
-        unavailable_time_slots_by_date = (
-            await self.reservation_service.fetch_unavailable_slots(next_days, state.equipment_id))
+        next_days = state.schedule.bookable_days()
+        weeks = self.calendar_weeks(state.schedule, next_days)
+
+        # Lidas antes da busca: se alguém reservar no meio, a versão já não bate e a reserva é conferida
+        # (e o mapa da semana é refeito na próxima vez)
+        version = self.reservation_service.availability_version(state.equipment_id)
+        week_versions = {
+            week: self.reservation_service.availability_week_version(state.equipment_id, week) for week in weeks}
+        availability = await self.reservation_service.fetch_equipment_availability(
+            next_days, state.equipment_id, state.schedule)
+
+        async with state.lock:
+            state.availability = availability
+            state.availability_version = version
+            state.screen += 1
+            screen = state.screen
+
+        async def on_pick(interaction, d):
+            await self.acknowledge(interaction)
+            state = await self.get_state(interaction)
+            if state is None:
+                return
+            async with state.lock:
+                state.date = d
+                state.screen += 1
+            await self.show_available_times(interaction, state)
 
+        options = []
         for date_str in next_days:
-            unavailable_time_slots = unavailable_time_slots_by_date.get(date_str, [])
-
-            available_time_slots = get_available_time_slots(
-                start_time=datetime.strptime(self.config.opening_time.strftime("%H:%M"), "%H:%M"),
-                end_time=datetime.strptime(self.config.closing_time.strftime("%H:%M"), "%H:%M"),
-                interval=self.config.min_reservation,
-                unavailable_time_slots=unavailable_time_slots,)
-
-            async def on_click(interaction, d=date_str, u=unavailable_time_slots):
-                state = self.user_states[interaction.user.id]
-                async with state.lock:
-                    state.unavailable_time_slots = u
-                    state.date = d
-                await self.show_available_times(interaction)
-
-            view.add_item(DateButton(date_str, available_time_slots, on_click))
+            day = state.schedule.day_date(date_str)
+            monday = day - timedelta(days=day.weekday())
+            options.append(PickerOption(
+                date_str, date_str, not availability.is_fully_booked(date_str),
+                group=f"Semana de {monday:%d/%m}", description=WEEKDAY_NAMES[day.weekday()]))
+        async def on_cancel(interaction):
+            await self.acknowledge(interaction)
+            self.user_states.pop(interaction.user.id)
+            await interaction.edit_original_response(content="Reserva cancelada.", embed=None, view=None)
+
+        view = SlotPicker(options, on_pick, DateButton, placeholder="Escolha o dia", group_placeholder="Escolha a semana",
+                          on_back=on_cancel, back_label="Cancelar")
+        if view.empty:
+            embed.description = "Nenhum dia livre no período de reservas."
+
+        heatmaps = []
+        for week, monday in weeks.items():
+            labels = [(monday + timedelta(days=i)).strftime("%d/%m/%Y") for i in range(7)]
+            in_calendar = tuple(label in availability.days for label in labels)
+            key = (state.equipment_id, week)
+            stamp = (week_versions[week], state.schedule.version, in_calendar)
+            rows = [availability.occupied(label) if shown else None for label, shown in zip(labels, in_calendar)]
+            heatmaps.append((monday, key, stamp, rows))
+
+        images = [self.heatmaps.cached(key, stamp) for _, key, stamp, _ in heatmaps]
+        if all(image is not None for image in images):
+            embeds, files = self.heatmap_embeds(state.schedule, heatmaps, images)
+            await interaction.edit_original_response(
+                content=notice, embeds=[embed, *embeds], view=view, attachments=files)
+            return
 
-        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        # Os dias aparecem já; os mapas que faltam são renderizados em segundo plano e entram depois
+        await interaction.edit_original_response(content=notice, embed=embed, view=view)
+        self._spawn(self.attach_heatmaps(interaction, state, screen, notice, embed, view, heatmaps))
+
+    async def attach_heatmaps(self, interaction, state: UserReservationState, screen: int, notice, embed, view,
+                              heatmaps):
+        grid = state.schedule.grid
+        images = await asyncio.gather(*(
+            self.heatmaps.get(key, stamp, render_week_heatmap, grid.slot_count, rows)
+            for _, key, stamp, rows in heatmaps))
+        embeds, files = self.heatmap_embeds(state.schedule, heatmaps, images)
+
+        # Sob o lock: um clique num dia espera esta edição e, se já clicou, a tela não é mais o calendário
+        async with state.lock:
+            if state.screen != screen:
+                return
+            try:
+                await interaction.edit_original_response(
+                    content=notice, embeds=[embed, *embeds], view=view, attachments=files)
+            except HTTPException as e:
+                logger.warning(f"⚠️ Não foi possível anexar o mapa de ocupação: {e}")
+
+    @staticmethod
+    def heatmap_embeds(schedule, heatmaps, images):
+        embeds, files = [], []
+        for (monday, _, _, _), image in zip(heatmaps, images):
+            filename = f"semana_{monday:%Y%m%d}.png"
+            files.append(File(io.BytesIO(image), filename=filename))
+            embeds.append(Embed(
+                title=f"🗓️ Semana de {monday:%d/%m}",
+                description=(f"🟩 livre · 🟥 ocupado · ⬜ fechado\n"
+                             f"Linhas: Seg → Dom · Colunas: {schedule.slot_labels[0]} → {schedule.slot_labels[-1]}"),
+                color=Color.blue()).set_image(url=f"attachment://{filename}"))
+        return embeds, files
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def calendar_weeks(schedule, next_days: List[str]) -> Dict[int, date]:
+        """
+        Semanas (epoch_week -> segunda-feira) que têm dias no calendário, no máximo HEATMAP_WEEKS_MAX.
+        """
+        weeks: Dict[int, date] = {}
+        for label in next_days:
+            day = schedule.day_date(label)
+            week = epoch_week(day)
+            if week not in weeks:
+                if len(weeks) == HEATMAP_WEEKS_MAX:
+                    break
+                weeks[week] = day - timedelta(days=day.weekday())
+        return weeks
 
     # ---------------- Show times ----------------
-    async def show_available_times(self, interaction):
-        state = self.user_states[interaction.user.id]
-
+    async def show_available_times(self, interaction, state: UserReservationState):
         embed = Embed(
             title=f"⏰ Escolha o horário de início em {state.date}",
             description="Depois escolha o horário de término",
             color=Color.green()
         )
-        view = View()
+        grid = state.availability.grid
+        occupied = state.availability.occupied(state.date)
 
-        time_slots = generate_time_slots(
-            start_time=datetime.strptime(self.config.opening_time.strftime("%H:%M"), "%H:%M"),
-            end_time=datetime.strptime(self.config.closing_time.strftime("%H:%M"), "%H:%M"),
-            interval=self.config.min_reservation,)
-
-        for time_str in time_slots:
-            available = time_str not in state.unavailable_time_slots
-    
-            async def on_click(interaction, t=time_str):
-                state = self.user_states[interaction.user.id]
-                async with state.lock:
-                    state.start_time = t
-                await self.show_end_time_options(interaction)
+        async def on_pick(interaction, t):
+            await self.acknowledge(interaction)
+            state = await self.get_state(interaction)
+            if state is None:
+                return
+            async with state.lock:
+                state.start_time = t
+            await self.show_end_time_options(interaction, state)
+
+        options = [
+            PickerOption(time_str, time_str, grid.is_free(occupied, slot), group=f"{time_str[:2]}h")
+            for slot, time_str in enumerate(grid.slot_labels())
+        ]
+        async def on_back(interaction):
+            await self.acknowledge(interaction)
+            state = await self.get_state(interaction)
+            if state is None:
+                return
+            await self.show_available_dates(interaction, state)
 
-            view.add_item(TimeButton(time_str, available, on_click))
+        view = SlotPicker(options, on_pick, TimeButton, placeholder="Horário de início", group_placeholder="Escolha a hora",
+                          on_back=on_back)
+        if len(options) > MAX_BUTTONS:
+            # Nos menus só entram os horários livres: as faixas resumem o dia inteiro
+            runs = ", ".join(f"{grid.labels[a]}–{grid.labels[b]}" for a, b in grid.free_runs(occupied))
+            embed.add_field(name="Livre", value=truncate(runs, 1024) if runs else "Sem horários livres neste dia.")
 
-        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        await interaction.edit_original_response(content=None, embed=embed, view=view)
 
     # ---------------- Choose end time ----------------
-    async def show_end_time_options(self, interaction):
-        state = self.user_states[interaction.user.id]
-
+    async def show_end_time_options(self, interaction, state: UserReservationState):
         embed = Embed(
             title=f"📌 Reserva em {state.date}",
             description=f"Início: {state.start_time}\nAgora escolha o horário de término:",
             color=Color.purple()
         )
-        view = View()
-
-        possible_ends = generate_possible_end_times(
-            end_time=datetime.strptime(self.config.closing_time.strftime("%H:%M"), "%H:%M"),
-            current=datetime.strptime(state.start_time, "%H:%M"),
-            blocks=self.config.max_reservation_blocks,
-            unavailable_time_slots=state.unavailable_time_slots,
-            interval=self.config.min_reservation,)
+        possible_ends = state.availability.possible_end_times(
+            state.date, state.start_time, state.config.max_reservation_blocks)
 
-        for t_end in possible_ends:
-            async def on_click(interaction, h=t_end):
-                state = self.user_states[interaction.user.id]
-                async with state.lock:
-                    state.end_time = h
-                await self.reserve_slot(interaction)
+        async def on_pick(interaction, h):
+            await self.acknowledge(interaction)
+            state = await self.get_state(interaction)
+            if state is None:
+                return
+            async with state.lock:
+                state.end_time = h
+            await self.reserve_slot(interaction, state)
 
-            view.add_item(TimeButton(t_end, True, on_click))
+        options = [PickerOption(t_end, t_end, True, group=f"{t_end[:2]}h") for t_end in possible_ends]
+        view = SlotPicker(options, on_pick, TimeButton, placeholder="Horário de término", group_placeholder="Escolha a hora")
 
-        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        await interaction.edit_original_response(content=None, embed=embed, view=view)
 
     # ---------------- Reserve slot ----------------
-    async def reserve_slot(self, interaction):
-        state = self.user_states[interaction.user.id]
-
+    async def reserve_slot(self, interaction, state: UserReservationState):
         user: UserResponse = await self.user_service.get_user(UserPayload(
             member_id=str(interaction.user.id), 
             username=interaction.user.global_name))
         
-        start_datetime = datetime.strptime(state.start_time, "%H:%M").time()
-        end_datetime = datetime.strptime(state.end_time, "%H:%M").time()
-        date = datetime.strptime(state.date, "%d/%m/%Y").date()
-
-        reservation = await self.reservation_service.create_reservation(
-            ReservationPayload(
-                status="pending" if self.config.reservation_approval_chanel else "approved",
-                start=datetime.combine(date, start_datetime),
-                end=datetime.combine(date, end_datetime),
-                equipment_id=state.equipment_id,
-                user_id=user.id,))
+        start_datetime = state.schedule.slot_time(state.start_time)
+        end_datetime = state.schedule.slot_time(state.end_time)
+        date = state.schedule.day_date(state.date)
+
+        try:
+            reservation = await self.reservation_service.create_reservation(
+                ReservationPayload(
+                    status="pending" if state.config.reservation_approval_chanel else "approved",
+                    start=datetime.combine(date, start_datetime),
+                    end=datetime.combine(date, end_datetime),
+                    equipment_id=state.equipment_id,
+                    user_id=user.id,),
+                expected_version=state.availability_version)
+        except ReservationConflictError:
+            # Outra pessoa levou o horário: mostra o calendário já atualizado para escolher de novo
+            await self.show_available_dates(
+                interaction, state,
+                notice=f"⚠️ O horário **{state.start_time}–{state.end_time}** em **{state.date}** acabou de ser reservado. "
+                "Escolha outro:")
+            return
     
         state.reservation = reservation
 
-        if not self.config.reservation_approval_chanel:
-            dm_sent = await self.send_user_dm(interaction.user,
+        if not state.config.reservation_approval_chanel:
+            dm_sent = self.send_user_dm(interaction.user,
                 f"✅ Sua reserva no dia **{state.date}** das **{state.start_time}** até **{state.end_time}** foi confirmada!")
 
             msg = "✅ Reserva confirmada! (cheque sua DM 👀)" if dm_sent else \
                 f"⚠️ {interaction.user.mention}, Não consegui enviar uma DM. Por favor, habilite as DMs."
 
-            await interaction.response.send_message(msg, ephemeral=True)
+            await interaction.edit_original_response(content=msg, embed=None, view=None)
 
             async with state.lock:
-                del self.user_states[interaction.user.id]
+                self.user_states.pop(interaction.user.id)
         else:
-            await interaction.response.send_message(
-                "📨 Sua reserva foi enviada para aprovação de um responsável.\n"
+            await interaction.edit_original_response(
+                content="📨 Sua reserva foi enviada para aprovação de um responsável.\n"
                 "Você receberá uma mensagem assim que for **aprovada ou rejeitada**.",
-                ephemeral=True)
+                embed=None, view=None)
+
+            # A partir daqui a reserva pertence ao fluxo de aprovação; a sessão do usuário é liberada
+            async with state.lock:
+                self.user_states.pop(interaction.user.id)
 
-            await self.send_for_approval(interaction.user)
+            await self.send_for_approval(interaction.user, state)
 
     # ---------------- Send reservation to approval ----------------
-    async def send_for_approval(self, user):
-        state = self.user_states[user.id]
+    async def send_for_approval(self, user, state: UserReservationState):
 
-        channel = utils.get(self.bot.get_all_channels(), name=self.config.reservation_approval_chanel)
+        channel = self.guild_index.channel(state.guild_id, name=state.config.reservation_approval_chanel)
         if not channel:
-            logger.error(f"❌ Canal {self.config.reservation_approval_chanel} não encontrado.")
+            logger.error(f"❌ Canal {state.config.reservation_approval_chanel} não encontrado.")
             return
 
         embed = Embed(
@@ -228,30 +383,34 @@ class ReservationManager(Cog):
         view = View()
 
         async def handle_decision(interaction, status: str, emoji: str, user_msg: str, channel_msg: str):
-            role = utils.get(interaction.guild.roles, name="Teacher")
-            if role not in interaction.user.roles:
+            schedule = state.schedule
+            if not self.guild_index.has_any_role(
+                    interaction.user, schedule.approver_role_ids, schedule.approver_role_names):
                 await interaction.response.send_message("⚠️ Você não tem permissão para aprovar ou recusar reservas.", ephemeral=True)
                 return
 
+            await self.acknowledge(interaction, new_message=True)
+
             responsible: UserResponse = await self.user_service.get_user(
                 UserPayload(
-                    mber_id=str(interaction.user.id), 
+                    member_id=str(interaction.user.id), 
                     username=interaction.user.global_name))
-            
-            state.reservation.status = status
-            state.reservation.responsible_id = responsible.id
-            await self.reservation_service.update_reservation(state.reservation)
-            async with state.lock:
-                del self.user_states[user.id]
 
-            dm_sent = await self.send_user_dm(user, user_msg)
+            decided = await self.reservation_service.decide_reservation(state.reservation, status, responsible.id)
+            await self.close_decision(interaction, view)
+            if decided is None:
+                await interaction.edit_original_response(content="⚠️ Esta reserva já foi aprovada ou recusada.")
+                return
+            state.reservation = decided
 
-            await channel.send(channel_msg.format(user=user.mention, approver=interaction.user.mention))
+            dm_sent = self.send_user_dm(user, user_msg)
+
+            self.outbox.enqueue(channel, channel_msg.format(user=user.mention, approver=interaction.user.mention))
             
-            response_msg = f"{emoji} Reserva processada! Uma DM foi enviada para o usuário." if dm_sent else \
-                f"{emoji} Reserva processada! Não consegui enviar DM ao usuário."
+            response_msg = f"{emoji} Reserva processada! O usuário será avisado por DM." if dm_sent else \
+                f"{emoji} Reserva processada! O usuário está com as DMs fechadas."
 
-            await interaction.response.send_message(response_msg, ephemeral=True)
+            await interaction.edit_original_response(content=response_msg)
 
         base_user_msg = f"Sua reserva em **{state.date}** das **{state.start_time}** às **{state.end_time}** foi"
         
@@ -274,48 +433,183 @@ class ReservationManager(Cog):
                 status="rejected",
                 emoji="❌", 
                 user_msg=f"🚫 {base_user_msg} **RECUSADA**.", 
-                channel_msg="❌ Reserva de {user} aprovada por {approver}" ) 
+                channel_msg="❌ Reserva de {user} recusada por {approver}" ) 
         reject_btn.callback = reject_callback 
         
         view.add_item(approve_btn) 
         view.add_item(reject_btn)
 
-        await channel.send(embed=embed, view=view)
+        self.outbox.enqueue(channel, embed=embed, view=view)
         
-    async def send_user_dm(self, user, message: str):
+    @staticmethod
+    async def close_decision(interaction, view: View):
+        """
+        Desativa os botões de aprovação na mensagem do pedido, para não decidir duas vezes.
+        """
+        if view.is_finished():
+            return
+        for item in view.children:
+            item.disabled = True
+        view.stop()
         try:
-            await user.send(message)
-            return True
-        except Forbidden:
-            return False
+            await interaction.message.edit(view=view)
+        except HTTPException as e:
+            logger.warning(f"⚠️ Não consegui desativar os botões de aprovação: {e}")
+
+    def send_user_dm(self, user, message: str) -> bool:
+        """
+        Agenda a DM no outbox. Retorna False se já sabemos que o usuário está com as DMs fechadas.
+        """
+        return self.outbox.enqueue(user, message)
 
 
+    async def parse_filters(self, ctx: Context, filtros: ReservationFilters) -> Optional[ReservationQuery]:
+        """
+        Valida os filtros de `!reservas` / `!exportar_reservas`. Em caso de erro avisa no canal e retorna None.
+        """
+        try:
+            query = ReservationQuery(
+                start_date=datetime.strptime(filtros.data, "%Y-%m-%d").date() if filtros.data else None,
+                end_date=datetime.strptime(filtros.ate, "%Y-%m-%d").date() if filtros.ate else None)
+        except ValueError:
+            await ctx.send("Formato de data inválido. Use YYYY-MM-DD.")
+            return None
+
+        if filtros.status and filtros.status not in RESERVATION_STATUSES:
+            await ctx.send(f"Status inválido. Use um destes: {', '.join(RESERVATION_STATUSES)}.")
+            return None
+        query.status = filtros.status
+
+        if filtros.equipamento:
+            if len(filtros.equipamento) > EQUIPMENT_FILTER_MAX:
+                await ctx.send(f"O filtro de equipamento pode ter no máximo {EQUIPMENT_FILTER_MAX} caracteres.")
+                return None
+            if not await self.equipment_service.find_equipment_ids(filtros.equipamento):
+                await ctx.send(f"Nenhum equipamento encontrado para '{filtros.equipamento}'.")
+                return None
+            query.equipment = filtros.equipamento
+        return query
+
     @command(name="reservas")
-    async def list_reservations(self, ctx: Context, date: Optional[str] = None):
+    async def list_reservations(self, ctx: Context, *, filtros: ReservationFilters):
         """
-        Lista as reservas paginadas. 
-        Se passar uma data (YYYY-MM-DD), filtra apenas as reservas desse dia.
+        Lista as reservas paginadas.
+        Filtros: `!reservas [YYYY-MM-DD] ate:YYYY-MM-DD equipamento:<nome ou id> status:<pending|approved|rejected>`
+        Com só a data, lista as reservas que ocupam aquele dia; com `ate`, o intervalo inteiro.
         """
-        reservations = await self.reservation_service.get_reservations()
-        
-        if date:
-            try:
-                filter_date = datetime.strptime(date, "%Y-%m-%d").date()
-                reservations = [
-                    r for r in reservations
-                    if r.start.date() == filter_date or r.end.date() == filter_date
-                ]
-            except ValueError:
-                await ctx.send("Formato de data inválido. Use YYYY-MM-DD.")
-                return
+        query = await self.parse_filters(ctx, filtros)
+        if query is None:
+            return
 
-        if not reservations:
+        embed, view = await build_reservation_page(self.reservation_service, self.equipment_service, query)
+        if not embed.fields:
             await ctx.send("Nenhuma reserva encontrada.")
             return
 
-        view = PaginatedReservationView(reservations, per_page=5)
-        await ctx.send(embed=view.get_page_embed(), view=view)
-    
+        await ctx.send(embed=embed, view=view)
+
+    @command(name="exportar_reservas")
+    async def export_reservations(self, ctx: Context, *, filtros: ReservationFilters):
+        """
+        Exporta as reservas em CSV, com os mesmos filtros de `!reservas`.
+        As reservas são lidas página a página (iter_reservations), sem montar a lista inteira.
+        """
+        query = await self.parse_filters(ctx, filtros)
+        if query is None:
+            return
+
+        start, end = query.interval()
+        equipment_ids = await self.equipment_service.find_equipment_ids(query.equipment) if query.equipment else None
+        names = {e.id: e.name async for e in self.equipment_service.iter_equipments()}
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "equipamento", "usuario", "responsavel", "inicio", "fim", "status"])
+        total = 0
+        async for r in self.reservation_service.iter_reservations(
+                start=start, end=end, equipment_ids=equipment_ids, status=query.status):
+            writer.writerow([
+                r.id, names.get(r.equipment_id, r.equipment_id), r.user_id, r.responsible_id or "",
+                r.start.strftime("%Y-%m-%d %H:%M"), r.end.strftime("%Y-%m-%d %H:%M"), r.status])
+            total += 1
+
+        if not total:
+            await ctx.send("Nenhuma reserva encontrada.")
+            return
+
+        data = io.BytesIO(buffer.getvalue().encode("utf-8"))
+        await ctx.send(f"📄 {total} reservas exportadas.", file=File(data, filename="reservas.csv"))
+
+    # ---------------- Earliest free slot ----------------
+    @command(name="proximo")
+    async def next_available(self, ctx: Context, *, filtros: NextSlotFilters):
+        """
+        Primeiros horários livres em qualquer equipamento, com botão para reservar direto.
+        `!proximo [nome do equipamento] blocos:<n> status:<available|in_use> quantidade:<n>`
+        """
+        schedule = await self.reservation_service.get_reservation_schedule(ctx.guild.id if ctx.guild else None)
+        config = schedule.config
+
+        reservation_chanel = config.reservation_chanel
+        if reservation_chanel and ctx.channel.name != reservation_chanel:
+            await ctx.send(f"⚠️ Este comando só pode ser usado no canal '{reservation_chanel}'.", delete_after=10)
+            return
+
+        if not 1 <= filtros.blocos <= config.max_reservation_blocks:
+            await ctx.send(f"O número de blocos deve ser entre 1 e {config.max_reservation_blocks}.")
+            return
+        if filtros.status and filtros.status not in BOOKABLE_EQUIPMENT_STATUSES:
+            await ctx.send(f"Status inválido. Use um destes: {', '.join(BOOKABLE_EQUIPMENT_STATUSES)}.")
+            return
+
+        equipments = await self.equipment_service.find_equipments(filtros.equipamento, filtros.status)
+        if not equipments:
+            await ctx.send("Nenhum equipamento encontrado.")
+            return
+        names = {e.id: e.name for e in equipments}
+
+        suggestions = await self.reservation_service.find_earliest_slots(
+            list(names), filtros.blocos, schedule, limit=min(max(filtros.quantidade, 1), SUGGESTIONS_MAX))
+        if not suggestions:
+            await ctx.send(f"Nenhum horário livre com {filtros.blocos} bloco(s) seguidos "
+                           f"nos próximos {config.max_reservation_days} dias.")
+            return
+
+        embed = Embed(
+            title="🔎 Próximos horários livres",
+            description=f"{filtros.blocos} bloco(s) de {config.min_reservation} min. Clique para reservar.",
+            color=Color.blue())
+        view = View()
+
+        for number, suggestion in enumerate(suggestions, 1):
+            name = names[suggestion.equipment_id]
+            embed.add_field(
+                name=f"{number}. {name}",
+                value=f"📅 {suggestion.date} ⏰ {suggestion.start} – {suggestion.end}",
+                inline=False)
+
+            async def on_click(interaction, s=suggestion, n=name):
+                await self.acknowledge(interaction, new_message=True)
+                state = self.user_states.get_or_create(interaction.user.id)
+                async with state.lock:
+                    state.config = config
+                    state.schedule = schedule
+                    state.guild_id = interaction.guild_id
+                    state.equipment_name = n
+                    state.equipment_id = s.equipment_id
+                    state.date = s.date
+                    state.start_time = s.start
+                    state.end_time = s.end
+                    # Se alguém reservou depois da busca, reserve_slot confere e mostra o calendário atualizado
+                    state.availability_version = s.version
+                await self.reserve_slot(interaction, state)
+
+            button = Button(label=f"{number}. {suggestion.date[:5]} {suggestion.start}", style=ButtonStyle.blurple)
+            button.callback = on_click
+            view.add_item(button)
+
+        await ctx.send(embed=embed, view=view)
+
 # ---------------- Setup function ----------------
 async def setup(bot):
     await bot.add_cog(ReservationManager(bot))
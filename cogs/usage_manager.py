@@ -0,0 +1,219 @@
+import csv
+import io
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from loguru import logger
+
+from discord import Color, Embed, File
+from discord.ext.commands import Bot, Cog, command, Context, flag, FlagConverter
+
+from services.equipment_service import EquipmentService
+from services.reservation_service import ReservationService
+from services.usage_analytics import UsageAnalytics
+from utils.png import blend, grid_png
+from utils.schedule import WEEKDAY_NAMES
+from utils.usage_stats import APPROVED, PENDING, REJECTED, UsageReport
+
+
+USAGE_PERIODS = ("semana", "mes")
+USAGE_ATTACHMENTS = ("png", "csv")
+
+# Limite de campos do embed, deixando espaço para os campos de resumo
+EQUIPMENT_FIELDS_MAX = 20
+SPARK_LEVELS = "▁▂▃▄▅▆▇█"
+# Máximo de caracteres por linha: com slots curtos (ex.: 5 min) a série é reduzida por média, para caber
+# nos 1024 caracteres do campo do embed
+SPARK_WIDTH = 52
+
+HEATMAP_LOW = (235, 241, 250)
+HEATMAP_HIGH = (30, 80, 160)
+HEATMAP_CLOSED = (220, 220, 220)
+
+
+class UsageFilters(FlagConverter, delimiter=":", prefix="", case_insensitive=True):
+    equipamento: Optional[str] = flag(default=None, positional=True)
+    periodo: str = flag(default="semana")
+    data: Optional[str] = flag(default=None)
+    anexo: Optional[str] = flag(default=None)
+
+
+def usage_window(period: str, reference: date) -> Tuple[date, date]:
+    """
+    Semana (segunda a domingo) ou mês que contém `reference`.
+    """
+    if period == "semana":
+        first = reference - timedelta(days=reference.weekday())
+        return first, first + timedelta(days=6)
+    first = reference.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    return first, next_month - timedelta(days=1)
+
+
+def downsample(row, width: int):
+    """
+    Média de blocos consecutivos para que a série tenha no máximo `width` valores.
+    """
+    if len(row) <= width:
+        return row
+    return [row[i * len(row) // width:(i + 1) * len(row) // width].mean() for i in range(width)]
+
+
+def percent(value: float) -> str:
+    return "–" if math.isnan(value) else f"{value * 100:.0f}%"
+
+
+def hours(value: float) -> str:
+    return "–" if math.isnan(value) else f"{value:.1f}h"
+
+
+class UsageManager(Cog):
+    def __init__(self, bot, reservation_service, equipment_service, usage_analytics):
+        self.reservation_service: ReservationService = reservation_service
+        self.equipment_service: EquipmentService = equipment_service
+        self.usage_analytics: UsageAnalytics = usage_analytics
+        self.bot: Bot = bot
+
+    @command(name="uso")
+    async def usage(self, ctx: Context, *, filtros: UsageFilters):
+        """
+        Uso dos equipamentos na semana ou no mês: ocupação, aprovações, antecedência e horários de pico.
+        `!uso [nome do equipamento] periodo:<semana|mes> data:YYYY-MM-DD anexo:<png|csv>`
+        """
+        if not self.usage_analytics.available:
+            await ctx.send("⚠️ Relatórios de uso não estão disponíveis (numpy não instalado).")
+            return
+
+        if filtros.periodo not in USAGE_PERIODS:
+            await ctx.send(f"Período inválido. Use um destes: {', '.join(USAGE_PERIODS)}.")
+            return
+        if filtros.anexo and filtros.anexo not in USAGE_ATTACHMENTS:
+            await ctx.send(f"Anexo inválido. Use um destes: {', '.join(USAGE_ATTACHMENTS)}.")
+            return
+        try:
+            reference = datetime.strptime(filtros.data, "%Y-%m-%d").date() if filtros.data else date.today()
+        except ValueError:
+            await ctx.send("Formato de data inválido. Use YYYY-MM-DD.")
+            return
+
+        names: Dict[UUID, str] = {e.id: e.name async for e in self.equipment_service.iter_equipments()}
+        if filtros.equipamento:
+            equipment_ids = await self.equipment_service.find_equipment_ids(filtros.equipamento)
+            if not equipment_ids:
+                await ctx.send(f"Nenhum equipamento encontrado para '{filtros.equipamento}'.")
+                return
+        else:
+            equipment_ids = list(names)
+
+        first, last = usage_window(filtros.periodo, reference)
+        guild_id = ctx.guild.id if ctx.guild else None
+        report = await self.usage_analytics.usage_report(first, last, equipment_ids, guild_id)
+        schedule = await self.reservation_service.get_reservation_schedule(guild_id)
+        logger.info(f"📊 Relatório de uso de {first} a {last} ({len(equipment_ids)} equipamentos)")
+
+        embed = self.build_usage_embed(report, names, schedule.slot_labels, first, last)
+        file = None
+        if filtros.anexo == "csv":
+            file = File(io.BytesIO(self.usage_csv(report, names).encode("utf-8")),
+                        filename=f"uso_{first:%Y%m%d}_{last:%Y%m%d}.csv")
+        elif filtros.anexo == "png":
+            file = File(io.BytesIO(self.usage_png(report, schedule.weekdays)), filename="uso.png")
+            embed.set_image(url="attachment://uso.png")
+
+        if file is not None:
+            await ctx.send(embed=embed, file=file)
+        else:
+            await ctx.send(embed=embed)
+
+    # ---------------- Rendering ----------------
+    @staticmethod
+    def build_usage_embed(report: UsageReport, names: Dict[UUID, str], slot_labels, first: date, last: date) -> Embed:
+        counts = report.counts.sum(axis=0)
+        decided = counts[APPROVED] + counts[REJECTED]
+        capacity = report.capacity_minutes * len(report.equipment_ids)
+        overall = report.booked_minutes.sum() / capacity if capacity else float("nan")
+
+        embed = Embed(
+            title=f"📊 Uso dos equipamentos de {first:%d/%m/%Y} a {last:%d/%m/%Y}",
+            description=(
+                f"**Ocupação:** {percent(overall)} de {report.open_day_count} dia(s) de funcionamento\n"
+                f"**Reservas:** {counts.sum()} (✅ {counts[APPROVED]} ❌ {counts[REJECTED]} ⏳ {counts[PENDING]})\n"
+                f"**Aprovação:** {percent(counts[APPROVED] / decided if decided else float('nan'))}\n"
+                f"**Antecedência média:** {hours(report.mean_lead_time_hours)} · "
+                f"**Tempo até a decisão:** {hours(report.mean_approval_latency_hours)}"),
+            color=Color.blue())
+
+        order = sorted(range(len(report.equipment_ids)), key=lambda i: -report.utilization[i])
+        for i in order[:EQUIPMENT_FIELDS_MAX]:
+            equipment_id = report.equipment_ids[i]
+            pending, approved, rejected = (int(c) for c in report.counts[i])
+            embed.add_field(
+                name=names.get(equipment_id, str(equipment_id)),
+                value=(f"Uso {percent(report.utilization[i])} · {approved + rejected + pending} reservas "
+                       f"(✅ {approved} ❌ {rejected} ⏳ {pending})\n"
+                       f"Aprovação {percent(report.approval_rate[i])} · "
+                       f"antecedência {hours(report.lead_time_hours[i])}"),
+                inline=False)
+        if len(order) > EQUIPMENT_FIELDS_MAX:
+            embed.add_field(name="…", value=f"+{len(order) - EQUIPMENT_FIELDS_MAX} equipamentos (use `anexo:csv`)",
+                            inline=False)
+
+        peaks = report.peak_slots()
+        if peaks:
+            embed.add_field(
+                name="🔥 Horários de pico",
+                value="\n".join(f"{WEEKDAY_NAMES[w]} {slot_labels[s]} ({percent(v)})" for w, s, v in peaks),
+                inline=False)
+
+        lines = []
+        for weekday, row in enumerate(report.heatmap):
+            if row.any():
+                spark = "".join(SPARK_LEVELS[min(int(v * len(SPARK_LEVELS)), len(SPARK_LEVELS) - 1)]
+                                for v in downsample(row, SPARK_WIDTH))
+                lines.append(f"{WEEKDAY_NAMES[weekday]} {spark}")
+        if lines:
+            embed.add_field(
+                name=f"Ocupação por slot ({slot_labels[0]} → {slot_labels[-1]})",
+                value="```\n" + "\n".join(lines) + "\n```",
+                inline=False)
+
+        embed.set_footer(text="Uso = horas aprovadas / horas de funcionamento dos dias abertos")
+        return embed
+
+    @staticmethod
+    def usage_csv(report: UsageReport, names: Dict[UUID, str]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["equipamento", "id", "reservas", "aprovadas", "rejeitadas", "pendentes", "horas_aprovadas",
+                         "uso_pct", "aprovacao_pct", "antecedencia_media_h", "decisao_media_h"])
+
+        def number(value: float, digits: int = 1) -> str:
+            return "" if math.isnan(value) else f"{value:.{digits}f}"
+
+        for i, equipment_id in enumerate(report.equipment_ids):
+            pending, approved, rejected = (int(c) for c in report.counts[i])
+            writer.writerow([
+                names.get(equipment_id, equipment_id), equipment_id, pending + approved + rejected,
+                approved, rejected, pending, number(report.booked_minutes[i] / 60),
+                number(report.utilization[i] * 100), number(report.approval_rate[i] * 100),
+                number(report.lead_time_hours[i]), number(report.approval_latency_hours[i])])
+        return buffer.getvalue()
+
+    @staticmethod
+    def usage_png(report: UsageReport, weekdays) -> bytes:
+        """
+        Mapa de calor dia da semana (linhas, Segunda em cima) x slot (colunas); cinza = dia fechado.
+        """
+        cells = [
+            [blend(HEATMAP_LOW, HEATMAP_HIGH, float(v)) for v in row] if weekday + 1 in weekdays
+            else [HEATMAP_CLOSED] * report.slot_count
+            for weekday, row in enumerate(report.heatmap)
+        ]
+        return grid_png(cells)
+
+
+# ---------------- Setup function ----------------
+async def setup(bot):
+    await bot.add_cog(UsageManager(bot))
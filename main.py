@@ -6,15 +6,27 @@ from dotenv import load_dotenv
 from cogs.events_manager import EventsManager
 from cogs.reservation_manager import ReservationManager
 from cogs.equipment_manager import EquipmentManager
+from cogs.usage_manager import UsageManager
 from services.api_client import APIClient
 from services.equipment_service import EquipmentService
+from services.member_registration import MemberRegistration
+from services.outbox import Outbox
+from services.reservation_events import ReservationEventStream
 from services.reservation_service import ReservationService
+from services.storage import SQLiteStorage
+from services.usage_analytics import UsageAnalytics
 from services.user_service import UserService
+from utils.guild_index import GuildIndex
+from views.pagination_equipment import EquipmentPageButton
+from views.pagination_reservation import ReservationPageButton
 
 load_dotenv()
 
 TOKEN = os.environ['DISCORD_TOKEN']
 API_BASE_URL = os.environ["API_URL"]
+DATABASE_PATH = os.environ.get("DATABASE_PATH", "reservations.db")
+# Rota SSE de eventos de reserva do backend (opcional); sem ela a disponibilidade vem só do que o bot grava
+RESERVATION_EVENTS_PATH = os.environ.get("RESERVATION_EVENTS_PATH")
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -25,27 +37,55 @@ class MyBot(commands.Bot):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._api_client = APIClient(API_BASE_URL)
-        self.reservation_service = ReservationService(self._api_client)
-        self.equipment_service = EquipmentService(self._api_client)
+        self._storage = SQLiteStorage(DATABASE_PATH)
+        self.reservation_service = ReservationService(self._api_client, self._storage)
+        self.equipment_service = EquipmentService(self._api_client, self._storage)
         self.user_service = UserService(self._api_client)
+        self.outbox = Outbox()
+        self.member_registration = MemberRegistration(self.user_service, self.outbox)
+        self.guild_index = GuildIndex()
+        self.usage_analytics = UsageAnalytics(self.reservation_service)
+        self.reservation_events = (
+            ReservationEventStream(self._api_client, self.reservation_service, RESERVATION_EVENTS_PATH)
+            if RESERVATION_EVENTS_PATH else None)
 
     async def setup_hook(self):
         await self._api_client.start()
+        await self._storage.start()
+        await self.equipment_service.start()
+        await self.reservation_service.start()
+        if self.reservation_events:
+            self.reservation_events.start()
+        self.outbox.start()
+
+        # Botões de página sem estado: funcionam em mensagens enviadas antes de reiniciar
+        self.add_dynamic_items(ReservationPageButton, EquipmentPageButton)
         
         await self.add_cog(EventsManager(
-            self, self.user_service))
+            self, self.user_service, self.guild_index, self.member_registration))
         await self.add_cog(EquipmentManager(
             self, self.user_service, self.reservation_service, self.equipment_service))
         await self.add_cog(ReservationManager(
-            self, self.user_service, self.reservation_service, self.equipment_service))
+            self, self.user_service, self.reservation_service, self.equipment_service, self.outbox, self.guild_index))
+        await self.add_cog(UsageManager(
+            self, self.reservation_service, self.equipment_service, self.usage_analytics))
 
     async def close(self):
+        # Entrega o que estiver na fila enquanto a conexão com o Discord ainda está aberta
+        await self.member_registration.close()
+        if self.reservation_events:
+            await self.reservation_events.close()
+        await self.outbox.close()
+        await self.usage_analytics.close()
         await self._api_client.close()
+        await self._storage.close()
         await super().close()
 
 
-bot = MyBot(command_prefix="!", intents=intents)
-bot.run(TOKEN)
+# Guardado: os processos do relatório de uso (spawn) reimportam este módulo e não podem subir outro bot
+if __name__ == "__main__":
+    bot = MyBot(command_prefix="!", intents=intents)
+    bot.run(TOKEN)
 
 @commands.command()
 async def ping(self, ctx):
@@ -1,9 +1,12 @@
+import sys
 from asyncio import Lock
-from datetime import time, datetime
-from typing import List, Literal, Optional
+from datetime import date, time, datetime, timedelta
+from typing import List, Literal, Optional, Tuple
 from uuid import UUID
 
 from models.base import BaseResponse
+from utils.availability import EquipmentAvailability
+from utils.datetime_utils import from_epoch_micros, from_epoch_minutes, to_epoch_micros, to_epoch_minutes
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -20,11 +23,87 @@ class ReservationResponse(BaseResponse, ReservationPayload):
     pass
 
 
+class ReservationRecord:
+    """
+    Representação compacta de uma reserva para índices e caches (caminho quente).
+
+    - UUIDs como inteiros de 128 bits
+    - start/end em minutos desde a época; carimbos em microssegundos (UTC)
+    - status internado (todas as instâncias apontam para a mesma string)
+
+    A conversão para ReservationResponse só acontece na borda (API, embeds).
+    """
+
+    __slots__ = ("id", "user_id", "equipment_id", "responsible_id", "start", "end", "status",
+                 "created_at", "updated_at", "deleted_at")
+
+    def __init__(self, id: int, user_id: int, equipment_id: int, responsible_id: Optional[int],
+                 start: int, end: int, status: str, created_at: int, updated_at: int, deleted_at: Optional[int]):
+        self.id = id
+        self.user_id = user_id
+        self.equipment_id = equipment_id
+        self.responsible_id = responsible_id
+        self.start = start
+        self.end = end
+        self.status = sys.intern(status)
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.deleted_at = deleted_at
+
+    def __repr__(self) -> str:
+        return f"ReservationRecord(id={UUID(int=self.id)}, start={self.start}, end={self.end}, status={self.status})"
+
+    @classmethod
+    def from_response(cls, r: "ReservationResponse") -> "ReservationRecord":
+        return cls(
+            r.id.int, r.user_id.int, r.equipment_id.int,
+            r.responsible_id.int if r.responsible_id else None,
+            to_epoch_minutes(r.start), to_epoch_minutes(r.end), r.status,
+            to_epoch_micros(r.created_at), to_epoch_micros(r.updated_at),
+            to_epoch_micros(r.deleted_at) if r.deleted_at else None)
+
+    def to_response(self) -> "ReservationResponse":
+        return ReservationResponse(
+            id=UUID(int=self.id),
+            user_id=UUID(int=self.user_id),
+            equipment_id=UUID(int=self.equipment_id),
+            responsible_id=UUID(int=self.responsible_id) if self.responsible_id is not None else None,
+            start=from_epoch_minutes(self.start),
+            end=from_epoch_minutes(self.end),
+            status=self.status,
+            created_at=from_epoch_micros(self.created_at),
+            updated_at=from_epoch_micros(self.updated_at),
+            deleted_at=from_epoch_micros(self.deleted_at) if self.deleted_at is not None else None)
+
+
+class ReservationQuery(BaseModel):
+    start_date: Optional[date] = Field(None, description="Primeiro dia do filtro (sozinho, só aquele dia)")
+    end_date: Optional[date] = Field(None, description="Último dia do filtro, incluído")
+    status: Optional[Literal['approved', 'rejected', 'pending']] = Field(None, description="Status da reserva")
+    equipment: Optional[str] = Field(None, max_length=40, description="Nome (ou parte) ou ID do equipamento")
+
+    def interval(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """
+        Intervalo [start, end) das reservas buscadas: o dia final entra inteiro.
+        """
+        start = datetime.combine(self.start_date, time.min) if self.start_date else None
+        last = self.end_date or self.start_date
+        end = datetime.combine(last + timedelta(days=1), time.min) if last else None
+        return start, end
+
+
 class UserReservationState:
     def __init__(self):
         self.lock = Lock()
+        self.config: Optional["BotConfig"] = None
+        self.schedule = None
+        self.guild_id: Optional[int] = None
         self.reservation: Optional[ReservationResponse] = None
-        self.unavailable_time_slots = []
+        self.availability: Optional[EquipmentAvailability] = None
+        # Versão da agenda do equipamento quando `availability` foi lida (ver ReservationService.create_reservation)
+        self.availability_version: Optional[int] = None
+        # Muda a cada tela do fluxo: edições atrasadas (ex.: mapa de ocupação) só valem na tela em que foram pedidas
+        self.screen = 0
         self.equipment_name = None
         self.equipment_id = None
         self.start_time = None
@@ -1,18 +1,144 @@
-import os
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Type, TypeVar
+
 import aiohttp
 from loguru import logger
+from pydantic import BaseModel, Field
+
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.decoding import decode, decode_list, json_dumps, json_loads
+from utils.single_flight import SingleFlight
+
+M = TypeVar("M", bound=BaseModel)
+
+# Só métodos idempotentes são repetidos automaticamente
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+class APIError(Exception):
+    def __init__(self, status: Optional[int], message: str, details: Any = None):
+        super().__init__(f"{status or '-'} {message}")
+        self.status = status
+        self.message = message
+        self.details = details
+
+
+class TransportConfig(BaseModel):
+    connection_limit: int = Field(100, description="Máximo de conexões abertas no pool")
+    connection_limit_per_host: int = Field(20, description="Máximo de conexões por host")
+    keepalive_timeout: float = Field(30.0, description="Segundos que uma conexão ociosa fica aberta para reuso")
+    dns_cache_ttl: int = Field(300, description="Segundos de cache de DNS")
+    connect_timeout: float = Field(1.0, description="Timeout para abrir a conexão")
+    request_timeout: float = Field(2.5, description="Timeout total de cada tentativa (a interação do Discord expira em 3s)")
+    max_retries: int = Field(2, ge=0, description="Tentativas extras para métodos idempotentes")
+    backoff_base: float = Field(0.1, description="Base do backoff exponencial (segundos)")
+    backoff_max: float = Field(2.0, description="Teto do backoff (segundos)")
+    breaker_failure_threshold: int = Field(5, gt=0, description="Falhas seguidas até abrir o circuito")
+    breaker_reset_timeout: float = Field(15.0, description="Segundos com o circuito aberto antes de testar de novo")
+
+
+class CachedResponse:
+    def __init__(self, data: Any, etag: Optional[str], last_modified: Optional[str], ttl: float):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.refresh(ttl)
+
+    def refresh(self, ttl: float):
+        self.expires_at = time.monotonic() + ttl
+
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class ResponseCache:
+    """
+    Cache LRU limitado das respostas GET, com os validadores (ETag / Last-Modified) para requisições condicionais.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def set(self, url: str, entry: CachedResponse):
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, prefix: str):
+        """
+        Remove as URLs do recurso `prefix` e abaixo dele, por segmento: "/reservation" leva
+        "/reservation", "/reservation/<id>" e "/reservation?..." mas não "/reservations".
+        """
+        prefix = prefix.rstrip("/")
+        for url in [u for u in self._entries if u == prefix or u.startswith((prefix + "/", prefix + "?"))]:
+            del self._entries[url]
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ServerSentEvent:
+    def __init__(self, id: Optional[str], event: str, data: str):
+        self.id = id
+        self.event = event
+        self.data = data
 
 
 class APIClient:
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        cache_ttl: float = 5.0,
+        ttl_overrides: Optional[Dict[str, float]] = None,
+        cache_max_entries: int = 512,
+        transport: Optional[TransportConfig] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.session: aiohttp.ClientSession | None = None
+        self.transport = transport or TransportConfig()
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.transport.breaker_failure_threshold,
+            reset_timeout=self.transport.breaker_reset_timeout)
+        self.transport_stats = {"requests": 0, "retries": 0, "failures": 0, "timeouts": 0, "fast_failed": 0}
+
+        # TTL padrão das respostas GET e TTL por endpoint (prefixo da rota, o mais longo vence)
+        self.cache_ttl = cache_ttl
+        self.ttl_overrides = {
+            f"/{prefix.lstrip('/')}": ttl for prefix, ttl in (ttl_overrides or {}).items()
+        }
+        self.cache = ResponseCache(cache_max_entries)
+        self._inflight = SingleFlight()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "coalesced": 0}
 
     async def start(self):
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=self.transport.connection_limit,
+                limit_per_host=self.transport.connection_limit_per_host,
+                keepalive_timeout=self.transport.keepalive_timeout,
+                ttl_dns_cache=self.transport.dns_cache_ttl,
+                use_dns_cache=True)
+            timeout = aiohttp.ClientTimeout(
+                total=self.transport.request_timeout,
+                connect=self.transport.connect_timeout)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, json_serialize=json_dumps)
             logger.info("🌐 ClientSession inicializada")
-    
+
     async def close(self):
         if self.session:
             await self.session.close()
@@ -20,47 +146,231 @@ class APIClient:
 
     async def info(self):
         return await self.get("/")
-    
-    async def get(self, endpoint: str):
-        return await self._request("GET", endpoint)
 
-    async def post(self, endpoint: str, json: dict):
-        return await self._request("POST", endpoint, json=json)
+    async def get(self, endpoint: str, ttl: Optional[float] = None, timeout: Optional[float] = None):
+        """
+        GET com cache e coalescência: chamadas idênticas simultâneas compartilham a mesma requisição.
+        `ttl=0` ignora o cache, mas ainda revalida com ETag/Last-Modified quando há uma cópia guardada.
+        `timeout` substitui o timeout total padrão de cada tentativa.
+        """
+        url = self._url(endpoint)
+        ttl = self._ttl_for(endpoint) if ttl is None else ttl
+
+        entry = self.cache.get(url)
+        if entry and ttl > 0 and entry.fresh():
+            self.stats["hits"] += 1
+            return entry.data
+
+        if url in self._inflight:
+            self.stats["coalesced"] += 1
+        return await self._inflight.run(url, lambda: self._cached_get(url, entry, ttl, timeout))
+
+    async def post(self, endpoint: str, json: dict, timeout: Optional[float] = None):
+        return await self._write("POST", endpoint, timeout, json=json)
 
-    async def patch(self, endpoint: str, json: dict):
-        return await self._request("PATCH", endpoint, json=json)
-    
-    async def put(self, endpoint: str, json: dict):
-        return await self._request("PUT", endpoint, json=json)
+    # ---------------- Respostas tipadas ----------------
+    async def get_model(self, endpoint: str, model: Type[M], ttl: Optional[float] = None) -> M:
+        return decode(model, await self.get(endpoint, ttl=ttl))
 
-    async def delete(self, endpoint: str):
-        return await self._request("DELETE", endpoint)
+    async def get_list(self, endpoint: str, model: Type[M], ttl: Optional[float] = None) -> List[M]:
+        """
+        GET de uma lista, validada em lote pelo TypeAdapter em cache (utils/decoding.decode_list).
+        """
+        return decode_list(model, await self.get(endpoint, ttl=ttl) or [])
 
-    async def _request(self, method: str, endpoint: str, **kwargs):
+    async def post_model(self, endpoint: str, json: dict, model: Type[M]) -> M:
+        return decode(model, await self.post(endpoint, json=json))
+
+    async def post_list(self, endpoint: str, json: dict, model: Type[M]) -> List[M]:
+        return decode_list(model, await self.post(endpoint, json=json) or [])
+
+    async def patch(self, endpoint: str, json: dict, timeout: Optional[float] = None):
+        return await self._write("PATCH", endpoint, timeout, json=json)
+
+    async def put(self, endpoint: str, json: dict, timeout: Optional[float] = None):
+        return await self._write("PUT", endpoint, timeout, json=json)
+
+    async def delete(self, endpoint: str, timeout: Optional[float] = None):
+        return await self._write("DELETE", endpoint, timeout)
+
+    async def events(
+        self,
+        endpoint: str,
+        last_event_id: Optional[str] = None,
+        read_timeout: Optional[float] = None,
+        on_open: Optional[Callable[[], None]] = None,
+    ) -> AsyncIterator[ServerSentEvent]:
+        """
+        Assina um stream SSE (text/event-stream) e devolve os eventos conforme chegam.
+        `last_event_id` vai no cabeçalho Last-Event-ID para o servidor retomar de onde parou.
+        `read_timeout` encerra a conexão se nada chegar (nem heartbeat) nesse intervalo.
+        Não passa pelo cache, retries nem circuit breaker: quem assina decide como reconectar.
+        """
         if not self.session:
             raise RuntimeError("⚠️ ClientSession não inicializada. Chame start() primeiro.")
 
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        try:
-            async with self.session.request(method, url, **kwargs) as resp:
-                try:
-                    resp.raise_for_status()
-                except aiohttp.ClientResponseError as e:
-                    text = await resp.text()
-                    logger.error(f"❌ Erro HTTP {e.status} em {url} → {text}")
-                    return {"error": f"{e.status} {e.message}", "details": text}
-
-                try:
-                    return await resp.json()
-                except aiohttp.ContentTypeError:
-                    text = await resp.text()
-                    logger.warning(f"⚠️ Resposta não JSON de {url}: {text[:200]}")
-                    return {"raw": text}
-                    
-        except aiohttp.ClientError as e:
-            logger.error(f"🚨 Erro de conexão com {url}: {e}")
-            return {"error": "connection_error", "details": str(e)}
-        except Exception as e:
-            logger.exception(f"🔥 Erro inesperado em {url}")
-            return {"error": "unexpected_error", "details": str(e)}
+        headers = {"Accept": "text/event-stream", "Cache-Control": "no-cache"}
+        if last_event_id is not None:
+            headers["Last-Event-ID"] = last_event_id
+        timeout = aiohttp.ClientTimeout(total=None, connect=self.transport.connect_timeout, sock_read=read_timeout)
+
+        async with self.session.get(self._url(endpoint), headers=headers, timeout=timeout) as resp:
+            if resp.status >= 400:
+                raise APIError(resp.status, "http_error", await resp.text())
+            if on_open:
+                on_open()
+
+            event_id, event, data = None, "message", []
+            async for raw in resp.content:
+                line = raw.decode("utf-8").rstrip("\r\n")
+                if not line:
+                    # Linha em branco fecha o evento
+                    if data:
+                        yield ServerSentEvent(event_id, event, "\n".join(data))
+                    event, data = "message", []
+                    continue
+                if line.startswith(":"):
+                    continue  # comentário / heartbeat
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "id":
+                    event_id = value
+                elif field == "event":
+                    event = value
+                elif field == "data":
+                    data.append(value)
+
+    def cache_metrics(self) -> Dict[str, int]:
+        return {**self.stats, "entries": len(self.cache), "inflight": len(self._inflight)}
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache_metrics(),
+            "transport": {
+                **self.transport_stats,
+                "pool_limit": self.transport.connection_limit,
+                "pool_limit_per_host": self.transport.connection_limit_per_host,
+            },
+            "breaker": self.breaker.metrics(),
+        }
+
+    def _url(self, endpoint: str) -> str:
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def _ttl_for(self, endpoint: str) -> float:
+        path = f"/{endpoint.lstrip('/')}"
+        best, ttl = -1, self.cache_ttl
+        for prefix, override in self.ttl_overrides.items():
+            if path.startswith(prefix) and len(prefix) > best:
+                best, ttl = len(prefix), override
+        return ttl
+
+    @staticmethod
+    def _timeout(timeout: Optional[float]) -> Dict[str, Any]:
+        return {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+
+    async def _cached_get(self, url: str, entry: Optional[CachedResponse], ttl: float, timeout: Optional[float]):
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        status, resp_headers, data = await self._request(
+            "GET", url, headers=headers or None, **self._timeout(timeout))
+
+        if status == 304 and entry:
+            self.stats["revalidated"] += 1
+            entry.refresh(ttl)
+            return entry.data
+
+        self.stats["misses"] += 1
+        if status == 200 and not (isinstance(data, dict) and "raw" in data):
+            etag = resp_headers.get("ETag")
+            last_modified = resp_headers.get("Last-Modified")
+            if ttl > 0 or etag or last_modified:
+                self.cache.set(url, CachedResponse(data, etag, last_modified, ttl))
+        return data
+
+    async def _write(self, method: str, endpoint: str, timeout: Optional[float] = None, **kwargs):
+        url = self._url(endpoint)
+        _, _, data = await self._request(method, url, **self._timeout(timeout), **kwargs)
+        # Escritas invalidam as leituras guardadas do mesmo recurso (ex.: POST /reservation → GET /reservation...)
+        resource = endpoint.strip("/").split("/")[0]
+        self.cache.invalidate(self._url(resource))
+        return data
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: espalha as novas tentativas para não sincronizar clientes
+        return random.uniform(0, min(self.transport.backoff_max, self.transport.backoff_base * 2 ** attempt))
+
+    async def _request(self, method: str, url: str, **kwargs):
+        """
+        Faz a requisição com retries (só idempotentes) e circuit breaker.
+        Retorna (status, headers, dados) ou levanta APIError.
+        """
+        if not self.session:
+            raise RuntimeError("⚠️ ClientSession não inicializada. Chame start() primeiro.")
+
+        attempts = self.transport.max_retries + 1 if method in IDEMPOTENT_METHODS else 1
+        error: Optional[APIError] = None
+
+        for attempt in range(attempts):
+            try:
+                self.breaker.before_request()
+            except CircuitOpenError as e:
+                self.transport_stats["fast_failed"] += 1
+                if error:
+                    raise error
+                raise APIError(None, "circuit_open", str(e)) from e
+
+            self.transport_stats["requests"] += 1
+            try:
+                status, headers, data = await self._send(method, url, **kwargs)
+            except asyncio.TimeoutError as e:
+                self.transport_stats["timeouts"] += 1
+                logger.error(f"⏱️ Timeout em {method} {url} (tentativa {attempt + 1}/{attempts})")
+                error = APIError(None, "timeout", str(e))
+            except aiohttp.ClientError as e:
+                logger.error(f"🚨 Erro de conexão com {url}: {e}")
+                error = APIError(None, "connection_error", str(e))
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception:
+                # Ex.: corpo que não decodifica; conta como falha para não prender o half_open
+                self.breaker.record_failure()
+                self.transport_stats["failures"] += 1
+                raise
+            else:
+                if status not in RETRYABLE_STATUS and status < 500:
+                    self.breaker.record_success()
+                    if status >= 400:
+                        logger.error(f"❌ Erro HTTP {status} em {url} → {data}")
+                        raise APIError(status, "http_error", data)
+                    return status, headers, data
+                logger.error(f"❌ Erro HTTP {status} em {url} → {data}")
+                error = APIError(status, "http_error", data)
+
+            self.breaker.record_failure()
+            self.transport_stats["failures"] += 1
+            if attempt + 1 < attempts:
+                self.transport_stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt))
+
+        raise error
+
+    async def _send(self, method: str, url: str, **kwargs):
+        async with self.session.request(method, url, **kwargs) as resp:
+            if resp.status == 304:
+                return resp.status, resp.headers, None
+            if resp.status >= 400:
+                return resp.status, resp.headers, await resp.text()
 
+            try:
+                return resp.status, resp.headers, await resp.json(loads=json_loads)
+            except aiohttp.ContentTypeError:
+                text = await resp.text()
+                logger.warning(f"⚠️ Resposta não JSON de {url}: {text[:200]}")
+                return resp.status, resp.headers, {"raw": text}
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from loguru import logger
+
+from models.reservation import BotConfig
+from utils.schedule import CompiledSchedule
+from utils.single_flight import SingleFlight
+
+
+class CachedConfig:
+    def __init__(self, schedule: CompiledSchedule, ttl: float):
+        self.schedule = schedule
+        self.config = schedule.config
+        self.version = schedule.version
+        self.loaded_at = time.monotonic()
+        self.expires_at = self.loaded_at + ttl
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class ConfigCache:
+    """
+    Cache de BotConfig por guild com TTL, versão (etag) e carregamento single-flight.
+
+    - `loader(guild_id)` busca os dados crus da configuração (dict).
+    - `builder(data)` converte os dados em BotConfig; ele e o CompiledSchedule só
+      são refeitos quando a versão muda.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Optional[int]], Awaitable[Dict[str, Any]]],
+        builder: Callable[[Dict[str, Any]], BotConfig],
+        ttl: float = 300.0,
+    ):
+        self._loader = loader
+        self._builder = builder
+        self.ttl = ttl
+        self._entries: Dict[Hashable, CachedConfig] = {}
+        self._inflight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.rebuilds = 0
+
+    @staticmethod
+    def compute_version(data: Dict[str, Any]) -> str:
+        etag = data.get("version") or data.get("etag")
+        if etag:
+            return str(etag)
+        raw = json.dumps(data, sort_keys=True, default=str).encode()
+        return hashlib.sha1(raw).hexdigest()[:16]
+
+    async def get(self, guild_id: Optional[int]) -> CachedConfig:
+        entry = self._entries.get(guild_id)
+        if entry and not entry.expired():
+            self.hits += 1
+            return entry
+
+        if guild_id in self._inflight:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        return await self._inflight.run(guild_id, lambda: self._load(guild_id, entry))
+
+    async def _load(self, guild_id: Optional[int], previous: Optional[CachedConfig]) -> CachedConfig:
+        try:
+            data = await self._loader(guild_id)
+        except Exception as e:
+            if previous is None:
+                raise
+            logger.warning(f"⚠️ Falha ao recarregar configuração da guild {guild_id}, usando versão {previous.version}: {e}")
+            entry = CachedConfig(previous.schedule, self.ttl)
+            self._entries[guild_id] = entry
+            return entry
+
+        version = self.compute_version(data)
+        if previous and previous.version == version:
+            schedule = previous.schedule
+        else:
+            schedule = CompiledSchedule(self._builder(data), version)
+            self.rebuilds += 1
+            logger.info(f"⚙️ Configuração da guild {guild_id} carregada (versão {version})")
+
+        entry = CachedConfig(schedule, self.ttl)
+        self._entries[guild_id] = entry
+        return entry
+
+    def invalidate(self, guild_id: Optional[int] = None, *, all_guilds: bool = False):
+        if all_guilds:
+            self._entries.clear()
+        else:
+            self._entries.pop(guild_id, None)
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "rebuilds": self.rebuilds,
+            "inflight": len(self._inflight),
+        }
@@ -1,12 +1,15 @@
-from typing import List
-from uuid import uuid4
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID, uuid4
 from datetime import datetime, timezone
+from loguru import logger
 from models.equipment import EquipmentResponse
 from services.api_client import APIClient
+from services.storage import MemoryStorage, StorageBackend
 
 class EquipmentService:
-    def __init__(self, client: APIClient):
-        self.mock_equipment = [
+    def __init__(self, client: APIClient, storage: Optional[StorageBackend] = None):
+        # Equipamentos iniciais, gravados no armazenamento na primeira execução
+        self.default_equipment = [
             EquipmentResponse(
                 id=uuid4(),
                 name="3D Printer - Prusa i3 MK3S",
@@ -45,10 +48,58 @@ class EquipmentService:
             ),
         ]
         self.client = client
+        if storage is None:
+            storage = MemoryStorage()
+            storage.equipment.extend(self.default_equipment)
+        self.storage = storage
+
+    async def start(self):
+        if not await self.storage.list_equipment():
+            for equipment in self.default_equipment:
+                await self.storage.add_equipment(equipment)
+            logger.info(f"🧰 {len(self.default_equipment)} equipamentos iniciais cadastrados")
         
     async def get_equipments(self) -> List[EquipmentResponse]:
-        return self.mock_equipment
+        return await self.storage.list_equipment()
+
+    async def get_equipment_page(
+        self, limit: int, after: Optional[str] = None, before: Optional[str] = None
+    ) -> Tuple[List[EquipmentResponse], bool]:
+        """
+        Uma página de equipamentos depois de `after` ou antes de `before` (IDs usados como cursor)
+        e se há mais equipamentos naquela direção.
+        """
+        found = await self.storage.list_equipment(after=after, before=before, limit=limit + 1)
+        if before is not None:
+            return found[-limit:], len(found) > limit
+        return found[:limit], len(found) > limit
+
+    async def iter_equipments(self, page_size: int = 100) -> AsyncIterator[EquipmentResponse]:
+        async for equipment in self.storage.iter_equipment(page_size):
+            yield equipment
+
+    async def count_equipments(self) -> int:
+        return await self.storage.count_equipment()
+
+    async def find_equipment_ids(self, term: str) -> List[UUID]:
+        """
+        IDs dos equipamentos cujo nome contém `term` (sem diferenciar maiúsculas) ou cujo ID é `term`.
+        """
+        term = term.lower()
+        return [e.id async for e in self.storage.iter_equipment() if term in e.name.lower() or term == str(e.id)]
+
+    async def find_equipments(self, term: Optional[str] = None, status: Optional[str] = None) -> List[EquipmentResponse]:
+        """
+        Equipamentos cujo nome contém `term` (ou cujo ID é `term`), opcionalmente com o `status` pedido.
+        Sem `status`, deixa de fora os que estão em manutenção (não podem ser reservados).
+        """
+        term = term.lower() if term else None
+        return [
+            e async for e in self.storage.iter_equipment()
+            if (term is None or term in e.name.lower() or term == str(e.id))
+            and (e.status == status if status else e.status != "maintenance")
+        ]
 
     async def create_equipment(self, equipment) -> EquipmentResponse:
-        self.mock_equipment.append(equipment)
+        await self.storage.add_equipment(equipment)
         return equipment
\ No newline at end of file
@@ -0,0 +1,124 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from discord import Member, abc
+
+from models.user import UserPayload
+from services.outbox import MESSAGE_LIMIT, Outbox
+from services.user_service import UserService
+
+WELCOME_MESSAGE = (
+    "🎉 Bem-vindo(a) {mentions} ao servidor!\n"
+    "Sinta-se à vontade para explorar os canais e participar com a gente! 💛"
+)
+
+
+class MemberRegistration:
+    """
+    Junta as entradas de membros em uma janela curta (`window`) e processa o lote de uma vez:
+
+    - um único cadastro em lote na API (UserService.create_users)
+    - uma mensagem de boas-vindas por canal, mencionando todos os novos membros
+
+    O lote sai antes da janela acabar se chegar a `max_batch` membros.
+    """
+
+    def __init__(self, user_service: UserService, outbox: Outbox, window: float = 2.0, max_batch: int = 100):
+        self.user_service = user_service
+        self.outbox = outbox
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Member, Optional[abc.Messageable]]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes: set = set()
+        self.stats = {"joined": 0, "batches": 0, "registered": 0, "failed": 0, "welcome_messages": 0}
+
+    # ---------------- API ----------------
+    def submit(self, member: Member, welcome_channel: Optional[abc.Messageable] = None):
+        self._pending.append((member, welcome_channel))
+        self.stats["joined"] += 1
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def close(self):
+        """
+        Processa o que ainda estiver na janela e espera os lotes em andamento.
+        """
+        if self._pending:
+            self._schedule_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def metrics(self) -> Dict[str, int]:
+        return {**self.stats, "pending": len(self._pending)}
+
+    # ---------------- Lotes ----------------
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[Member, Optional[abc.Messageable]]]):
+        self.stats["batches"] += 1
+        self._welcome(batch)
+
+        # O mesmo membro pode sair e entrar de novo dentro da janela
+        payloads = {member.id: self._payload(member) for member, _ in batch}
+        try:
+            created = await self.user_service.create_users(list(payloads.values()))
+        except Exception as e:
+            self.stats["failed"] += len(payloads)
+            logger.exception(f"❌ Erro ao registrar {len(payloads)} usuários na API: {e}")
+            return
+        self.stats["registered"] += len(created)
+        self.stats["failed"] += len(payloads) - len(created)
+        logger.info(f"👥 {len(created)}/{len(payloads)} novos membros registrados em lote")
+
+    @staticmethod
+    def _payload(member: Member) -> UserPayload:
+        payload = UserPayload(
+            member_id=str(member.id),
+            full_name=member.name,
+            username=member.global_name or member.name)
+        if member.joined_at:
+            payload.created_at = member.joined_at
+        return payload
+
+    def _welcome(self, batch: List[Tuple[Member, Optional[abc.Messageable]]]):
+        by_channel: Dict[int, Tuple[abc.Messageable, List[str]]] = {}
+        for member, channel in batch:
+            if channel is None:
+                continue
+            mentions = by_channel.setdefault(channel.id, (channel, []))[1]
+            if member.mention not in mentions:
+                mentions.append(member.mention)
+
+        limit = MESSAGE_LIMIT - len(WELCOME_MESSAGE)
+        for channel, mentions in by_channel.values():
+            chunk: List[str] = []
+            size = 0
+            for mention in mentions:
+                if chunk and size + len(mention) + 2 > limit:
+                    self._send_welcome(channel, chunk)
+                    chunk, size = [], 0
+                chunk.append(mention)
+                size += len(mention) + 2
+            self._send_welcome(channel, chunk)
+
+    def _send_welcome(self, channel: abc.Messageable, mentions: List[str]):
+        if self.outbox.enqueue(channel, WELCOME_MESSAGE.format(mentions=", ".join(mentions))):
+            self.stats["welcome_messages"] += 1
@@ -0,0 +1,220 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+from loguru import logger
+
+from discord import Embed, Forbidden, HTTPException, NotFound, abc
+from discord.ui import View
+
+# Limite de caracteres de uma mensagem do Discord
+MESSAGE_LIMIT = 2000
+
+
+class OutboxMessage:
+    def __init__(self, content: Optional[str], embed: Optional[Embed], view: Optional[View]):
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.enqueued_at = time.monotonic()
+
+
+class Outbox:
+    """
+    Fila assíncrona para DMs e mensagens de canal, fora do caminho das interações.
+
+    - fila limitada + workers
+    - agrupa mensagens de texto para o mesmo destino em uma só (janela de `batch_window`)
+    - repete falhas transitórias (429 / 5xx) com backoff
+    - `Forbidden` (DM fechada) vai para um cache negativo por `forbidden_ttl` segundos
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 1000, batch_window: float = 0.5,
+                 max_retries: int = 3, forbidden_ttl: float = 3600.0):
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.forbidden_ttl = forbidden_ttl
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._pending: Dict[Hashable, Tuple[abc.Messageable, List[OutboxMessage]]] = {}
+        self._unreachable: Dict[Hashable, float] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._closing = False
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self.stats = {"enqueued": 0, "delivered": 0, "sent": 0, "retries": 0, "failed": 0,
+                      "dropped": 0, "forbidden": 0, "skipped_unreachable": 0}
+
+    @staticmethod
+    def destination_key(destination: abc.Messageable) -> Hashable:
+        kind = "user" if isinstance(destination, abc.User) else "channel"
+        return kind, destination.id
+
+    # ---------------- Ciclo de vida ----------------
+    def start(self):
+        if not self._tasks:
+            self._closing = False
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+            logger.info(f"📬 Outbox iniciado com {self.workers} workers")
+
+    async def close(self, timeout: float = 10.0):
+        """
+        Para de aceitar mensagens e espera a fila esvaziar (até `timeout`).
+        """
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Outbox encerrado com {self.depth()} mensagens pendentes")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("📪 Outbox encerrado")
+
+    # ---------------- API ----------------
+    def is_unreachable(self, destination: abc.Messageable) -> bool:
+        key = self.destination_key(destination)
+        until = self._unreachable.get(key)
+        if until is None:
+            return False
+        if time.monotonic() >= until:
+            del self._unreachable[key]
+            return False
+        return True
+
+    def enqueue(self, destination: abc.Messageable, content: Optional[str] = None,
+                embed: Optional[Embed] = None, view: Optional[View] = None) -> bool:
+        """
+        Agenda o envio. Retorna False se a mensagem foi descartada (fila cheia, encerrando ou destino bloqueado).
+        """
+        if self._closing:
+            self.stats["dropped"] += 1
+            return False
+        if self.is_unreachable(destination):
+            self.stats["skipped_unreachable"] += 1
+            return False
+
+        key = self.destination_key(destination)
+        message = OutboxMessage(content, embed, view)
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending[1].append(message)
+        else:
+            try:
+                self._queue.put_nowait(key)
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                logger.warning(f"⚠️ Outbox cheio, mensagem para {key} descartada")
+                return False
+            self._pending[key] = (destination, [message])
+        self.stats["enqueued"] += 1
+        return True
+
+    def depth(self) -> int:
+        return sum(len(messages) for _, messages in self._pending.values())
+
+    def metrics(self) -> Dict[str, float]:
+        latencies = sorted(self._latencies)
+        return {
+            **self.stats,
+            "queue_depth": self.depth(),
+            "destinations_waiting": self._queue.qsize(),
+            "unreachable": len(self._unreachable),
+            "latency_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "latency_p95": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        }
+
+    # ---------------- Workers ----------------
+    @staticmethod
+    def _batches(messages: List[OutboxMessage]) -> List[List[OutboxMessage]]:
+        """
+        Junta mensagens só de texto consecutivas (até o limite do Discord); embeds/views saem sozinhas.
+        """
+        batches: List[List[OutboxMessage]] = []
+        size = 0
+        for message in messages:
+            text_only = message.embed is None and message.view is None and message.content
+            last = batches[-1] if batches else None
+            if (text_only and last and last[-1].embed is None and last[-1].view is None
+                    and size + len(message.content) + 1 <= MESSAGE_LIMIT):
+                last.append(message)
+                size += len(message.content) + 1
+            else:
+                batches.append([message])
+                size = len(message.content or "")
+        return batches
+
+    async def _worker(self, number: int):
+        while True:
+            key = await self._queue.get()
+            try:
+                destination, messages = self._pending[key]
+                # Janela de agrupamento contada a partir da mensagem mais antiga do destino
+                wait = messages[0].enqueued_at + self.batch_window - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                del self._pending[key]
+                batches = self._batches(messages)
+                for n, batch in enumerate(batches):
+                    if not await self._deliver(key, destination, batch):
+                        # Destino recusou (sem permissão / não existe): o resto também não vai entrar
+                        rest = sum(len(b) for b in batches[n + 1:])
+                        if rest:
+                            self.stats["forbidden" if key in self._unreachable else "failed"] += rest
+                            logger.warning(f"⚠️ {rest} mensagem(ns) para {key} descartada(s)")
+                        break
+            except Exception:
+                logger.exception(f"🔥 Erro inesperado no worker {number} do outbox")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, key: Hashable, destination: abc.Messageable, batch: List[OutboxMessage]) -> bool:
+        """
+        Envia um lote, com retries para erros passageiros. Retorna False só quando o destino não aceita
+        mais mensagens (Forbidden / NotFound); um lote que falhou por timeout ou 5xx é contado e o
+        próximo ainda é tentado.
+        """
+        first = batch[0]
+        content = "\n".join(m.content for m in batch) if len(batch) > 1 else first.content
+        kwargs = {"content": content}
+        if first.embed is not None:
+            kwargs["embed"] = first.embed
+        if first.view is not None:
+            kwargs["view"] = first.view
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await destination.send(**kwargs)
+                now = time.monotonic()
+                self._latencies.extend(now - m.enqueued_at for m in batch)
+                self.stats["sent"] += 1
+                self.stats["delivered"] += len(batch)
+                return True
+            except Forbidden:
+                self._unreachable[key] = time.monotonic() + self.forbidden_ttl
+                self.stats["forbidden"] += len(batch)
+                logger.warning(f"🚫 Sem permissão para enviar para {key}; ignorando por {self.forbidden_ttl:.0f}s")
+                return False
+            except NotFound:
+                self.stats["failed"] += len(batch)
+                logger.warning(f"⚠️ Destino {key} não existe mais")
+                return False
+            except (asyncio.TimeoutError, OSError) as e:
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(random.uniform(0, min(10.0, 0.5 * 2 ** attempt)))
+                    continue
+                self.stats["failed"] += len(batch)
+                logger.error(f"❌ Falha de conexão ao enviar para {key}: {e}")
+                return True
+            except HTTPException as e:
+                if (e.status == 429 or e.status >= 500) and attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(random.uniform(0, min(10.0, 0.5 * 2 ** attempt)))
+                    continue
+                self.stats["failed"] += len(batch)
+                logger.error(f"❌ Falha ao enviar para {key}: {e}")
+                return True
+        return True
@@ -0,0 +1,154 @@
+import asyncio
+import random
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import aiohttp
+from loguru import logger
+
+from models.reservation import ReservationResponse
+from services.api_client import APIClient, APIError
+from services.reservation_service import ReservationService
+from utils.decoding import decode, json_loads
+
+# Tipos de evento publicados pelo backend
+CREATED = "reservation.created"
+UPDATED = "reservation.updated"
+DELETED = "reservation.deleted"
+
+
+class ReservationEventStream:
+    """
+    Assina os eventos de reserva do backend (SSE em `endpoint`) e aplica cada um no ReservationService,
+    mantendo o índice e as versões de disponibilidade em dia sem consultar a API.
+
+    - cada evento tem um número de sequência (`id` do SSE); repetidos ou antigos são ignorados
+    - ao reconectar envia Last-Event-ID e o servidor reenvia o que ficou para trás
+    - enquanto o stream está fora, consulta `GET endpoint?after=<seq>` a cada `poll_interval` segundos
+    """
+
+    def __init__(self, client: APIClient, reservation_service: ReservationService,
+                 endpoint: str = "/reservation/events", poll_interval: float = 30.0, read_timeout: float = 60.0,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0):
+        self.client = client
+        self.reservation_service = reservation_service
+        self.endpoint = endpoint
+        self.poll_interval = poll_interval
+        self.read_timeout = read_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.last_sequence: Optional[int] = None
+        self.connected = False
+        self._attempt = 0
+        self._task: Optional[asyncio.Task] = None
+        self._poller: Optional[asyncio.Task] = None
+        # Stream e polling podem se cruzar na troca; os eventos são aplicados um de cada vez, em ordem
+        self._applying = asyncio.Lock()
+        self.stats = {"events": 0, "duplicates": 0, "ignored": 0, "reconnects": 0, "polls": 0, "errors": 0}
+
+    # ---------------- Ciclo de vida ----------------
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"📡 Assinando eventos de reserva em {self.endpoint}")
+
+    async def close(self):
+        for task in (self._task, self._poller):
+            if task:
+                task.cancel()
+        await asyncio.gather(*(t for t in (self._task, self._poller) if t), return_exceptions=True)
+        self._task = self._poller = None
+        self.connected = False
+        logger.info("📴 Eventos de reserva encerrados")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "connected": self.connected, "last_sequence": self.last_sequence}
+
+    # ---------------- Stream ----------------
+    async def _run(self):
+        while True:
+            try:
+                last_event_id = str(self.last_sequence) if self.last_sequence is not None else None
+                async for event in self.client.events(
+                        self.endpoint, last_event_id, self.read_timeout, on_open=self._on_open):
+                    await self._apply(event.id, event.event, event.data or None)
+            except asyncio.CancelledError:
+                raise
+            except (APIError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"⚠️ Stream de eventos caiu: {e}")
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.exception(f"❌ Erro no stream de eventos: {e}")
+
+            self._on_close()
+            self.stats["reconnects"] += 1
+            # Full jitter, como nos retries do APIClient
+            await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** self._attempt)))
+            self._attempt += 1
+
+    def _on_open(self):
+        # O polling termina sozinho no próximo ciclo (sem cancelar no meio de um evento)
+        self.connected = True
+        self._attempt = 0
+        logger.info(f"📡 Stream de eventos conectado (a partir de {self.last_sequence})")
+
+    def _on_close(self):
+        self.connected = False
+        if not self._poller or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+
+    # ---------------- Polling (fallback) ----------------
+    async def _poll(self):
+        while not self.connected:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Polling de eventos falhou: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll_once(self):
+        after = f"?after={self.last_sequence}" if self.last_sequence is not None else ""
+        events = await self.client.get(f"{self.endpoint}{after}", ttl=0)
+        self.stats["polls"] += 1
+        for event in events or []:
+            await self._apply(event.get("id"), event.get("event"), event.get("data"))
+
+    # ---------------- Aplicação ----------------
+    async def _apply(self, event_id: Optional[str], kind: str, data: Any):
+        """
+        Aplica um evento (`data` já decodificado, ou o texto JSON do SSE). Um evento que não decodifica ou
+        não aplica é registrado e pulado: a sequência avança mesmo assim, senão o servidor o reenviaria
+        em toda reconexão e o stream pararia nele.
+        """
+        async with self._applying:
+            try:
+                sequence = int(event_id) if event_id is not None else None
+            except ValueError:
+                self.stats["errors"] += 1
+                logger.error(f"❌ Evento {kind} com id inválido: {event_id!r}")
+                return
+            if sequence is not None and self.last_sequence is not None and sequence <= self.last_sequence:
+                self.stats["duplicates"] += 1
+                return
+
+            try:
+                if isinstance(data, (str, bytes)):
+                    data = json_loads(data)
+                if kind in (CREATED, UPDATED):
+                    await self.reservation_service.apply_remote(decode(ReservationResponse, data))
+                elif kind == DELETED:
+                    await self.reservation_service.apply_remote_delete(UUID(str(data["id"])))
+                else:
+                    self.stats["ignored"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.exception(f"❌ Evento {event_id} ({kind}) não aplicado, seguindo adiante: {e}")
+            else:
+                self.stats["events"] += 1
+
+            if sequence is not None:
+                self.last_sequence = sequence
@@ -1,19 +1,73 @@
-from datetime import datetime, timezone
-import random
-from typing import List
+from datetime import datetime, time, timezone
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import UUID, uuid4
 from loguru import logger
 from models.reservation import BotConfig, ReservationPayload, ReservationResponse
 from services.api_client import APIClient
+from services.config_cache import ConfigCache
+from services.storage import ACTIVE_STATUSES, MemoryStorage, StorageBackend
+from utils.availability import AvailabilityMatrix, EquipmentAvailability, SlotSuggestion
+from utils.datetime_utils import to_epoch_minutes
+from utils.interval_index import ReservationIndex, id_int
+from utils.micro_batcher import MicroBatcher
+from utils.schedule import CompiledSchedule
+from utils.sharded_lock import ShardedLocks
+
+
+MINUTES_PER_DAY = 24 * 60
+# Dias de ocupação lidos por vez em find_earliest_slots
+SEARCH_WINDOW_DAYS = 7
+
+
+class ReservationConflictError(Exception):
+    """
+    O horário pedido já foi ocupado por outra reserva (ativa) do mesmo equipamento.
+    """
+
+    def __init__(self, reservation: ReservationPayload, conflicts: List[ReservationResponse]):
+        super().__init__(f"Conflito ao reservar {reservation.equipment_id} de {reservation.start} a {reservation.end}")
+        self.reservation = reservation
+        self.conflicts = conflicts
+
 
 class ReservationService:
-    def __init__(self, client: APIClient):
+    def __init__(self, client: APIClient, storage: Optional[StorageBackend] = None, config_ttl: float = 300.0,
+                 availability_batch_window: float = 0.0):
         self.base_route = "/reservation"
-        self.mock_reservation = []
         self.client = client
+        self.storage = storage or MemoryStorage()
+        self.config_cache = ConfigCache(
+            loader=self._fetch_reservation_config,
+            builder=self._build_reservation_config,
+            ttl=config_ttl)
+        self.index = ReservationIndex()
+        # Escritas do mesmo equipamento são serializadas; equipamentos diferentes seguem em paralelo
+        self.locks = ShardedLocks()
+        self.stats = {"created": 0, "conflicts": 0, "stale_snapshots": 0}
+        # Calendários pedidos juntos (mesmos dias) viram uma busca só de disponibilidade em lote
+        self.availability_batcher = MicroBatcher(self._fetch_availability_batch, window=availability_batch_window)
+
+    async def start(self):
+        async for reservation in self.storage.iter_reservations():
+            self.index.upsert(reservation)
+        logger.info(f"🗂️ {len(self.index)} reservas carregadas no índice")
+
+    async def get_reservation_config(self, guild_id: Optional[int] = None) -> BotConfig:
+        entry = await self.config_cache.get(guild_id)
+        return entry.config
 
-    async def get_reservation_config(self):
-        data = {
+    async def get_reservation_schedule(self, guild_id: Optional[int] = None) -> CompiledSchedule:
+        entry = await self.config_cache.get(guild_id)
+        return entry.schedule
+
+    def invalidate_reservation_config(self, guild_id: Optional[int] = None):
+        self.config_cache.invalidate(guild_id)
+
+    async def _fetch_reservation_config(self, guild_id: Optional[int]) -> dict:
+        # Exemplo real:
+        # return await self.client.get(f"/config/{guild_id}")
+        return {
             "bot_id": "1234",
             "reservation_chanel": "📅reservations", # "📅reservations"
             "reservation_approval_chanel": "📝pending-approval", # 
@@ -26,6 +80,12 @@ class ReservationService:
             "holidays": ["2025-12-25", "2025-09-25", "2025-01-01"]
         }
 
+    @staticmethod
+    def _build_reservation_config(data: dict) -> BotConfig:
+        data = dict(data)
+        data.pop("version", None)
+        data.pop("etag", None)
+
         # Conversão das strings para time / datetime
         data['opening_time'] = datetime.strptime(data['opening_time'], "%H:%M").time()
         data['closing_time'] = datetime.strptime(data['closing_time'], "%H:%M").time()
@@ -35,38 +95,303 @@ class ReservationService:
         config = BotConfig(**data)
         return config
     
-    async def create_reservation(self, reservation: ReservationPayload) -> UUID:
-        logger.info(f"⏰ Reserva realizada:\n {reservation.model_dump()}")
-        self.mock_reservation.append(reservation)
-        now = datetime.now(timezone.utc)
-        return ReservationResponse(
-            id=uuid4(),
-            updated_at=now,
-            created_at=now,
-            deleted_at=None,
-            **reservation.model_dump()
-        )
+    def _lock(self, equipment_id: Union[int, UUID]):
+        return self.locks.lock_for(id_int(equipment_id))
+
+    def availability_version(self, equipment_id: UUID) -> int:
+        """
+        Versão da agenda do equipamento. Guarde-a junto com a foto de disponibilidade e passe em
+        `create_reservation(expected_version=...)`.
+        """
+        return self.index.version(equipment_id)
+
+    def availability_week_version(self, equipment_id: UUID, week: int) -> int:
+        """
+        Como availability_version, mas só da semana `week` (epoch_week): reservas de outras semanas não a mudam.
+        """
+        return self.index.week_version(equipment_id, week)
+
+    async def create_reservation(
+        self, reservation: ReservationPayload, expected_version: Optional[int] = None
+    ) -> ReservationResponse:
+        """
+        Cria a reserva sob o lock do equipamento. Se a agenda mudou desde `expected_version` (ou se nenhuma
+        versão foi informada), confere no índice se o intervalo ainda está livre; se não estiver, levanta
+        ReservationConflictError sem gravar nada.
+        """
+        async with self._lock(reservation.equipment_id):
+            current = self.index.version(reservation.equipment_id)
+            if expected_version is None or expected_version != current:
+                if expected_version is not None:
+                    self.stats["stale_snapshots"] += 1
+                conflicts = [
+                    record for record in self.index.overlapping(
+                        start=to_epoch_minutes(reservation.start),
+                        end=to_epoch_minutes(reservation.end),
+                        equipment_ids=[reservation.equipment_id])
+                    if record.status in ACTIVE_STATUSES
+                ]
+                if conflicts:
+                    self.stats["conflicts"] += 1
+                    logger.info(f"⚔️ Conflito de reserva no equipamento {reservation.equipment_id}")
+                    raise ReservationConflictError(reservation, [c.to_response() for c in conflicts])
+
+            logger.info(f"⏰ Reserva realizada:\n {reservation.model_dump()}")
+            now = datetime.now(timezone.utc)
+            response = ReservationResponse(
+                id=uuid4(),
+                updated_at=now,
+                created_at=now,
+                deleted_at=None,
+                **reservation.model_dump()
+            )
+            await self.storage.add_reservation(response)
+            self.index.upsert(response)
+            self.stats["created"] += 1
+            return response
     
-    async def fetch_unavailable_slots(self, next_days: List[str], equipment_id: UUID):
+    async def fetch_unavailable_slots(self, next_days: List[str], equipment_id: UUID,
+                                      schedule: Optional[CompiledSchedule] = None):
+        """
+        Horários ocupados ("HH:MM") por dia, a partir de uma busca por intervalo nas reservas do equipamento.
+        """
+        schedule = schedule or await self.get_reservation_schedule()
+        availability = await self.fetch_equipment_availability(next_days, equipment_id, schedule)
+        return {label: schedule.grid.labels_from_mask(mask) for label, mask in availability.days.items()}
+
+    async def fetch_equipment_availability(self, next_days: List[str], equipment_id: UUID,
+                                           schedule: Optional[CompiledSchedule] = None) -> EquipmentAvailability:
+        """
+        Ocupação de um equipamento nos dias pedidos, já em bitmask. Pedidos simultâneos para os mesmos dias
+        são agrupados pelo micro-batcher em uma única `fetch_availability_matrix`.
+        """
         logger.info(f"Buscando horarios indisponiveis do equipamento {equipment_id}")
-        horarios = ["08:00", "09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00", "19:00", "20:00"]
-        mock_response = { day: sorted(random.sample(horarios, 7)) for day in next_days }
-        mock_response[next_days[0]] = horarios
-        mock_response[next_days[-1]] = []
-        return mock_response
-    
+        schedule = schedule or await self.get_reservation_schedule()
+        return await self.availability_batcher.get((schedule, tuple(next_days)), equipment_id)
+
+    async def _fetch_availability_batch(self, group, equipment_ids: List[UUID]) -> Dict[UUID, EquipmentAvailability]:
+        schedule, next_days = group
+        matrix = await self.fetch_availability_matrix(equipment_ids, list(next_days), schedule)
+        return {equipment_id: matrix.availability(equipment_id) for equipment_id in equipment_ids}
+
+    async def fetch_availability_matrix(self, equipment_ids: Iterable[UUID], next_days: Optional[List[str]] = None,
+                                        schedule: Optional[CompiledSchedule] = None) -> AvailabilityMatrix:
+        """
+        Ocupação de vários equipamentos em vários dias de uma vez (equipamento x dia x bitmask de slots).
+        """
+        schedule = schedule or await self.get_reservation_schedule()
+        next_days = schedule.bookable_days() if next_days is None else next_days
+        # Exemplo real (uma ida à API para todos, no formato compacto de AvailabilityMatrix.to_wire):
+        # data = await self.client.post(f"{self.base_route}/availability", json={
+        #     "equipment_ids": [str(e) for e in equipment_ids],
+        #     "days": [schedule.day_date(d).isoformat() for d in next_days]})
+        # return AvailabilityMatrix.from_wire(data, schedule.grid)
+        occupancy = await self.fetch_occupancy(next_days, equipment_ids, schedule)
+        return AvailabilityMatrix(schedule.grid, next_days, {
+            equipment_id: [masks[label] for label in next_days] for equipment_id, masks in occupancy.items()
+        })
+
+    async def fetch_occupancy(self, next_days: List[str], equipment_ids: Iterable[UUID],
+                              schedule: Optional[CompiledSchedule] = None) -> Dict[UUID, Dict[str, int]]:
+        """
+        Bitmask de ocupação por equipamento e por dia, lida do índice em memória (espelho do storage,
+        atualizado sob o mesmo lock), sem consulta nem conversão para ReservationResponse.
+        """
+        schedule = schedule or await self.get_reservation_schedule()
+        grid = schedule.grid
+        occupancy = {equipment_id: dict.fromkeys(next_days, 0) for equipment_id in equipment_ids}
+        if not next_days or not occupancy:
+            return occupancy
+
+        # Dia (desde a época) → (rótulo, minuto de abertura)
+        opening_offset = schedule.config.opening_time.hour * 60 + schedule.config.opening_time.minute
+        openings = {}
+        for label in next_days:
+            day_number = to_epoch_minutes(datetime.combine(schedule.day_date(label), time.min)) // MINUTES_PER_DAY
+            openings[day_number] = (label, day_number * MINUTES_PER_DAY + opening_offset)
+        first_day, last_day = min(openings), max(openings)
+
+        for equipment_id, masks in occupancy.items():
+            bucket = self.index.by_equipment.get(id_int(equipment_id))
+            if not bucket:
+                continue
+            for r in bucket.overlapping(first_day * MINUTES_PER_DAY, (last_day + 1) * MINUTES_PER_DAY):
+                if r.status not in ACTIVE_STATUSES:
+                    continue
+                for day_number in range(max(r.start // MINUTES_PER_DAY, first_day),
+                                        min((r.end - 1) // MINUTES_PER_DAY, last_day) + 1):
+                    if day_number in openings:
+                        label, opening = openings[day_number]
+                        masks[label] |= grid.mask_between(r.start - opening, r.end - opening)
+        return occupancy
+
+    async def find_earliest_slots(
+        self,
+        equipment_ids: Iterable[UUID],
+        blocks: int,
+        schedule: Optional[CompiledSchedule] = None,
+        limit: int = 5,
+        max_days: Optional[int] = None,
+    ) -> List[SlotSuggestion]:
+        """
+        Primeiro horário com `blocks` slots livres seguidos em cada equipamento; devolve os `limit` mais cedo.
+        A ocupação de todos os equipamentos vem de uma vez por janela de dias e, por dia, cada equipamento
+        é resolvido com uma busca em bitmask.
+        """
+        schedule = schedule or await self.get_reservation_schedule()
+        grid = schedule.grid
+        equipment_ids = list(equipment_ids)
+        next_days = schedule.bookable_days(max_days=max_days)
+        # Versões lidas antes da consulta (mesma regra do calendário em show_available_dates)
+        versions = {equipment_id: self.availability_version(equipment_id) for equipment_id in equipment_ids}
+
+        suggestions: List[SlotSuggestion] = []
+        pending = set(equipment_ids)
+        occupancy: Dict[UUID, Dict[str, int]] = {}
+        for position, label in enumerate(next_days):
+            if position % SEARCH_WINDOW_DAYS == 0:
+                # Ocupação em janelas: quando há vaga logo, os dias seguintes nem são lidos
+                window = next_days[position:position + SEARCH_WINDOW_DAYS]
+                occupancy = await self.fetch_occupancy(window, pending, schedule)
+            found = []
+            for equipment_id in pending:
+                slot = grid.first_run(occupancy[equipment_id][label], blocks)
+                if slot is not None:
+                    found.append((slot, equipment_id))
+            # Dia inteiro avaliado antes de parar: um equipamento pode ter horário mais cedo no mesmo dia
+            for slot, equipment_id in sorted(found, key=lambda f: (f[0], str(f[1]))):
+                suggestions.append(SlotSuggestion(
+                    equipment_id, label, grid.labels[slot], grid.labels[slot + blocks], versions[equipment_id]))
+                pending.discard(equipment_id)
+            if len(suggestions) >= limit or not pending:
+                break
+        return suggestions[:limit]
+
     async def update_reservation(self, reservation: ReservationResponse) -> ReservationResponse:
         """
-        Atualiza dados de um usuário existente.
+        Atualiza dados de uma reserva existente.
         """
         logger.info(f"✏️ Atualizando reserva {reservation.id} com {reservation.status}")
         # Exemplo real:
-        # response = await self.client.patch(f"/users/{user_id}", json=payload)
-        # return UserResponse(**response)
+        # response = await self.client.patch(f"{self.base_route}/{reservation.id}", json=payload)
+        # return decode(ReservationResponse, response)
 
-        # Mock:
-        reservation.updated_at = datetime.now(timezone.utc)
-        return ReservationResponse(**reservation.model_dump())
+        async with self._lock(reservation.equipment_id):
+            reservation.updated_at = datetime.now(timezone.utc)
+            await self.storage.update_reservation(reservation)
+            self.index.upsert(reservation)
+        return reservation
     
+    async def decide_reservation(self, reservation: ReservationResponse, status: str,
+                                 responsible_id: UUID) -> Optional[ReservationResponse]:
+        """
+        Aprova ou recusa uma reserva pendente. Retorna None se ela já não está pendente (outro clique,
+        outro responsável ou mudança vinda do backend chegou antes); a reserva passada não é alterada.
+        """
+        async with self._lock(reservation.equipment_id):
+            record = self.index.get(reservation.id)
+            if record is None or record.status != "pending":
+                return None
+            logger.info(f"✏️ Atualizando reserva {reservation.id} com {status}")
+            decided = reservation.model_copy(update={
+                "status": status, "responsible_id": responsible_id, "updated_at": datetime.now(timezone.utc)})
+            await self.storage.update_reservation(decided)
+            self.index.upsert(decided)
+        return decided
+
+    # ---------------- Eventos do backend ----------------
+    async def apply_remote(self, reservation: ReservationResponse):
+        """
+        Aplica uma reserva criada ou alterada fora do bot (evento do backend). Idempotente: o eco das
+        reservas feitas pelo próprio bot só regrava o mesmo registro.
+        """
+        async with self._lock(reservation.equipment_id):
+            if self.index.get(reservation.id) is None:
+                await self.storage.add_reservation(reservation)
+            else:
+                await self.storage.update_reservation(reservation)
+            self.index.upsert(reservation)
+
+    async def apply_remote_delete(self, reservation_id: UUID):
+        while True:
+            record = self.index.get(reservation_id)
+            if record is None:
+                return
+            async with self._lock(record.equipment_id):
+                # Confere de novo já com a trava: a reserva pode ter sido removida ou trocado de equipamento
+                current = self.index.get(reservation_id)
+                if current is None:
+                    return
+                if current.equipment_id != record.equipment_id:
+                    continue
+                await self.storage.delete_reservation(reservation_id)
+                self.index.remove(reservation_id)
+                return
+
     async def get_reservations(self):
-        return self.mock_reservation
\ No newline at end of file
+        return await self.storage.list_reservations()
+
+    async def find_reservations(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        equipment_ids: Optional[Iterable[UUID]] = None,
+        status: Optional[str] = None,
+    ) -> List[ReservationResponse]:
+        """
+        Reservas que se sobrepõem a [start, end), filtradas por equipamento e status, ordenadas por início.
+        """
+        return [record.to_response() for record in self.index.overlapping(
+            start=to_epoch_minutes(start) if start else None,
+            end=to_epoch_minutes(end) if end else None,
+            equipment_ids=equipment_ids,
+            status=status)]
+
+    async def get_reservations_page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        equipment_ids: Optional[Iterable[UUID]] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[List[ReservationResponse], bool]:
+        """
+        Uma página de `find_reservations` a partir de um cursor (ID da reserva): a seguinte a `after`
+        ou a anterior a `before`. Retorna a página, em ordem de início, e se há mais reservas naquela direção.
+        """
+        found = list(islice(self.index.iter_overlapping(
+            start=to_epoch_minutes(start) if start else None,
+            end=to_epoch_minutes(end) if end else None,
+            equipment_ids=equipment_ids,
+            status=status,
+            after=before or after,
+            reverse=before is not None), limit + 1))
+        page = [record.to_response() for record in found[:limit]]
+        if before is not None:
+            page.reverse()
+        return page, len(found) > limit
+
+    async def iter_reservations(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        equipment_ids: Optional[Iterable[UUID]] = None,
+        status: Optional[str] = None,
+        page_size: int = 100,
+    ) -> AsyncIterator[ReservationResponse]:
+        """
+        Percorre as reservas de `find_reservations` em páginas de `page_size`, sem montar a lista inteira.
+        Cada página recomeça do cursor, então reservas criadas no meio do caminho não quebram a iteração.
+        """
+        equipment_ids = list(equipment_ids) if equipment_ids is not None else None
+        after = None
+        while True:
+            page, has_more = await self.get_reservations_page(
+                page_size, after=after, start=start, end=end, equipment_ids=equipment_ids, status=status)
+            for reservation in page:
+                yield reservation
+            if not has_more:
+                return
+            after = str(page[-1].id)
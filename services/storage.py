@@ -0,0 +1,345 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Optional, Sequence
+from uuid import UUID
+
+import aiosqlite
+from loguru import logger
+
+from models.equipment import EquipmentResponse
+from models.reservation import ReservationResponse
+from utils.datetime_utils import from_epoch_minutes, to_epoch_minutes
+from utils.decoding import decode_list
+
+# Reservas recusadas não ocupam horário
+ACTIVE_STATUSES = ("pending", "approved")
+
+
+class StorageBackend(ABC):
+    """
+    Armazenamento usado por ReservationService e EquipmentService.
+    """
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    # ---------------- Reservas ----------------
+    @abstractmethod
+    async def add_reservation(self, reservation: ReservationResponse):
+        ...
+
+    async def add_reservations(self, reservations: Iterable[ReservationResponse]):
+        for reservation in reservations:
+            await self.add_reservation(reservation)
+
+    @abstractmethod
+    async def update_reservation(self, reservation: ReservationResponse):
+        ...
+
+    @abstractmethod
+    async def delete_reservation(self, reservation_id: UUID):
+        ...
+
+    @abstractmethod
+    async def list_reservations(
+        self, status: Optional[str] = None, after: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[ReservationResponse]:
+        """
+        Reservas ordenadas por (início, id). `after` é o ID da última reserva da página anterior (keyset).
+        """
+
+    async def iter_reservations(self, status: Optional[str] = None, page_size: int = 500) -> AsyncIterator[ReservationResponse]:
+        """
+        Percorre todas as reservas em páginas de `page_size`, sem carregar tudo de uma vez.
+        """
+        after = None
+        while True:
+            page = await self.list_reservations(status=status, after=after, limit=page_size)
+            for reservation in page:
+                yield reservation
+            if len(page) < page_size:
+                return
+            after = str(page[-1].id)
+
+    @abstractmethod
+    async def reservations_overlapping(
+        self,
+        equipment_id: UUID,
+        start: datetime,
+        end: datetime,
+        statuses: Sequence[str] = ACTIVE_STATUSES,
+    ) -> List[ReservationResponse]:
+        """
+        Reservas do equipamento que se sobrepõem ao intervalo [start, end), direto no armazenamento.
+
+        O bot responde essas consultas pelo ReservationIndex em memória (carregado em ReservationService.start);
+        esta é a consulta para quando o índice não está carregado: ferramentas, scripts e os benchmarks.
+        """
+
+    # ---------------- Equipamentos ----------------
+    @abstractmethod
+    async def add_equipment(self, equipment: EquipmentResponse):
+        ...
+
+    @abstractmethod
+    async def list_equipment(
+        self, after: Optional[str] = None, before: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[EquipmentResponse]:
+        """
+        Equipamentos ordenados por (created_at, nome, id). `after`/`before` são IDs usados como cursor:
+        a página seguinte ou a anterior (ainda em ordem crescente).
+        """
+
+    async def iter_equipment(self, page_size: int = 500) -> AsyncIterator[EquipmentResponse]:
+        after = None
+        while True:
+            page = await self.list_equipment(after=after, limit=page_size)
+            for equipment in page:
+                yield equipment
+            if len(page) < page_size:
+                return
+            after = str(page[-1].id)
+
+    @abstractmethod
+    async def count_equipment(self) -> int:
+        ...
+
+
+class MemoryStorage(StorageBackend):
+    def __init__(self):
+        self.reservations: List[ReservationResponse] = []
+        self.equipment: List[EquipmentResponse] = []
+
+    @staticmethod
+    def _reservation_key(r: ReservationResponse):
+        return to_epoch_minutes(r.start), str(r.id)
+
+    @staticmethod
+    def _equipment_key(e: EquipmentResponse):
+        return e.created_at, e.name, str(e.id)
+
+    @staticmethod
+    def _page(ordered: list, key, after: Optional[str], before: Optional[str], limit: Optional[int]) -> list:
+        cursor_id = after or before
+        cursor = next((key(item) for item in ordered if str(item.id) == cursor_id), None) if cursor_id else None
+        if cursor is not None:
+            ordered = [item for item in ordered if (key(item) > cursor if after else key(item) < cursor)]
+        if limit is None:
+            return ordered
+        return ordered[-limit:] if before and limit else ordered[:limit]
+
+    async def add_reservation(self, reservation: ReservationResponse):
+        self.reservations.append(reservation)
+
+    async def update_reservation(self, reservation: ReservationResponse):
+        for i, r in enumerate(self.reservations):
+            if r.id == reservation.id:
+                self.reservations[i] = reservation
+                return
+
+    async def delete_reservation(self, reservation_id: UUID):
+        self.reservations = [r for r in self.reservations if r.id != reservation_id]
+
+    async def list_reservations(self, status=None, after=None, limit=None) -> List[ReservationResponse]:
+        ordered = sorted(
+            (r for r in self.reservations if status is None or r.status == status), key=self._reservation_key)
+        return self._page(ordered, self._reservation_key, after, None, limit)
+
+    async def reservations_overlapping(self, equipment_id, start, end, statuses=ACTIVE_STATUSES):
+        # Compara em minutos, como o SQLite: reservas do bot (sem timezone) e da API (UTC) convivem
+        start_min, end_min = to_epoch_minutes(start), to_epoch_minutes(end)
+        return [
+            r for r in self.reservations
+            if r.equipment_id == equipment_id and r.status in statuses
+            and to_epoch_minutes(r.start) < end_min and to_epoch_minutes(r.end) > start_min
+        ]
+
+    async def add_equipment(self, equipment: EquipmentResponse):
+        self.equipment.append(equipment)
+
+    async def list_equipment(self, after=None, before=None, limit=None) -> List[EquipmentResponse]:
+        ordered = sorted(self.equipment, key=self._equipment_key)
+        return self._page(ordered, self._equipment_key, after, before, limit)
+
+    async def count_equipment(self) -> int:
+        return len(self.equipment)
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Backend SQLite assíncrono (aiosqlite) em modo WAL.
+
+    `start`/`end` das reservas ficam em minutos desde a época (INTEGER) para que as
+    buscas por intervalo usem os índices (equipment_id, start) e (status, start).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reservation (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            equipment_id TEXT NOT NULL,
+            responsible_id TEXT,
+            start INTEGER NOT NULL,
+            "end" INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            deleted_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS ix_reservation_equipment_start ON reservation (equipment_id, start);
+        CREATE INDEX IF NOT EXISTS ix_reservation_status_start ON reservation (status, start);
+
+        CREATE TABLE IF NOT EXISTS equipment (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            deleted_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS ix_reservation_start_id ON reservation (start, id);
+        CREATE INDEX IF NOT EXISTS ix_equipment_created_name ON equipment (created_at, name, id);
+    """
+
+    RESERVATION_COLUMNS = 'id, user_id, equipment_id, responsible_id, start, "end", status, created_at, updated_at, deleted_at'
+
+    def __init__(self, path: str = "reservations.db"):
+        self.path = path
+        self.db = None
+        # Maior duração já gravada: limita por baixo a busca por sobreposição no índice de start
+        self.max_duration = 0
+
+    async def start(self):
+        if self.db:
+            return
+        self.db = await aiosqlite.connect(self.path)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute("PRAGMA synchronous=NORMAL")
+        await self.db.executescript(self.SCHEMA)
+        await self.db.commit()
+
+        async with self.db.execute('SELECT MAX("end" - start) FROM reservation') as cursor:
+            row = await cursor.fetchone()
+        self.max_duration = row[0] or 0
+        logger.info(f"🗄️ SQLite inicializado em {self.path}")
+
+    async def close(self):
+        if self.db:
+            await self.db.close()
+            self.db = None
+            logger.info("🗄️ SQLite encerrado")
+
+    # ---------------- Conversões ----------------
+    @staticmethod
+    def _reservation_row(r: ReservationResponse) -> tuple:
+        return (
+            str(r.id), str(r.user_id), str(r.equipment_id),
+            str(r.responsible_id) if r.responsible_id else None,
+            to_epoch_minutes(r.start), to_epoch_minutes(r.end), r.status,
+            r.created_at.isoformat(), r.updated_at.isoformat(),
+            r.deleted_at.isoformat() if r.deleted_at else None,
+        )
+
+    @staticmethod
+    def _reservation_from_row(row) -> dict:
+        return {
+            "id": row[0], "user_id": row[1], "equipment_id": row[2], "responsible_id": row[3],
+            "start": from_epoch_minutes(row[4]), "end": from_epoch_minutes(row[5]), "status": row[6],
+            "created_at": row[7], "updated_at": row[8], "deleted_at": row[9],
+        }
+
+    async def _fetch_reservations(self, query: str, params: Iterable) -> List[ReservationResponse]:
+        async with self.db.execute(query, tuple(params)) as cursor:
+            rows = await cursor.fetchall()
+        # Valida o lote inteiro de uma vez (utils/decoding), em vez de um construtor por linha
+        return decode_list(ReservationResponse, [self._reservation_from_row(row) for row in rows])
+
+    # ---------------- Reservas ----------------
+    async def add_reservation(self, reservation: ReservationResponse):
+        await self.add_reservations([reservation])
+
+    async def add_reservations(self, reservations: Iterable[ReservationResponse]):
+        rows = [self._reservation_row(r) for r in reservations]
+        if not rows:
+            return
+        await self.db.executemany(
+            f"INSERT INTO reservation ({self.RESERVATION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        await self.db.commit()
+        self.max_duration = max(self.max_duration, max(row[5] - row[4] for row in rows))
+
+    async def update_reservation(self, reservation: ReservationResponse):
+        row = self._reservation_row(reservation)
+        await self.db.execute(
+            'UPDATE reservation SET user_id = ?, equipment_id = ?, responsible_id = ?, start = ?, "end" = ?, '
+            'status = ?, created_at = ?, updated_at = ?, deleted_at = ? WHERE id = ?',
+            (*row[1:], row[0]))
+        await self.db.commit()
+        self.max_duration = max(self.max_duration, row[5] - row[4])
+
+    async def delete_reservation(self, reservation_id: UUID):
+        await self.db.execute("DELETE FROM reservation WHERE id = ?", (str(reservation_id),))
+        await self.db.commit()
+
+    async def list_reservations(self, status=None, after=None, limit=None) -> List[ReservationResponse]:
+        where, params = [], []
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if after is not None:
+            where.append("(start, id) > (SELECT start, id FROM reservation WHERE id = ?)")
+            params.append(after)
+        query = f"SELECT {self.RESERVATION_COLUMNS} FROM reservation"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY start, id LIMIT ?"
+        return await self._fetch_reservations(query, (*params, -1 if limit is None else limit))
+
+    async def reservations_overlapping(self, equipment_id, start, end, statuses=ACTIVE_STATUSES):
+        start_min, end_min = to_epoch_minutes(start), to_epoch_minutes(end)
+        placeholders = ", ".join("?" * len(statuses))
+        return await self._fetch_reservations(
+            f"SELECT {self.RESERVATION_COLUMNS} FROM reservation "
+            f"WHERE equipment_id = ? AND start >= ? AND start < ? AND \"end\" > ? AND status IN ({placeholders}) "
+            f"ORDER BY start",
+            (str(equipment_id), start_min - self.max_duration, end_min, start_min, *statuses))
+
+    # ---------------- Equipamentos ----------------
+    async def add_equipment(self, equipment: EquipmentResponse):
+        await self.db.execute(
+            "INSERT INTO equipment (id, name, description, status, created_at, updated_at, deleted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (str(equipment.id), equipment.name, equipment.description, equipment.status,
+             equipment.created_at.isoformat(), equipment.updated_at.isoformat(),
+             equipment.deleted_at.isoformat() if equipment.deleted_at else None))
+        await self.db.commit()
+
+    async def list_equipment(self, after=None, before=None, limit=None) -> List[EquipmentResponse]:
+        query = "SELECT id, name, description, status, created_at, updated_at, deleted_at FROM equipment"
+        params = []
+        if after or before:
+            query += (f" WHERE (created_at, name, id) {'>' if after else '<'} "
+                      "(SELECT created_at, name, id FROM equipment WHERE id = ?)")
+            params.append(after or before)
+        # A página anterior é buscada de trás para frente e desvirada abaixo
+        order = "DESC" if before else "ASC"
+        query += f" ORDER BY created_at {order}, name {order}, id {order} LIMIT ?"
+        params.append(-1 if limit is None else limit)
+
+        async with self.db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+        if before:
+            rows.reverse()
+        return decode_list(EquipmentResponse, [
+            {"id": row[0], "name": row[1], "description": row[2], "status": row[3],
+             "created_at": row[4], "updated_at": row[5], "deleted_at": row[6]}
+            for row in rows
+        ])
+
+    async def count_equipment(self) -> int:
+        async with self.db.execute("SELECT COUNT(*) FROM equipment") as cursor:
+            (count,) = await cursor.fetchone()
+        return count
@@ -0,0 +1,92 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+
+from loguru import logger
+
+from services.reservation_service import ReservationService
+from utils.datetime_utils import EPOCH
+from utils.interval_index import id_int
+from utils.usage_stats import MINUTES_PER_DAY, ReservationArrays, UsageReport, compute_usage, np
+
+
+class AnalyticsUnavailableError(Exception):
+    """
+    numpy não está instalado.
+    """
+
+
+class UsageAnalytics:
+    """
+    Relatórios de uso dos equipamentos (ocupação, aprovação, antecedência) a partir do índice de reservas.
+
+    As reservas de cada equipamento são lidas do índice no event loop (foto consistente) e as contas rodam
+    em `compute_usage`. Janelas grandes (equipamentos x dias x slots + reservas acima de
+    `process_threshold`) montam os arrays em uma thread e fazem as contas em um processo separado,
+    para não travar o bot.
+    """
+
+    def __init__(self, reservation_service: ReservationService, process_threshold: int = 200_000,
+                 max_workers: int = 1):
+        self.reservation_service = reservation_service
+        self.process_threshold = process_threshold
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"reports": 0, "offloaded": 0}
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def usage_report(self, first: date, last: date, equipment_ids: Iterable[UUID],
+                           guild_id: Optional[int] = None) -> UsageReport:
+        """
+        Uso dos equipamentos de `first` a `last` (inclusive).
+        """
+        if not self.available:
+            raise AnalyticsUnavailableError("Instale o numpy para gerar relatórios de uso")
+
+        schedule = await self.reservation_service.get_reservation_schedule(guild_id)
+        config = schedule.config
+        first_day = (first - EPOCH.date()).days
+        day_count = (last - first).days + 1
+        days = [first + timedelta(days=d) for d in range(day_count)]
+        open_days = [d.isoweekday() in schedule.weekdays and d not in schedule.holidays for d in days]
+
+        keys = [id_int(e) for e in equipment_ids]
+        window = (first_day * MINUTES_PER_DAY, (first_day + day_count) * MINUTES_PER_DAY)
+        # Listas novas com registros que o índice não altera (upsert troca o registro): é uma foto estável
+        buckets = [
+            self.reservation_service.index.by_equipment[key].overlapping(*window)
+            if key in self.reservation_service.index.by_equipment else []
+            for key in keys
+        ]
+        # Os relatórios trazem UUIDs, não os inteiros do índice
+        equipment_uuids = [UUID(int=key) for key in keys]
+        params = (first_day, day_count, open_days,
+                  config.opening_time.hour * 60 + config.opening_time.minute,
+                  config.closing_time.hour * 60 + config.closing_time.minute,
+                  config.min_reservation)
+
+        self.stats["reports"] += 1
+        size = len(keys) * day_count * schedule.grid.slot_count + sum(map(len, buckets))
+        if size < self.process_threshold:
+            return compute_usage(ReservationArrays.from_buckets(equipment_uuids, buckets), *params)
+
+        logger.info(f"📊 Relatório de uso grande ({len(keys)} equipamentos x {day_count} dias), "
+                    f"calculando em outro processo")
+        self.stats["offloaded"] += 1
+        arrays = await asyncio.to_thread(ReservationArrays.from_buckets, equipment_uuids, buckets)
+        if self._pool is None:
+            # spawn: o processo do bot já tem threads (aiosqlite, executor), e fork copiaria travas no meio do uso
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return await asyncio.get_running_loop().run_in_executor(self._pool, compute_usage, arrays, *params)
@@ -1,12 +1,35 @@
+import asyncio
+from typing import Dict, Iterable, List
 from uuid import uuid4
 from loguru import logger
 from datetime import datetime, timezone
 from models.user import UserPayload, UserResponse
-from services.api_client import APIClient
+from services.api_client import APIClient, APIError
+from utils.single_flight import SingleFlight
+from utils.ttl_cache import TTLCache
+
+# Quantos membros vão em cada requisição de busca em lote
+BULK_LOOKUP_SIZE = 100
+
+# Respostas que indicam que a API não tem o endpoint de cadastro em lote
+BULK_UNSUPPORTED_STATUS = {404, 405}
+
 
 class UserService:
-    def __init__(self, client: APIClient):
+    """
+    Resolve membro do Discord → usuário da API. O mapeamento fica em um cache com TTL,
+    preenchido na entrada do membro, na primeira busca e no aquecimento em lote (warm_up).
+    """
+
+    def __init__(self, client: APIClient, cache_ttl: float = 3600.0, cache_max_size: int = 10000,
+                 create_concurrency: int = 5):
         self.client = client
+        self.create_concurrency = create_concurrency
+        self.bulk_create_supported = True
+        self.cache: TTLCache[UserResponse] = TTLCache(max_size=cache_max_size, ttl=cache_ttl)
+        self._inflight = SingleFlight()
+        self.coalesced = 0
+        self.bulk_requests = 0
 
     async def create_user(self, user: UserPayload) -> UserResponse:
         """
@@ -14,12 +37,11 @@ class UserService:
         """
         logger.info(f"✅ Registrando usuário: {user.model_dump()}")
         # Aqui você chamaria algo como:
-        # response = await self.client.post("/users", json=user.dict())
-        # return UserResponse(**response)
+        # return await self.client.post_model("/users", user.model_dump(mode="json"), UserResponse)
 
         # Mock para testes:
         now = datetime.now(timezone.utc)
-        return UserResponse(
+        created = UserResponse(
             id=uuid4(),
             member_id=user.member_id,
             username=user.username,
@@ -28,19 +50,119 @@ class UserService:
             updated_at=now,
             deleted_at=None
         )
+        self._remember(created)
+        return created
+
+    async def create_users(self, users: List[UserPayload]) -> List[UserResponse]:
+        """
+        Cadastra vários usuários em uma requisição. Se a API não tiver o endpoint em lote,
+        cai para chamadas individuais com no máximo `create_concurrency` ao mesmo tempo.
+        Falhas individuais são registradas e ficam de fora do retorno.
+        """
+        if not users:
+            return []
+
+        if self.bulk_create_supported:
+            try:
+                created = await self._bulk_create(users)
+            except APIError as e:
+                if e.status not in BULK_UNSUPPORTED_STATUS:
+                    raise
+                self.bulk_create_supported = False
+                logger.warning("⚠️ API sem cadastro em lote; usando chamadas individuais")
+            else:
+                for user in created:
+                    self._remember(user)
+                return created
+
+        semaphore = asyncio.Semaphore(self.create_concurrency)
+
+        async def create_one(user: UserPayload) -> UserResponse:
+            async with semaphore:
+                return await self.create_user(user)
+
+        results = await asyncio.gather(*(create_one(u) for u in users), return_exceptions=True)
+        created = []
+        for user, result in zip(users, results):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ Erro ao registrar usuário {user.member_id}: {result}")
+            else:
+                created.append(result)
+        return created
 
     async def get_user(self, user: UserPayload) -> UserResponse:
         """
-        Busca o usuário na API. Se não existir, você poderia criar um novo usuário.
+        Busca o usuário pelo cache; na falta, vai à API uma única vez mesmo com vários cliques simultâneos.
+        """
+        if user.member_id is None:
+            return await self._fetch_user(user)
+
+        cached = self.cache.get(user.member_id)
+        if cached is not None:
+            return cached
+
+        if user.member_id in self._inflight:
+            self.coalesced += 1
+        return await self._inflight.run(user.member_id, lambda: self._fetch_user(user))
+
+    async def get_users(self, users: Iterable[UserPayload]) -> Dict[str, UserResponse]:
+        """
+        Resolve vários membros de uma vez: o que está no cache não sai daqui, o resto vai em lotes de BULK_LOOKUP_SIZE.
+        """
+        found: Dict[str, UserResponse] = {}
+        missing: Dict[str, UserPayload] = {}
+        for user in users:
+            cached = self.cache.get(user.member_id)
+            if cached is not None:
+                found[user.member_id] = cached
+            else:
+                missing.setdefault(user.member_id, user)
+
+        pending = list(missing.values())
+        for i in range(0, len(pending), BULK_LOOKUP_SIZE):
+            for resolved in await self._lookup_users(pending[i:i + BULK_LOOKUP_SIZE]):
+                self._remember(resolved)
+                found[resolved.member_id] = resolved
+        return found
+
+    async def warm_up(self, users: Iterable[UserPayload]) -> int:
+        """
+        Pré-carrega o cache com os membros de uma guild (chamado no on_ready). Retorna quantos ficaram no cache.
+        """
+        resolved = await self.get_users(u for u in users if u.member_id is not None)
+        logger.info(f"🔥 Cache de usuários aquecido com {len(resolved)} membros")
+        return len(resolved)
+
+    async def update_user(self, user: UserResponse) -> UserResponse:
+        """
+        Atualiza dados de um usuário existente.
         """
+        logger.info(f"✏️ Atualizando usuário {user.id} com {user.model_dump()}")
+        # Exemplo real:
+        # response = await self.client.patch(f"/users/{user_id}", json=payload)
+        # return decode(UserResponse, response)
+        self.cache.pop(user.member_id)
+        return uuid4()
+
+    def forget(self, member_id: str):
+        self.cache.pop(member_id)
+
+    def metrics(self) -> Dict[str, int]:
+        return {**self.cache.metrics(), "coalesced": self.coalesced,
+                "bulk_requests": self.bulk_requests, "inflight": len(self._inflight)}
+
+    def _remember(self, user: UserResponse):
+        if user.member_id is not None:
+            self.cache.set(user.member_id, user)
+
+    async def _fetch_user(self, user: UserPayload) -> UserResponse:
         logger.info(f"🔍 Buscando usuário {user.member_id}")
         # Exemplo de requisição real:
-        # response = await self.client.get(f"/users/{member_id}")
-        # return UserResponse(**response)
+        # return await self.client.get_model(f"/users/{user.member_id}", UserResponse)
 
         # Mock para testes:
         now = datetime.now(timezone.utc)
-        return UserResponse(
+        found = UserResponse(
             id=uuid4(),
             member_id=user.member_id,
             username=user.username,
@@ -49,13 +171,52 @@ class UserService:
             updated_at=now,
             deleted_at=None
         )
+        self._remember(found)
+        return found
 
-    async def update_user(self, user: UserResponse) -> UserResponse:
+    async def _bulk_create(self, users: List[UserPayload]) -> List[UserResponse]:
+        self.bulk_requests += 1
+        logger.info(f"✅ Registrando {len(users)} usuários em lote")
+        # Exemplo de requisição real:
+        # return await self.client.post_list(
+        #     "/users/bulk", {"users": [u.model_dump(mode="json") for u in users]}, UserResponse)
+
+        # Mock para testes:
+        now = datetime.now(timezone.utc)
+        return [
+            UserResponse(
+                id=uuid4(),
+                member_id=user.member_id,
+                username=user.username,
+                full_name=user.full_name,
+                created_at=now,
+                updated_at=now,
+                deleted_at=None
+            )
+            for user in users
+        ]
+
+    async def _lookup_users(self, users: List[UserPayload]) -> List[UserResponse]:
         """
-        Atualiza dados de um usuário existente.
+        Busca em lote por member_id. Membros sem cadastro na API simplesmente não voltam.
         """
-        logger.info(f"✏️ Atualizando usuário {user.id} com {user.model_dump()}")
-        # Exemplo real:
-        # response = await self.client.patch(f"/users/{user_id}", json=payload)
-        # return UserResponse(**response)
-        return uuid4()
+        self.bulk_requests += 1
+        logger.info(f"🔍 Buscando {len(users)} usuários em lote")
+        # Exemplo de requisição real:
+        # return await self.client.post_list(
+        #     "/users/lookup", {"member_ids": [u.member_id for u in users]}, UserResponse)
+
+        # Mock para testes:
+        now = datetime.now(timezone.utc)
+        return [
+            UserResponse(
+                id=uuid4(),
+                member_id=user.member_id,
+                username=user.username,
+                full_name=user.full_name,
+                created_at=now,
+                updated_at=now,
+                deleted_at=None
+            )
+            for user in users
+        ]
@@ -0,0 +1,241 @@
+# utils/availability.py
+import base64
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+
+class SlotGrid:
+    """
+    Grade fixa de slots de um dia (abertura → fechamento, passo de `interval` minutos).
+
+    A ocupação de um dia é representada por um inteiro usado como bitmask:
+    o bit `i` ligado significa que o slot `i` está indisponível.
+    """
+
+    def __init__(self, start_time: datetime, end_time: datetime, interval: int):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.interval = interval
+
+        # Quantidade de slots que começam antes do fechamento
+        total_minutes = (end_time - start_time).total_seconds() / 60
+        self.slot_count = max(0, -int(-total_minutes // interval))
+        self.full_mask = (1 << self.slot_count) - 1
+
+        # labels[i] = horário de início do slot i; labels[slot_count] = fim do último slot
+        self.labels: List[str] = [
+            (start_time + timedelta(minutes=interval * i)).strftime("%H:%M")
+            for i in range(self.slot_count + 1)
+        ]
+        self.index: Dict[str, int] = {}
+        for i, label in enumerate(self.labels[:self.slot_count]):
+            self.index.setdefault(label, i)
+
+    def slot_labels(self) -> List[str]:
+        return self.labels[:self.slot_count]
+
+    def mask_from_labels(self, labels: Iterable[str]) -> int:
+        """
+        Converte uma lista de horários "HH:MM" em bitmask. Horários fora da grade são ignorados.
+        """
+        mask = 0
+        index = self.index
+        for label in labels:
+            i = index.get(label)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def labels_from_mask(self, mask: int) -> List[str]:
+        labels = self.labels
+        result = []
+        mask &= self.full_mask
+        while mask:
+            low = mask & -mask
+            result.append(labels[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def mask_between(self, start_minute: int, end_minute: int) -> int:
+        """
+        Bitmask dos slots que se sobrepõem a [start_minute, end_minute), em minutos desde a abertura.
+        """
+        first = max(0, start_minute // self.interval)
+        last = min(self.slot_count, -(-end_minute // self.interval))
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def free_mask(self, occupied: int) -> int:
+        return ~occupied & self.full_mask
+
+    def free_slots(self, occupied: int) -> List[str]:
+        return self.labels_from_mask(self.free_mask(occupied))
+
+    def free_runs(self, occupied: int) -> List[Tuple[int, int]]:
+        """
+        Sequências de slots livres seguidos, como (primeiro slot, slot depois do último).
+        """
+        runs = []
+        free = self.free_mask(occupied)
+        while free:
+            start = (free & -free).bit_length() - 1
+            shifted = free >> start
+            length = (shifted ^ (shifted + 1)).bit_length() - 1
+            runs.append((start, start + length))
+            free &= ~(((1 << length) - 1) << start)
+        return runs
+
+    def is_free(self, occupied: int, slot: int) -> bool:
+        return not (occupied >> slot) & 1
+
+    def is_fully_booked(self, occupied: int) -> bool:
+        return occupied & self.full_mask == self.full_mask
+
+    def end_run(self, occupied: int, start_slot: int, blocks: int) -> int:
+        """
+        Quantos horários de término são possíveis a partir de `start_slot`.
+
+        A sequência para no primeiro slot ocupado (que vira o último término possível),
+        no fechamento ou depois de `blocks` blocos (blocks <= 0 = sem limite).
+        """
+        run = self.slot_count - start_slot
+        after = occupied >> (start_slot + 1)
+        if after:
+            run = min(run, (after & -after).bit_length())
+        if blocks >= 1:
+            run = min(run, blocks)
+        return max(run, 1)
+
+    def possible_end_times(self, occupied: int, start_slot: int, blocks: int) -> List[str]:
+        run = self.end_run(occupied, start_slot, blocks)
+        return self.labels[start_slot + 1:start_slot + 1 + run]
+
+    def run_starts(self, occupied: int, length: int) -> int:
+        """
+        Bitmask dos slots onde começa uma sequência de `length` slots livres (terminando até o fechamento).
+        """
+        free = self.free_mask(occupied)
+        starts = free
+        shift = 1
+        # Dobra o tamanho da janela a cada passo: log2(length) operações em vez de length
+        while starts and shift < length:
+            step = min(shift, length - shift)
+            starts &= starts >> step
+            shift += step
+        return starts
+
+    def first_run(self, occupied: int, length: int) -> Optional[int]:
+        starts = self.run_starts(occupied, length)
+        return (starts & -starts).bit_length() - 1 if starts else None
+
+
+@lru_cache(maxsize=128)
+def get_slot_grid(start_time: datetime, end_time: datetime, interval: int) -> SlotGrid:
+    return SlotGrid(start_time, end_time, interval)
+
+
+class EquipmentAvailability:
+    """
+    Ocupação de um equipamento nos próximos dias: uma bitmask por dia ("DD/MM/YYYY").
+    """
+
+    def __init__(self, grid: SlotGrid, days: Optional[Dict[str, int]] = None):
+        self.grid = grid
+        self.days: Dict[str, int] = days or {}
+
+    @classmethod
+    def from_unavailable_slots(cls, grid: SlotGrid, unavailable_by_date: Dict[str, List[str]]):
+        return cls(grid, {
+            date_str: grid.mask_from_labels(labels)
+            for date_str, labels in unavailable_by_date.items()
+        })
+
+    def occupied(self, date_str: str) -> int:
+        return self.days.get(date_str, 0)
+
+    def free_slots(self, date_str: str) -> List[str]:
+        return self.grid.free_slots(self.occupied(date_str))
+
+    def is_fully_booked(self, date_str: str) -> bool:
+        return self.grid.is_fully_booked(self.occupied(date_str))
+
+    def possible_end_times(self, date_str: str, start_time: str, blocks: int) -> List[str]:
+        return self.grid.possible_end_times(self.occupied(date_str), self.grid.index[start_time], blocks)
+
+
+class SlotSuggestion:
+    """
+    Horário livre sugerido: `blocks` slots seguidos a partir de `start` no dia `date`.
+    `version` é a versão da agenda do equipamento quando a busca foi feita.
+    """
+
+    __slots__ = ("equipment_id", "date", "start", "end", "version")
+
+    def __init__(self, equipment_id, date: str, start: str, end: str, version: int):
+        self.equipment_id = equipment_id
+        self.date = date
+        self.start = start
+        self.end = end
+        self.version = version
+
+    def __repr__(self) -> str:
+        return f"SlotSuggestion({self.equipment_id}, {self.date} {self.start}-{self.end})"
+
+
+class AvailabilityMatrix:
+    """
+    Ocupação de vários equipamentos em vários dias: equipamento x dia x bitmask de slots.
+
+    No fio (`to_wire` / `from_wire`) cada equipamento vira uma string base64 com as bitmasks dos dias
+    em sequência, `ceil(slots / 8)` bytes por dia, em vez de listas de "HH:MM" por dia.
+    """
+
+    def __init__(self, grid: SlotGrid, days: List[str], masks: Dict[UUID, List[int]]):
+        self.grid = grid
+        self.days = days
+        self.masks = masks
+        self._day_index = {label: i for i, label in enumerate(days)}
+
+    @property
+    def day_width(self) -> int:
+        return (self.grid.slot_count + 7) // 8
+
+    def occupied(self, equipment_id: UUID, date_str: str) -> int:
+        return self.masks[equipment_id][self._day_index[date_str]]
+
+    def availability(self, equipment_id: UUID) -> EquipmentAvailability:
+        return EquipmentAvailability(self.grid, dict(zip(self.days, self.masks[equipment_id])))
+
+    def to_wire(self, day_dates: Dict[str, date]) -> Dict[str, Any]:
+        """
+        `day_dates` converte os rótulos dos dias ("DD/MM/YYYY") nas datas enviadas em ISO.
+        """
+        width = self.day_width
+        return {
+            "days": [day_dates[label].isoformat() for label in self.days],
+            "opening": self.grid.labels[0],
+            "interval": self.grid.interval,
+            "slots": self.grid.slot_count,
+            "masks": {
+                str(equipment_id): base64.b64encode(
+                    b"".join(mask.to_bytes(width, "little") for mask in masks)).decode("ascii")
+                for equipment_id, masks in self.masks.items()
+            },
+        }
+
+    @classmethod
+    def from_wire(cls, data: Dict[str, Any], grid: SlotGrid) -> "AvailabilityMatrix":
+        if data["slots"] != grid.slot_count or data["interval"] != grid.interval or data["opening"] != grid.labels[0]:
+            raise ValueError("Grade de slots da resposta não bate com a configuração atual")
+        days = [date.fromisoformat(d).strftime("%d/%m/%Y") for d in data["days"]]
+        width = (grid.slot_count + 7) // 8
+        masks = {}
+        for equipment_id, encoded in data["masks"].items():
+            raw = base64.b64decode(encoded)
+            masks[UUID(equipment_id)] = [
+                int.from_bytes(raw[i:i + width], "little") for i in range(0, len(raw), width)
+            ] if width else [0] * len(days)
+        return cls(grid, days, masks)
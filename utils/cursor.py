@@ -0,0 +1,21 @@
+# utils/cursor.py
+import base64
+from typing import Optional
+from uuid import UUID
+
+# Tamanho de um UUID em base64 (url-safe, sem "=")
+CURSOR_LENGTH = 22
+CURSOR_PATTERN = r"[A-Za-z0-9_-]{22}"
+
+
+def encode_cursor(item_id) -> str:
+    """
+    Cursor compacto (22 caracteres) a partir do UUID de um item, para caber no custom_id dos componentes.
+    """
+    return base64.urlsafe_b64encode(UUID(str(item_id)).bytes).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    if not cursor:
+        return None
+    return str(UUID(bytes=base64.urlsafe_b64decode(cursor + "==")))
@@ -1,5 +1,7 @@
 # utils/datetime_utils.py
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+
+from utils.availability import get_slot_grid
 
 def generate_next_days(start: datetime, max_days: int, allowed_weekdays: set, holidays: set):
     days = []
@@ -12,34 +14,44 @@ def generate_next_days(start: datetime, max_days: int, allowed_weekdays: set, ho
     return days
 
 def generate_time_slots(start_time: datetime, end_time: datetime, interval: int):
-    slots = []
-    current = start_time
-    while current < end_time:
-        slots.append(current.strftime("%H:%M"))
-        current += timedelta(minutes=interval)
-    return slots
+    return get_slot_grid(start_time, end_time, interval).slot_labels()
 
 def get_available_time_slots(start_time: datetime, end_time: datetime, interval: int, unavailable_time_slots: list) -> list:
-    available = []
-    current = start_time
-    while current < end_time:
-        time_str = current.strftime("%H:%M")
-        if time_str not in unavailable_time_slots:
-            available.append(time_str)
-        current += timedelta(minutes=interval)
-    return available
+    grid = get_slot_grid(start_time, end_time, interval)
+    return grid.free_slots(grid.mask_from_labels(unavailable_time_slots))
 
 def generate_possible_end_times(current: datetime, blocks: int, unavailable_time_slots: list, interval: int, end_time: datetime) -> list:
-    possible_ends = []
-    while True:
-        current += timedelta(minutes=interval)
-        time_str = current.strftime("%H:%M")
-        if time_str in unavailable_time_slots or current >= end_time:
-            possible_ends.append(time_str)
-            break
-        possible_ends.append(time_str)
-        if blocks >= 1:
-            blocks -= 1
-            if blocks == 0:
-                break
-    return possible_ends
\ No newline at end of file
+    # Grade ancorada no horário de início: o slot 0 é o próprio `current`
+    grid = get_slot_grid(current, end_time, interval)
+    return grid.possible_end_times(grid.mask_from_labels(unavailable_time_slots), 0, blocks)
+
+EPOCH = datetime(1970, 1, 1)
+
+def to_epoch_minutes(value: datetime) -> int:
+    # Datas sem timezone são tratadas como horário de parede (é como o fluxo de reserva as cria)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(minutes=1)
+
+def from_epoch_minutes(value: int) -> datetime:
+    return EPOCH + timedelta(minutes=value)
+
+def to_epoch_micros(value: datetime) -> int:
+    # Para carimbos (created_at / updated_at): sem timezone, vale UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+def from_epoch_micros(value: int) -> datetime:
+    return (EPOCH + timedelta(microseconds=value)).replace(tzinfo=timezone.utc)
+
+def epoch_week(day: date) -> int:
+    # Semanas de segunda a domingo contadas desde a época (01/01/1970 foi quinta-feira)
+    return ((day - EPOCH.date()).days + 3) // 7
+
+def epoch_weeks_between(start: int, end: int) -> range:
+    """
+    Semanas (como em epoch_week) tocadas por [start, end), em minutos desde a época.
+    """
+    last = max(start, end - 1)
+    return range((start // 1440 + 3) // 7, (last // 1440 + 3) // 7 + 1)
@@ -0,0 +1,58 @@
+# utils/decoding.py
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Type, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele usa o json da biblioteca padrão
+    orjson = None
+
+M = TypeVar("M", bound=BaseModel)
+
+
+# ---------------- JSON ----------------
+def json_loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+
+# ---------------- Validação completa ----------------
+# Não há caminho "confiável" com model_construct: no pydantic 2.11 ele sai mais lento que a validação
+# (~8 µs contra ~3 µs por reserva com valores já tipados, benchmarks/bench_decoding), porque roda em
+# Python e não aplica conversões nem modelos aninhados. O ganho real está em validar listas inteiras com
+# um TypeAdapter montado uma vez, que é o que a storage SQLite e o APIClient (get_list/post_list) usam.
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[M]) -> TypeAdapter:
+    """
+    TypeAdapter de List[model], montado uma vez por modelo.
+    """
+    return TypeAdapter(List[model])
+
+
+def decode(model: Type[M], data: Dict[str, Any]) -> M:
+    return model.model_validate(data)
+
+
+def decode_list(model: Type[M], items: Iterable[Dict[str, Any]]) -> List[M]:
+    """
+    Valida a lista inteira em uma passada só (dentro do pydantic-core), em vez de um modelo por vez.
+    """
+    return list_adapter(model).validate_python(items if isinstance(items, list) else list(items))
+
+
+def decode_json_list(model: Type[M], raw: Union[str, bytes]) -> List[M]:
+    """
+    Lê e valida o JSON cru direto no pydantic-core, sem passar por dicts Python. É o caminho mais rápido
+    quando se tem o corpo da resposta em bytes.
+    """
+    return list_adapter(model).validate_json(raw)
@@ -0,0 +1,126 @@
+# utils/guild_index.py
+from typing import Dict, Iterable, Optional
+
+from discord import Guild, Member, Role, abc
+
+
+class _NamedIndex:
+    """
+    Objetos (canais ou cargos) de uma guild por ID e por nome. Em nomes repetidos vale o primeiro indexado.
+    """
+
+    def __init__(self):
+        self.by_id: Dict[int, object] = {}
+        self.by_name: Dict[str, object] = {}
+
+    def add(self, item):
+        self.by_id[item.id] = item
+        self.by_name.setdefault(item.name, item)
+
+    def remove(self, item_id: int):
+        item = self.by_id.pop(item_id, None)
+        if item is not None and self.by_name.get(item.name) is item:
+            del self.by_name[item.name]
+            # Outro objeto com o mesmo nome assume a entrada (evento raro, varre só esta guild)
+            for other in self.by_id.values():
+                if other.name == item.name:
+                    self.by_name[item.name] = other
+                    break
+
+    def rename(self, old_name: str, item):
+        self.by_id[item.id] = item
+        current = self.by_name.get(old_name)
+        if current is not None and current.id == item.id:
+            del self.by_name[old_name]
+            for other in self.by_id.values():
+                if other.id != item.id and other.name == old_name:
+                    self.by_name[old_name] = other
+                    break
+        self.by_name.setdefault(item.name, item)
+
+
+class GuildMetadata:
+    def __init__(self, guild: Guild):
+        self.channels = _NamedIndex()
+        self.roles = _NamedIndex()
+        for channel in guild.channels:
+            self.channels.add(channel)
+        for role in guild.roles:
+            self.roles.add(role)
+
+
+class GuildIndex:
+    """
+    Índice de canais e cargos por guild, mantido pelos eventos do gateway (ver EventsManager).
+    Troca as varreduras lineares (`utils.get`) por buscas O(1).
+    """
+
+    def __init__(self):
+        self._guilds: Dict[int, GuildMetadata] = {}
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    # ---------------- Guilds ----------------
+    def index_guild(self, guild: Guild):
+        self._guilds[guild.id] = GuildMetadata(guild)
+
+    def index_guilds(self, guilds: Iterable[Guild]):
+        for guild in guilds:
+            self.index_guild(guild)
+
+    def remove_guild(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def _metadata(self, guild: Guild) -> GuildMetadata:
+        metadata = self._guilds.get(guild.id)
+        if metadata is None:
+            metadata = self._guilds[guild.id] = GuildMetadata(guild)
+        return metadata
+
+    # ---------------- Canais ----------------
+    def add_channel(self, channel: abc.GuildChannel):
+        self._metadata(channel.guild).channels.add(channel)
+
+    def remove_channel(self, channel: abc.GuildChannel):
+        metadata = self._guilds.get(channel.guild.id)
+        if metadata:
+            metadata.channels.remove(channel.id)
+
+    def update_channel(self, before: abc.GuildChannel, after: abc.GuildChannel):
+        self._metadata(after.guild).channels.rename(before.name, after)
+
+    def channel(self, guild_id: int, name: Optional[str] = None, channel_id: Optional[int] = None):
+        metadata = self._guilds.get(guild_id)
+        if metadata is None:
+            return None
+        if channel_id is not None:
+            return metadata.channels.by_id.get(channel_id)
+        return metadata.channels.by_name.get(name)
+
+    # ---------------- Cargos ----------------
+    def add_role(self, role: Role):
+        self._metadata(role.guild).roles.add(role)
+
+    def remove_role(self, role: Role):
+        metadata = self._guilds.get(role.guild.id)
+        if metadata:
+            metadata.roles.remove(role.id)
+
+    def update_role(self, before: Role, after: Role):
+        self._metadata(after.guild).roles.rename(before.name, after)
+
+    def role(self, guild_id: int, name: Optional[str] = None, role_id: Optional[int] = None) -> Optional[Role]:
+        metadata = self._guilds.get(guild_id)
+        if metadata is None:
+            return None
+        if role_id is not None:
+            return metadata.roles.by_id.get(role_id)
+        return metadata.roles.by_name.get(name)
+
+    @staticmethod
+    def has_any_role(member: Member, role_ids: Iterable[int] = (), role_names: Iterable[str] = ()) -> bool:
+        """
+        Verifica os cargos do membro contra conjuntos pré-calculados (O(cargos do membro)).
+        """
+        return any(role.id in role_ids or role.name in role_names for role in member.roles)
@@ -0,0 +1,97 @@
+# utils/heatmap.py
+import asyncio
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from utils.png import grid_png
+from utils.single_flight import SingleFlight
+
+FREE_COLOR = (87, 187, 138)
+BUSY_COLOR = (214, 69, 65)
+CLOSED_COLOR = (225, 225, 225)
+
+
+def render_week_heatmap(slot_count: int, days: Sequence[Optional[int]]) -> bytes:
+    """
+    PNG da semana: uma linha por dia (Segunda em cima), uma coluna por slot.
+
+    `days[i]` é a bitmask de ocupação do dia (bit ligado = ocupado) ou None para dia fechado / fora do calendário.
+    """
+    cells: List[List[Tuple[int, int, int]]] = []
+    for occupied in days:
+        if occupied is None:
+            cells.append([CLOSED_COLOR] * slot_count)
+        else:
+            cells.append([BUSY_COLOR if (occupied >> slot) & 1 else FREE_COLOR for slot in range(slot_count)])
+    return grid_png(cells, cell_width=20, cell_height=20)
+
+
+class HeatmapCache:
+    """
+    Imagens de ocupação já renderizadas, por (equipamento, semana).
+
+    Cada entrada guarda o `stamp` com que foi gerada (versão da agenda daquela semana + o que mais muda
+    a imagem); com outro stamp a imagem é refeita e substitui a antiga. A renderização roda no executor
+    padrão, fora do event loop, e pedidos simultâneos da mesma imagem esperam uma renderização só.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, bytes]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.renders = 0
+        self.render_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cached(self, key: Hashable, stamp: Hashable) -> Optional[bytes]:
+        """
+        A imagem já pronta para este stamp, sem renderizar nada.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != stamp:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def get(self, key: Hashable, stamp: Hashable, render: Callable[..., bytes], *args) -> bytes:
+        image = self.cached(key, stamp)
+        if image is not None:
+            return image
+
+        if (key, stamp) in self._inflight:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        return await self._inflight.run((key, stamp), lambda: self._render(key, stamp, render, args))
+
+    async def _render(self, key: Hashable, stamp: Hashable, render: Callable[..., bytes], args) -> bytes:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        image = await loop.run_in_executor(None, render, *args)
+        self.renders += 1
+        self.render_seconds += loop.time() - started
+
+        # Se uma imagem mais nova chegou antes, esta a substitui; a próxima busca confere o stamp e refaz
+        self._entries[key] = (stamp, image)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return image
+
+    def metrics(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "renders": self.renders,
+            "avg_render_ms": self.render_seconds / self.renders * 1000 if self.renders else 0.0,
+        }
@@ -0,0 +1,215 @@
+# utils/interval_index.py
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from heapq import merge
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from uuid import UUID
+
+from models.reservation import ReservationRecord, ReservationResponse
+from utils.datetime_utils import epoch_weeks_between
+
+Key = Tuple[int, int]
+
+
+def id_int(value: Union[int, str, UUID]) -> int:
+    """
+    ID como inteiro de 128 bits (como o índice guarda), a partir de int, str ou UUID.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, UUID):
+        return value.int
+    return UUID(value).int
+
+
+class SortedIntervals:
+    """
+    Intervalos [start, end) ordenados por início (minutos desde a época), guardados como ReservationRecord.
+
+    A busca por sobreposição usa bisect: só visita os intervalos que começam em
+    [a - max_duration, b), então custa O(log n + k).
+    """
+
+    def __init__(self):
+        self.keys: List[Key] = []
+        self.starts: List[int] = []
+        self.items: Dict[Key, ReservationRecord] = {}
+        self.max_duration = 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, record: ReservationRecord):
+        k = (record.start, record.id)
+        i = bisect_left(self.keys, k)
+        self.keys.insert(i, k)
+        self.starts.insert(i, record.start)
+        self.items[k] = record
+        self.max_duration = max(self.max_duration, record.end - record.start)
+
+    def remove(self, start: int, key: int):
+        k = (start, key)
+        i = bisect_left(self.keys, k)
+        if i < len(self.keys) and self.keys[i] == k:
+            del self.keys[i]
+            del self.starts[i]
+            del self.items[k]
+
+    def overlapping(self, start: Optional[int] = None, end: Optional[int] = None) -> List[ReservationRecord]:
+        keys = self.keys
+        lo = 0 if start is None else bisect_left(self.starts, start - self.max_duration)
+        hi = len(keys) if end is None else bisect_left(self.starts, end)
+        items = self.items
+        if start is None:
+            return [items[k] for k in keys[lo:hi]]
+        return [r for r in (items[k] for k in keys[lo:hi]) if r.end > start]
+
+    def iter_overlapping(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        after: Optional[Key] = None,
+        reverse: bool = False,
+    ) -> Iterator[Tuple[Key, ReservationRecord]]:
+        """
+        Como `overlapping`, mas preguiçoso e a partir de um cursor (chave (start, id), exclusivo).
+        Com `reverse`, anda para trás a partir do cursor. Gera pares (chave, reserva).
+        """
+        keys = self.keys
+        lo = 0 if start is None else bisect_left(self.starts, start - self.max_duration)
+        hi = len(keys) if end is None else bisect_left(self.starts, end)
+        if after is not None:
+            if reverse:
+                hi = min(hi, bisect_left(keys, after))
+            else:
+                lo = max(lo, bisect_right(keys, after))
+        items = self.items
+        for i in (range(hi - 1, lo - 1, -1) if reverse else range(lo, hi)):
+            k = keys[i]
+            record = items[k]
+            if start is None or record.end > start:
+                yield k, record
+
+
+class ReservationIndex:
+    """
+    Índice em memória das reservas: geral, por equipamento e por status.
+    Guarda ReservationRecord (compacto); quem chama converte para ReservationResponse na borda.
+    """
+
+    def __init__(self):
+        self.all = SortedIntervals()
+        self.by_equipment: Dict[int, SortedIntervals] = defaultdict(SortedIntervals)
+        self.by_status: Dict[str, SortedIntervals] = defaultdict(SortedIntervals)
+        # Registro atual de cada reserva, por ID
+        self._entries: Dict[int, ReservationRecord] = {}
+        # Sequência por equipamento: muda a cada escrita, e quem guardou uma foto da agenda detecta que ela envelheceu
+        self.versions: Dict[int, int] = defaultdict(int)
+        # O mesmo por (equipamento, semana): só muda quando uma reserva que toca aquela semana muda
+        self.week_versions: Dict[Tuple[int, int], int] = defaultdict(int)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, reservations: Iterable[Union[ReservationResponse, ReservationRecord]]):
+        for reservation in reservations:
+            self.upsert(reservation)
+
+    def upsert(self, reservation: Union[ReservationResponse, ReservationRecord]) -> ReservationRecord:
+        record = reservation if isinstance(reservation, ReservationRecord) else ReservationRecord.from_response(reservation)
+        self.remove(record.id)
+        self.all.add(record)
+        self.by_equipment[record.equipment_id].add(record)
+        self.by_status[record.status].add(record)
+        self._entries[record.id] = record
+        self._bump(record)
+        return record
+
+    def remove(self, key: Union[int, str, UUID]):
+        record = self._entries.pop(id_int(key), None)
+        if record is None:
+            return
+        self.all.remove(record.start, record.id)
+        self.by_equipment[record.equipment_id].remove(record.start, record.id)
+        self.by_status[record.status].remove(record.start, record.id)
+        self._bump(record)
+
+    def _bump(self, record: ReservationRecord):
+        self.versions[record.equipment_id] += 1
+        for week in epoch_weeks_between(record.start, record.end):
+            self.week_versions[(record.equipment_id, week)] += 1
+
+    def version(self, equipment_id: Union[int, str, UUID]) -> int:
+        return self.versions.get(id_int(equipment_id), 0)
+
+    def week_version(self, equipment_id: Union[int, str, UUID], week: int) -> int:
+        return self.week_versions.get((id_int(equipment_id), week), 0)
+
+    def get(self, key: Union[int, str, UUID]) -> Optional[ReservationRecord]:
+        return self._entries.get(id_int(key))
+
+    def overlapping(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        equipment_ids: Optional[Iterable[Union[int, str, UUID]]] = None,
+        status: Optional[str] = None,
+    ) -> List[ReservationRecord]:
+        """
+        Reservas que se sobrepõem a [start, end) (limites opcionais, em minutos desde a época),
+        ordenadas por início.
+        """
+        if equipment_ids is not None:
+            results = []
+            for equipment_id in equipment_ids:
+                bucket = self.by_equipment.get(id_int(equipment_id))
+                if bucket:
+                    found = bucket.overlapping(start, end)
+                    if status is not None:
+                        found = [r for r in found if r.status == status]
+                    results.append(found)
+            return list(merge(*results, key=lambda r: r.start))
+
+        if status is not None:
+            bucket = self.by_status.get(status)
+            return bucket.overlapping(start, end) if bucket else []
+
+        return self.all.overlapping(start, end)
+
+    def cursor(self, key: Union[int, str, UUID]) -> Optional[Key]:
+        """
+        Chave de ordenação (start, id) da reserva, usada como cursor de paginação.
+        """
+        record = self._entries.get(id_int(key))
+        return (record.start, record.id) if record else None
+
+    def iter_overlapping(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        equipment_ids: Optional[Iterable[Union[int, str, UUID]]] = None,
+        status: Optional[str] = None,
+        after: Optional[Union[int, str, UUID]] = None,
+        reverse: bool = False,
+    ) -> Iterator[ReservationRecord]:
+        """
+        Versão preguiçosa de `overlapping` que começa depois da reserva `after` (por ID).
+        Se o cursor não existe mais no índice, começa do início.
+        """
+        cursor = self.cursor(after) if after else None
+        if equipment_ids is not None:
+            buckets = [self.by_equipment[k] for k in map(id_int, equipment_ids) if k in self.by_equipment]
+            sources = [b.iter_overlapping(start, end, cursor, reverse) for b in buckets]
+            for _, record in merge(*sources, reverse=reverse):
+                if status is None or record.status == status:
+                    yield record
+            return
+
+        if status is not None:
+            bucket = self.by_status.get(status)
+            if bucket is None:
+                return
+        else:
+            bucket = self.all
+        for _, record in bucket.iter_overlapping(start, end, cursor, reverse):
+            yield record
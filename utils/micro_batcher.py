@@ -0,0 +1,75 @@
+# utils/micro_batcher.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Junta pedidos individuais feitos quase ao mesmo tempo em uma única chamada em lote.
+
+    `fetch_many(group, keys)` recebe as chaves pendentes de um grupo (ex.: os mesmos dias / a mesma
+    configuração) e devolve {chave: valor}. Com `window=0` o lote fecha no próximo giro do event loop:
+    junta só o que chegou junto, sem acrescentar espera. Chaves repetidas no mesmo lote viram um pedido só.
+    """
+
+    def __init__(self, fetch_many: Callable[[Hashable, List[K]], Awaitable[Dict[K, V]]],
+                 window: float = 0.0, max_batch: int = 200):
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[Hashable, Dict[K, asyncio.Future]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "batches": 0, "coalesced": 0, "largest_batch": 0}
+
+    async def get(self, group: Hashable, key: K) -> V:
+        self.stats["requests"] += 1
+        pending = self._pending.get(group)
+        if pending is None:
+            pending = self._pending[group] = {}
+            self._spawn(self._flush_later(group, pending))
+
+        future = pending.get(key)
+        if future is None:
+            future = pending[key] = asyncio.get_running_loop().create_future()
+            if len(pending) >= self.max_batch:
+                self._spawn(self._flush(group, pending))
+        else:
+            self.stats["coalesced"] += 1
+        # shield: quem desiste (timeout/cancelamento) não derruba o lote dos outros
+        return await asyncio.shield(future)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self, group: Hashable, pending: Dict[K, asyncio.Future]):
+        await asyncio.sleep(self.window)
+        await self._flush(group, pending)
+
+    async def _flush(self, group: Hashable, pending: Dict[K, asyncio.Future]):
+        # O lote pode já ter saído pelo max_batch; só quem ainda é o lote aberto do grupo o fecha
+        if self._pending.get(group) is not pending:
+            return
+        del self._pending[group]
+
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(pending))
+        try:
+            results = await self.fetch_many(group, list(pending))
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in pending.items():
+            if future.done():
+                continue
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(KeyError(key))
@@ -0,0 +1,43 @@
+# utils/png.py
+import struct
+import zlib
+from typing import List, Sequence, Tuple
+
+Color = Tuple[int, int, int]
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(width: int, height: int, rows: Sequence[bytes]) -> bytes:
+    """
+    PNG RGB 8 bits a partir das linhas de pixels já prontas (3 bytes por pixel), só com a biblioteca padrão.
+    """
+    raw = b"".join(b"\x00" + row for row in rows)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", header) + _chunk(b"IDAT", zlib.compress(raw, 6)) + _chunk(b"IEND", b"")
+
+
+def blend(low: Color, high: Color, t: float) -> Color:
+    t = min(max(t, 0.0), 1.0)
+    return tuple(round(a + (b - a) * t) for a, b in zip(low, high))
+
+
+def grid_png(cells: List[List[Color]], cell_width: int = 24, cell_height: int = 24, gap: int = 2,
+             background: Color = (255, 255, 255)) -> bytes:
+    """
+    Imagem de uma grade de células coloridas (linhas x colunas), com `gap` pixels de espaço entre elas.
+    """
+    columns = max((len(row) for row in cells), default=0)
+    width = max(1, columns * (cell_width + gap) + gap)
+    height = max(1, len(cells) * (cell_height + gap) + gap)
+    spacer = bytes(background) * gap
+    blank = bytes(background) * width
+
+    rows = [blank] * gap
+    for row in cells:
+        line = spacer + b"".join(bytes(color) * cell_width + spacer for color in row)
+        line += bytes(background) * (width - len(line) // 3)
+        rows += [line] * cell_height + [blank] * gap
+    return encode_png(width, height, rows)
@@ -0,0 +1,100 @@
+# utils/schedule.py
+from datetime import date, datetime, time, timedelta
+from typing import Dict, FrozenSet, List, Optional
+
+from models.reservation import BotConfig
+from utils.availability import SlotGrid, get_slot_grid
+
+# Mesma âncora usada por datetime.strptime("HH:MM"), assim a grade é compartilhada com datetime_utils
+GRID_ANCHOR = date(1900, 1, 1)
+
+DEFAULT_APPROVER_ROLE = "Teacher"
+
+# Nomes curtos por date.weekday() (0=Segunda)
+WEEKDAY_NAMES = ("Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom")
+
+# Quantos dias à frente são pré-calculados no calendário de dias reserváveis
+CALENDAR_HORIZON = 366
+
+
+class CompiledSchedule:
+    """
+    Tudo o que o fluxo de reserva deriva do BotConfig, calculado uma vez por versão da configuração.
+
+    - grade de slots do dia + tabelas índice ↔ "HH:MM"
+    - calendário de dias reserváveis (dias da semana e feriados já aplicados)
+    - busca O(1) de slot e de dia
+    """
+
+    def __init__(self, config: BotConfig, version: str):
+        self.config = config
+        self.version = version
+
+        self.grid: SlotGrid = get_slot_grid(
+            datetime.combine(GRID_ANCHOR, config.opening_time),
+            datetime.combine(GRID_ANCHOR, config.closing_time),
+            config.min_reservation)
+        self.slot_labels: List[str] = self.grid.slot_labels()
+        # Inclui o horário de fechamento, que é um término válido
+        self.slot_times: Dict[str, time] = {
+            label: (self.grid.start_time + timedelta(minutes=config.min_reservation * i)).time()
+            for i, label in enumerate(self.grid.labels)
+        }
+
+        # days_of_week usa 1=Segunda ... 7=Domingo (isoweekday)
+        self.weekdays: FrozenSet[int] = frozenset(config.days_of_week)
+        self.holidays: FrozenSet[date] = frozenset(h.date() for h in config.holidays or [])
+
+        # Cargos que aprovam reservas (admins também aprovam). Aceita IDs ou nomes;
+        # sem nada configurado vale o cargo "Teacher", como antes
+        roles = [str(r) for r in [*config.approver_roles, *config.admin_roles]]
+        self.approver_role_ids: FrozenSet[int] = frozenset(int(r) for r in roles if r.isdigit())
+        self.approver_role_names: FrozenSet[str] = frozenset(r for r in roles if not r.isdigit()) \
+            if roles else frozenset({DEFAULT_APPROVER_ROLE})
+
+        self._calendar_start: Optional[date] = None
+        self._calendar: List[str] = []
+        self._day_dates: Dict[str, date] = {}
+
+    # ---------------- Slots ----------------
+    def slot_index(self, label: str) -> int:
+        return self.grid.index[label]
+
+    def slot_label(self, index: int) -> str:
+        return self.grid.labels[index]
+
+    def slot_time(self, label: str) -> time:
+        return self.slot_times[label]
+
+    # ---------------- Dias ----------------
+    def is_bookable(self, day: date) -> bool:
+        return day.isoweekday() in self.weekdays and day not in self.holidays
+
+    def _compile_calendar(self, today: date):
+        calendar = []
+        day_dates = {}
+        for delta in range(1, CALENDAR_HORIZON + 1):
+            day = today + timedelta(days=delta)
+            if self.is_bookable(day):
+                label = day.strftime("%d/%m/%Y")
+                calendar.append(label)
+                day_dates[label] = day
+        self._calendar_start = today
+        self._calendar = calendar
+        self._day_dates = day_dates
+
+    def bookable_days(self, today: Optional[date] = None, max_days: Optional[int] = None) -> List[str]:
+        """
+        Próximos `max_days` dias reserváveis depois de `today` (padrão: max_reservation_days).
+        O calendário só é recalculado quando o dia muda.
+        """
+        today = today or date.today()
+        if self._calendar_start != today:
+            self._compile_calendar(today)
+        return self._calendar[:max_days or self.config.max_reservation_days]
+
+    def day_date(self, label: str) -> date:
+        day = self._day_dates.get(label)
+        if day is None:
+            day = datetime.strptime(label, "%d/%m/%Y").date()
+        return day
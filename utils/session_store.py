@@ -0,0 +1,92 @@
+# utils/session_store.py
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SessionStore(Generic[T]):
+    """
+    Armazena estados de sessão por usuário com tamanho máximo, expiração por inatividade e política LRU.
+
+    As entradas ficam ordenadas do acesso mais antigo para o mais recente, então a
+    expiração e a remoção por LRU olham só para o começo da fila.
+    """
+
+    def __init__(self, factory: Callable[[], T], max_size: int = 1000, idle_ttl: float = 900.0):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, T]]" = OrderedDict()
+        self.created = 0
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+        self.expired_lookups = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def _expire(self, now: float):
+        entries = self._entries
+        deadline = now - self.idle_ttl
+        while entries:
+            key, (last_access, _) = next(iter(entries.items()))
+            if last_access > deadline:
+                break
+            del entries[key]
+            self.evicted_idle += 1
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """
+        Retorna o estado e renova o acesso. None se não existe ou expirou.
+        """
+        now = time.monotonic()
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        last_access, state = item
+        if now - last_access >= self.idle_ttl:
+            del self._entries[key]
+            self.evicted_idle += 1
+            self.expired_lookups += 1
+            return None
+        self._entries[key] = (now, state)
+        self._entries.move_to_end(key)
+        return state
+
+    def get_or_create(self, key: Hashable) -> T:
+        state = self.get(key)
+        if state is not None:
+            return state
+
+        now = time.monotonic()
+        self._expire(now)
+        while len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+            self.evicted_lru += 1
+
+        state = self.factory()
+        self._entries[key] = (now, state)
+        self.created += 1
+        return state
+
+    def pop(self, key: Hashable) -> Optional[T]:
+        item = self._entries.pop(key, None)
+        return item[1] if item else None
+
+    def sweep(self):
+        self._expire(time.monotonic())
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "created": self.created,
+            "evicted_lru": self.evicted_lru,
+            "evicted_idle": self.evicted_idle,
+            "expired_lookups": self.expired_lookups,
+        }
@@ -0,0 +1,19 @@
+# utils/sharded_lock.py
+import asyncio
+from typing import Hashable, List
+
+
+class ShardedLocks:
+    """
+    Mapa de locks por chave com número fixo de shards: chaves diferentes podem dividir o mesmo lock,
+    mas a memória não cresce com o número de chaves (ex.: um lock "por equipamento").
+    """
+
+    def __init__(self, shards: int = 64):
+        self._locks: List[asyncio.Lock] = [asyncio.Lock() for _ in range(shards)]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def lock_for(self, key: Hashable) -> asyncio.Lock:
+        return self._locks[hash(key) % len(self._locks)]
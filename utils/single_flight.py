@@ -0,0 +1,35 @@
+# utils/single_flight.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Uma execução por chave: quem pede uma chave que já está rodando espera o mesmo resultado
+    (ou a mesma exceção), em vez de repetir o trabalho.
+
+    A execução roda em uma task própria, protegida com `asyncio.shield`: quem desiste (timeout,
+    interação cancelada) não cancela o trabalho que os outros estão esperando.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def run(self, key: Hashable, start: Callable[[], Awaitable[T]]) -> T:
+        """
+        `start()` só é chamado se não houver execução em andamento para `key`.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(start())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
@@ -0,0 +1,194 @@
+# utils/usage_stats.py
+from typing import List, Sequence
+from uuid import UUID
+
+try:
+    import numpy as np
+except ImportError:  # está no requirements; sem ele o bot sobe e o !uso avisa que a análise não está disponível
+    np = None
+
+from models.reservation import ReservationRecord
+
+MINUTES_PER_DAY = 24 * 60
+MICROS_PER_MINUTE = 60_000_000
+
+# Código numérico de cada status nas colunas (a ordem é a das colunas de UsageReport.counts)
+STATUSES = ("pending", "approved", "rejected")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+PENDING, APPROVED, REJECTED = range(3)
+
+
+class ReservationArrays:
+    """
+    Reservas em colunas NumPy para as contas de uso, sem passar por ReservationResponse:
+
+    - equipment: índice do equipamento em `equipment_ids`
+    - start / end: minutos desde a época (horário de parede, como no índice)
+    - created / updated: minutos desde a época (UTC)
+    - status: código de STATUS_CODES
+
+    Só tem inteiros e arrays, então vai barato para outro processo.
+    """
+
+    __slots__ = ("equipment_ids", "equipment", "start", "end", "created", "updated", "status")
+
+    def __init__(self, equipment_ids: List[UUID], equipment, start, end, created, updated, status):
+        self.equipment_ids = equipment_ids
+        self.equipment = equipment
+        self.start = start
+        self.end = end
+        self.created = created
+        self.updated = updated
+        self.status = status
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @classmethod
+    def from_buckets(cls, equipment_ids: List[UUID],
+                     buckets: Sequence[Sequence[ReservationRecord]]) -> "ReservationArrays":
+        """
+        `buckets[i]` são as reservas do equipamento `equipment_ids[i]` (como em ReservationIndex.by_equipment).
+        """
+        records = [r for bucket in buckets for r in bucket]
+        return cls(
+            list(equipment_ids),
+            np.repeat(np.arange(len(buckets), dtype=np.int32), [len(bucket) for bucket in buckets]),
+            np.array([r.start for r in records], dtype=np.int64),
+            np.array([r.end for r in records], dtype=np.int64),
+            np.array([r.created_at for r in records], dtype=np.int64) // MICROS_PER_MINUTE,
+            np.array([r.updated_at for r in records], dtype=np.int64) // MICROS_PER_MINUTE,
+            np.array([STATUS_CODES[r.status] for r in records], dtype=np.int8))
+
+
+class UsageReport:
+    """
+    Resultado de `compute_usage` para uma janela de dias. Arrays por equipamento seguem `equipment_ids`.
+
+    - counts[e, status]: reservas que começam na janela, por status
+    - booked_minutes[e]: minutos aprovados dentro do horário de funcionamento dos dias abertos
+    - utilization[e]: booked_minutes / capacidade (0..1)
+    - approval_rate[e]: aprovadas / decididas (nan sem decisões)
+    - lead_time_hours[e]: antecedência média entre o pedido e o início
+    - approval_latency_hours[e]: tempo médio entre o pedido e a decisão
+    - heatmap[weekday, slot]: fração ocupada de cada slot por dia da semana (0=Segunda)
+    """
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def peak_slots(self, top: int = 3) -> List[tuple]:
+        """
+        (dia da semana, slot, fração) dos slots mais ocupados.
+        """
+        flat = self.heatmap.ravel()
+        order = np.argsort(flat, kind="stable")[::-1][:top]
+        slots = self.heatmap.shape[1]
+        return [(int(i // slots), int(i % slots), float(flat[i])) for i in order if flat[i] > 0]
+
+
+def _covered_minutes(starts, ends, points):
+    """
+    Para cada ponto t: soma de |[start, end) ∩ (-inf, t)| sobre todos os intervalos.
+
+    Com as pontas ordenadas e somas acumuladas fica O((n + m) log n), sem laço por reserva.
+    """
+    starts, ends = np.sort(starts), np.sort(ends)
+    start_sums = np.concatenate(([0], np.cumsum(starts)))
+    end_sums = np.concatenate(([0], np.cumsum(ends)))
+    opened = np.searchsorted(starts, points, side="left")
+    closed = np.searchsorted(ends, points, side="left")
+    return (opened * points - start_sums[opened]) - (closed * points - end_sums[closed])
+
+
+def _weighted_mean(groups, values, size: int):
+    counts = np.bincount(groups, minlength=size)
+    sums = np.bincount(groups, weights=values, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan), counts
+
+
+def compute_usage(arrays: ReservationArrays, first_day: int, day_count: int, open_days: Sequence[bool],
+                  opening: int, closing: int, interval: int) -> UsageReport:
+    """
+    Uso dos equipamentos em `day_count` dias a partir do dia `first_day` (dias desde a época).
+
+    `open_days[d]` diz se o dia d da janela é reservável; `opening` / `closing` são minutos desde a
+    meia-noite e `interval` o tamanho do slot. Função pura, sem I/O: pode rodar em outro processo.
+    """
+    equipment_count = len(arrays.equipment_ids)
+    open_days = np.asarray(open_days, dtype=bool)
+    window_start = first_day * MINUTES_PER_DAY
+    window_end = window_start + day_count * MINUTES_PER_DAY
+
+    # ---------------- Ocupação por slot ----------------
+    # Cada equipamento ganha um trecho próprio da linha do tempo (deslocado de `span`), assim uma
+    # única passada de _covered_minutes dá a ocupação de todos os slots de todos os equipamentos
+    span = (day_count + 1) * MINUTES_PER_DAY
+    approved = arrays.status == APPROVED
+    offset = arrays.equipment[approved].astype(np.int64) * span - window_start
+    starts = np.clip(arrays.start[approved], window_start, window_end) + offset
+    ends = np.clip(arrays.end[approved], window_start, window_end) + offset
+
+    slot_count = -(-(closing - opening) // interval)
+    bounds = np.minimum(opening + interval * np.arange(slot_count + 1), closing)
+    day_bounds = (np.arange(day_count)[:, None] * MINUTES_PER_DAY + bounds).ravel()
+    points = (np.arange(equipment_count)[:, None] * span + day_bounds).reshape(equipment_count, day_count, -1)
+
+    covered = _covered_minutes(starts, ends, points)
+    slot_minutes = np.diff(bounds)
+    # Reservas sobrepostas do mesmo equipamento não passam de 100% do slot
+    occupied = np.minimum(np.diff(covered, axis=2), slot_minutes)
+    occupied[:, ~open_days] = 0
+
+    capacity = int(open_days.sum()) * (closing - opening)
+    booked = occupied.sum(axis=(1, 2))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        utilization = booked / capacity if capacity else np.zeros(equipment_count)
+
+    # ---------------- Dia da semana x slot ----------------
+    # 01/01/1970 foi quinta-feira: (dia + 3) % 7 dá 0=Segunda ... 6=Domingo
+    weekdays = (first_day + np.arange(day_count) + 3) % 7
+    per_day = occupied.sum(axis=0)
+    heat = np.zeros((7, slot_count))
+    np.add.at(heat, weekdays[open_days], per_day[open_days])
+    open_per_weekday = np.bincount(weekdays[open_days], minlength=7)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        heatmap = np.nan_to_num(heat / (open_per_weekday[:, None] * equipment_count * slot_minutes))
+
+    # ---------------- Pedidos da janela ----------------
+    inside = (arrays.start >= window_start) & (arrays.start < window_end)
+    equipment = arrays.equipment[inside]
+    status = arrays.status[inside].astype(np.int64)
+    created = arrays.created[inside]
+    counts = np.bincount(equipment * len(STATUSES) + status,
+                         minlength=equipment_count * len(STATUSES)).reshape(equipment_count, len(STATUSES))
+    decided = counts[:, APPROVED] + counts[:, REJECTED]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        approval_rate = np.where(decided > 0, counts[:, APPROVED] / np.maximum(decided, 1), np.nan)
+
+    # start é horário de parede e created UTC: a antecedência carrega o fuso, o que não muda a ordem de grandeza
+    lead = np.maximum(arrays.start[inside] - created, 0) / 60
+    lead_time, _ = _weighted_mean(equipment, lead, equipment_count)
+
+    was_decided = status != PENDING
+    latency = np.maximum(arrays.updated[inside][was_decided] - created[was_decided], 0) / 60
+    approval_latency, _ = _weighted_mean(equipment[was_decided], latency, equipment_count)
+
+    return UsageReport(
+        equipment_ids=arrays.equipment_ids,
+        first_day=first_day,
+        day_count=day_count,
+        open_day_count=int(open_days.sum()),
+        slot_count=slot_count,
+        counts=counts,
+        booked_minutes=booked,
+        capacity_minutes=capacity,
+        utilization=utilization,
+        approval_rate=approval_rate,
+        lead_time_hours=lead_time,
+        approval_latency_hours=approval_latency,
+        mean_lead_time_hours=float(lead.mean()) if len(lead) else float("nan"),
+        mean_approval_latency_hours=float(latency.mean()) if len(latency) else float("nan"),
+        heatmap=heatmap,
+    )
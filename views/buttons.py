@@ -14,7 +14,7 @@ class TimeButton(Button):
         self.callback = callback
 
 class DateButton(Button):
-    def __init__(self, date_str, available_times: list, callback):
-        style = ButtonStyle.green if available_times else ButtonStyle.red
-        super().__init__(label=date_str, style=style, disabled=not available_times)
+    def __init__(self, date_str, available: bool, callback):
+        style = ButtonStyle.green if available else ButtonStyle.red
+        super().__init__(label=date_str, style=style, disabled=not available)
         self.callback = callback
\ No newline at end of file
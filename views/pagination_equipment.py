@@ -0,0 +1,71 @@
+from typing import List, Optional, Tuple
+
+from discord import ButtonStyle, Embed, Interaction
+from discord.ui import Button, DynamicItem, View
+
+from models.equipment import EquipmentResponse
+from utils.cursor import CURSOR_PATTERN, decode_cursor, encode_cursor
+
+PER_PAGE = 5
+
+
+class EquipmentPageButton(DynamicItem[Button], template=r"eq:(?P<page>\d+):(?P<direction>[np]):(?P<cursor>" + CURSOR_PATTERN + r")?"):
+    """
+    Botão de página sem estado (custom_id "eq:<página>:<n|p>:<cursor>"); a página é buscada no clique.
+    """
+
+    def __init__(self, page: int, direction: str, cursor: Optional[str], label: str, disabled: bool = False):
+        super().__init__(Button(
+            label=label,
+            style=ButtonStyle.secondary,
+            disabled=disabled,
+            custom_id=f"eq:{page}:{direction}:{encode_cursor(cursor) if cursor else ''}"))
+        self.page = page
+        self.direction = direction
+        self.cursor = cursor
+
+    @classmethod
+    async def from_custom_id(cls, interaction: Interaction, item: Button, match):
+        return cls(int(match["page"]), match["direction"], decode_cursor(match["cursor"]), item.label, item.disabled)
+
+    async def callback(self, interaction: Interaction):
+        await interaction.response.defer()
+        embed, view = await build_equipment_page(
+            interaction.client.equipment_service, self.page, self.direction, self.cursor)
+        await interaction.edit_original_response(embed=embed, view=view)
+
+
+def equipment_page_embed(equipments: List[EquipmentResponse], page: int, pages: int) -> Embed:
+    embed = Embed(title="Equipamentos Disponíveis", color=0x00ff00)
+    for eq in equipments:
+        embed.add_field(
+            name=f"{eq.name} [{eq.status}]",
+            value=f"{eq.description}\nCriado em: {eq.created_at.strftime('%d/%m/%Y %H:%M')}",
+            inline=False
+        )
+    embed.set_footer(text=f"Página {page + 1}/{pages}")
+    return embed
+
+
+async def build_equipment_page(
+    equipment_service, page: int = 0, direction: str = "n", cursor: Optional[str] = None, per_page: int = PER_PAGE
+) -> Tuple[Embed, View]:
+    if direction == "p" and cursor:
+        equipments, has_prev = await equipment_service.get_equipment_page(per_page, before=cursor)
+        has_next = True
+        if not has_prev:
+            page = 0
+    else:
+        equipments, has_next = await equipment_service.get_equipment_page(per_page, after=cursor)
+        has_prev = page > 0
+    if not equipments and page > 0:
+        page, has_prev = 0, False
+        equipments, has_next = await equipment_service.get_equipment_page(per_page)
+
+    pages = max(1, (await equipment_service.count_equipments() - 1) // per_page + 1)
+    first = equipments[0].id if equipments else None
+    last = equipments[-1].id if equipments else None
+    view = View(timeout=None)
+    view.add_item(EquipmentPageButton(max(page - 1, 0), "p", first, "⬅️ Anterior", disabled=not has_prev))
+    view.add_item(EquipmentPageButton(page + 1, "n", last, "Próximo ➡️", disabled=not has_next))
+    return equipment_page_embed(equipments, page, max(pages, page + 1)), view
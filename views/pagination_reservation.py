@@ -1,56 +1,126 @@
-from typing import List
-
-from discord import ButtonStyle, Embed
-from discord.ui import Button, View
-
-from models.reservation import ReservationPayload
-
-
-class PaginatedReservationView(View):
-    def __init__(self, reservations: List[ReservationPayload], per_page: int = 5):
-        super().__init__(timeout=None)
-        self.reservations = reservations
-        self.per_page = per_page
-        self.page = 0
-
-        self.prev_button = Button(label="⬅️", style=ButtonStyle.secondary)
-        self.next_button = Button(label="➡️", style=ButtonStyle.secondary)
-
-        self.prev_button.callback = self.prev_page
-        self.next_button.callback = self.next_page
-
-        self.update_buttons()
-        self.add_item(self.prev_button)
-        self.add_item(self.next_button)
-
-    def update_buttons(self):
-        self.prev_button.disabled = self.page == 0
-        self.next_button.disabled = (self.page + 1) * self.per_page >= len(self.reservations)
-
-    async def prev_page(self, interaction):
-        self.page -= 1
-        self.update_buttons()
-        await interaction.response.edit_message(embed=self.get_page_embed(), view=self)
-
-    async def next_page(self, interaction):
-        self.page += 1
-        self.update_buttons()
-        await interaction.response.edit_message(embed=self.get_page_embed(), view=self)
-
-    def get_page_embed(self) -> Embed:
-        embed = Embed(title=f"Reservas - Página {self.page + 1}")
-        start_index = self.page * self.per_page
-        end_index = start_index + self.per_page
-        for res in self.reservations[start_index:end_index]:
-            embed.add_field(
-                name=f"Reserva {res.user_id}",
-                value=(
-                    f"**Equipamento ID:** {res.equipment_id}\n"
-                    f"**Responsável:** {res.responsible_id or 'Nenhum'}\n"
-                    f"**Início:** {res.start.strftime('%d/%m/%Y %H:%M')}\n"
-                    f"**Fim:** {res.end.strftime('%d/%m/%Y %H:%M')}\n"
-                    f"**Status:** {res.status}"
-                ),
-                inline=False
-            )
-        return embed
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from discord import ButtonStyle, Embed, Interaction
+from discord.ui import Button, DynamicItem, View
+
+from models.reservation import ReservationQuery, ReservationResponse
+from utils.cursor import CURSOR_PATTERN, decode_cursor, encode_cursor
+
+PER_PAGE = 5
+CUSTOM_ID_MAX = 100
+
+# custom_id (máx. 100 caracteres):
+# "res:<página>:<n|p>:<cursor>:<AAAAMMDD início>:<AAAAMMDD fim>:<status>:<equipamento>"
+# n = página seguinte ao cursor, p = página anterior ao cursor
+# O número da página é só para exibição (a paginação é pelo cursor) e sai do id quando não cabe
+CUSTOM_ID_TEMPLATE = (
+    r"res:(?P<page>\d*):(?P<direction>[np]):(?P<cursor>" + CURSOR_PATTERN + r")?:"
+    r"(?P<start>\d{8})?:(?P<end>\d{8})?:(?P<status>[a-z]*):(?P<equipment>.*)"
+)
+
+
+def encode_custom_id(query: ReservationQuery, page: Optional[int], direction: str, cursor: Optional[str]) -> str:
+    start = query.start_date.strftime("%Y%m%d") if query.start_date else ""
+    end = query.end_date.strftime("%Y%m%d") if query.end_date else ""
+    rest = (f":{direction}:{encode_cursor(cursor) if cursor else ''}:"
+            f"{start}:{end}:{query.status or ''}:{query.equipment or ''}")
+    custom_id = f"res:{page if page is not None else ''}{rest}"
+    if len(custom_id) > CUSTOM_ID_MAX:
+        custom_id = f"res:{rest}"
+    if len(custom_id) > CUSTOM_ID_MAX:
+        raise ValueError(f"custom_id com {len(custom_id)} caracteres (máx. {CUSTOM_ID_MAX})")
+    return custom_id
+
+
+class ReservationPageButton(DynamicItem[Button], template=CUSTOM_ID_TEMPLATE):
+    """
+    Botão de página sem estado: filtros, página e cursor ficam no custom_id, e a página é buscada no clique.
+    Registrado com `bot.add_dynamic_items`, continua funcionando depois de reiniciar o bot.
+    """
+
+    def __init__(self, query: ReservationQuery, page: Optional[int], direction: str, cursor: Optional[str],
+                 label: str, disabled: bool = False):
+        super().__init__(Button(
+            label=label,
+            style=ButtonStyle.secondary,
+            disabled=disabled,
+            custom_id=encode_custom_id(query, page, direction, cursor)))
+        self.query = query
+        self.page = page
+        self.direction = direction
+        self.cursor = cursor
+
+    @classmethod
+    async def from_custom_id(cls, interaction: Interaction, item: Button, match):
+        query = ReservationQuery(
+            start_date=datetime.strptime(match["start"], "%Y%m%d").date() if match["start"] else None,
+            end_date=datetime.strptime(match["end"], "%Y%m%d").date() if match["end"] else None,
+            status=match["status"] or None,
+            equipment=match["equipment"] or None)
+        return cls(query, int(match["page"]) if match["page"] else None, match["direction"], decode_cursor(match["cursor"]),
+                   item.label, item.disabled)
+
+    async def callback(self, interaction: Interaction):
+        await interaction.response.defer()
+        bot = interaction.client
+        embed, view = await build_reservation_page(
+            bot.reservation_service, bot.equipment_service, self.query, self.page, self.direction, self.cursor)
+        await interaction.edit_original_response(embed=embed, view=view)
+
+
+def reservation_page_embed(reservations: List[ReservationResponse], page: Optional[int]) -> Embed:
+    embed = Embed(title=f"Reservas - Página {page + 1}" if page is not None else "Reservas")
+    for res in reservations:
+        embed.add_field(
+            name=f"Reserva {res.user_id}",
+            value=(
+                f"**Equipamento ID:** {res.equipment_id}\n"
+                f"**Responsável:** {res.responsible_id or 'Nenhum'}\n"
+                f"**Início:** {res.start.strftime('%d/%m/%Y %H:%M')}\n"
+                f"**Fim:** {res.end.strftime('%d/%m/%Y %H:%M')}\n"
+                f"**Status:** {res.status}"
+            ),
+            inline=False
+        )
+    return embed
+
+
+async def build_reservation_page(
+    reservation_service, equipment_service, query: ReservationQuery, page: Optional[int] = 0,
+    direction: str = "n", cursor: Optional[str] = None, per_page: int = PER_PAGE
+) -> Tuple[Embed, View]:
+    """
+    Busca só a página pedida (keyset a partir do cursor) e monta a mensagem.
+    Se os dados mudaram e a página ficou vazia, volta para a primeira.
+    `page` None: número desconhecido (não coube no custom_id); a navegação segue pelo cursor.
+    """
+    start, end = query.interval()
+    equipment_ids = await equipment_service.find_equipment_ids(query.equipment) if query.equipment else None
+
+    async def fetch(**cursor_kwargs):
+        if equipment_ids == []:
+            return [], False
+        return await reservation_service.get_reservations_page(
+            per_page, start=start, end=end, equipment_ids=equipment_ids, status=query.status, **cursor_kwargs)
+
+    if direction == "p" and cursor:
+        reservations, has_prev = await fetch(before=cursor)
+        has_next = True
+        if not has_prev:
+            page = 0
+    else:
+        reservations, has_next = await fetch(after=cursor)
+        has_prev = page > 0 if page is not None else cursor is not None
+    if not reservations and page != 0:
+        page, has_prev = 0, False
+        reservations, has_next = await fetch()
+
+    first = reservations[0].id if reservations else None
+    last = reservations[-1].id if reservations else None
+    view = View(timeout=None)
+    previous_page = max(page - 1, 0) if page is not None else None
+    next_page = page + 1 if page is not None else None
+    view.add_item(ReservationPageButton(query, previous_page, "p", first, "⬅️", disabled=not has_prev))
+    view.add_item(ReservationPageButton(query, next_page, "n", last, "➡️", disabled=not has_next))
+    return reservation_page_embed(reservations, page), view
@@ -0,0 +1,183 @@
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from discord import ButtonStyle, Interaction, SelectOption
+from discord.ui import Button, Select, View
+
+# Limites do Discord: 25 componentes por mensagem (5 linhas x 5 botões) e 25 opções por menu
+MAX_BUTTONS = 25
+MAX_SELECT_OPTIONS = 25
+MAX_TEXT = 100
+
+
+class PickerOption:
+    """
+    Uma escolha do seletor: `value` vai para o callback, `group` agrupa as opções nos menus
+    (ex.: a hora de um horário, a semana de um dia).
+    """
+
+    __slots__ = ("value", "label", "available", "group", "description")
+
+    def __init__(self, value: str, label: str, available: bool, group: str, description: Optional[str] = None):
+        self.value = value
+        self.label = label
+        self.available = available
+        self.group = group
+        self.description = description
+
+
+def collapse_runs(options: Sequence[PickerOption], indexes: Sequence[int]) -> str:
+    """
+    "08:00–09:45, 11:00": opções disponíveis vizinhas (índices seguidos na lista completa) viram uma faixa.
+    """
+    runs: List[Tuple[int, int]] = []
+    for i in indexes:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1] = (runs[-1][0], i)
+        else:
+            runs.append((i, i))
+    return ", ".join(
+        options[a].label if a == b else f"{options[a].label}–{options[b].label}" for a, b in runs)
+
+
+def truncate(text: str, limit: int = MAX_TEXT) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class SlotPicker(View):
+    """
+    Seletor de um horário / dia que cabe nos limites de componentes do Discord.
+
+    - Até 25 opções: um botão por opção (`button_factory(label, disponível, callback)`), como antes.
+    - Mais que isso: só as opções disponíveis, em menus. Até 25 vão num menu só; acima, um menu de grupos
+      (com as faixas livres de cada grupo) e um menu com as opções do grupo escolhido. Com mais de 25 grupos,
+      os grupos são paginados.
+
+    Trocar de grupo ou de página só edita os menus; escolher uma opção chama `on_pick(interaction, value)`.
+    Sem nenhuma opção disponível, mostra só o botão `on_back` (voltar / cancelar), se houver.
+    """
+
+    def __init__(self, options: Sequence[PickerOption],
+                 on_pick: Callable[[Interaction, str], Awaitable[None]],
+                 button_factory: Callable[[str, bool, Callable], Button],
+                 placeholder: str = "Escolha uma opção",
+                 group_placeholder: str = "Escolha um grupo",
+                 on_back: Optional[Callable[[Interaction], Awaitable[None]]] = None,
+                 back_label: str = "⬅️ Voltar",
+                 timeout: Optional[float] = 180):
+        super().__init__(timeout=timeout)
+        self.options = list(options)
+        self.on_pick = on_pick
+        self.placeholder = placeholder
+        self.group_placeholder = group_placeholder
+        self.on_back = on_back
+        self.back_label = back_label
+        self.group = 0
+        self.groups: List[Tuple[str, List[int]]] = []
+
+        if len(self.options) <= MAX_BUTTONS:
+            for option in self.options:
+                async def on_click(interaction, value=option.value):
+                    await self.on_pick(interaction, value)
+
+                self.add_item(button_factory(option.label, option.available, on_click))
+            if self.empty and len(self.options) < MAX_BUTTONS:
+                self.add_back()
+            return
+
+        self.groups = self.group_indexes()
+        self.render()
+
+    @property
+    def empty(self) -> bool:
+        return not any(option.available for option in self.options)
+
+    @property
+    def paged(self) -> bool:
+        return len(self.groups) > MAX_SELECT_OPTIONS
+
+    def group_indexes(self) -> List[Tuple[str, List[int]]]:
+        """
+        Índices das opções disponíveis por grupo, na ordem; grupos com mais de 25 opções são divididos.
+        """
+        available = [i for i, option in enumerate(self.options) if option.available]
+        if len(available) <= MAX_SELECT_OPTIONS:
+            return [("", available)] if available else []
+
+        groups: List[Tuple[str, List[int]]] = []
+        for i in available:
+            name = self.options[i].group
+            if groups and groups[-1][0] == name:
+                groups[-1][1].append(i)
+            else:
+                groups.append((name, [i]))
+
+        split = []
+        for name, indexes in groups:
+            chunks = range(0, len(indexes), MAX_SELECT_OPTIONS)
+            for part, start in enumerate(chunks):
+                label = name if len(chunks) == 1 else f"{name} ({part + 1}/{len(chunks)})"
+                split.append((label, indexes[start:start + MAX_SELECT_OPTIONS]))
+        return split
+
+    # ---------------- Componentes ----------------
+    def add_back(self):
+        if self.on_back is not None:
+            back = Button(label=self.back_label, style=ButtonStyle.secondary)
+            back.callback = self.on_back
+            self.add_item(back)
+
+    def render(self):
+        self.clear_items()
+        if not self.groups:
+            self.add_back()
+            return
+
+        if len(self.groups) > 1:
+            page_start = self.group - self.group % MAX_SELECT_OPTIONS
+            page = self.groups[page_start:page_start + MAX_SELECT_OPTIONS]
+            group_select = Select(
+                placeholder=self.group_placeholder,
+                row=0,
+                options=[
+                    SelectOption(
+                        label=truncate(name),
+                        value=str(page_start + n),
+                        description=truncate(f"{len(indexes)} livre(s): {collapse_runs(self.options, indexes)}"),
+                        default=page_start + n == self.group)
+                    for n, (name, indexes) in enumerate(page)
+                ])
+            group_select.callback = lambda interaction: self.on_group(interaction, int(group_select.values[0]))
+            self.add_item(group_select)
+
+        name, indexes = self.groups[self.group]
+        option_select = Select(
+            placeholder=truncate(f"{self.placeholder} ({name})" if name else self.placeholder),
+            row=1,
+            options=[
+                SelectOption(label=truncate(self.options[i].label), value=self.options[i].value,
+                             description=truncate(self.options[i].description) if self.options[i].description else None)
+                for i in indexes
+            ])
+        option_select.callback = lambda interaction: self.on_pick(interaction, option_select.values[0])
+        self.add_item(option_select)
+
+        if self.paged:
+            pages = -(-len(self.groups) // MAX_SELECT_OPTIONS)
+            page = self.group // MAX_SELECT_OPTIONS
+            previous = Button(label="⬅️ Anteriores", style=ButtonStyle.secondary, row=2, disabled=page == 0)
+            following = Button(label="Próximos ➡️", style=ButtonStyle.secondary, row=2, disabled=page == pages - 1)
+            previous.callback = lambda interaction: self.on_page(interaction, page - 1)
+            following.callback = lambda interaction: self.on_page(interaction, page + 1)
+            self.add_item(previous)
+            self.add_item(following)
+
+    # ---------------- Callbacks ----------------
+    async def on_group(self, interaction: Interaction, group: int):
+        self.group = group
+        self.render()
+        await interaction.response.edit_message(view=self)
+
+    async def on_page(self, interaction: Interaction, page: int):
+        self.group = page * MAX_SELECT_OPTIONS
+        self.render()
+        await interaction.response.edit_message(view=self)